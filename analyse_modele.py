@@ -0,0 +1,96 @@
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from donnees import REGIONS, CULTURES
+from predict import BORNES_ENTREES, COLONNES, ajuster_rendement
+
+# Parcelle de référence (valeurs par défaut du formulaire) si le jeu d'entraînement est absent
+PARCELLE_DEFAUT = {
+    "type_sol": "Argileux",
+    "surface_ha": 5.0,
+    "pluviometrie_mm": 800.0,
+    "temperature_moyenne_c": 27.0
+}
+
+# Bornes des variables climatiques (identiques aux champs du formulaire)
+BORNES = {variable: BORNES_ENTREES[variable] for variable in ("pluviometrie_mm", "temperature_moyenne_c")}
+
+
+def grille_variable(variable: str, fond: Optional[pd.DataFrame] = None, n_points: int = 40) -> np.ndarray:
+    """Grille régulière sur la plage observée (1er-99e centile) ou sur les bornes du formulaire"""
+    bas, haut = BORNES[variable]
+    if fond is not None and not fond.empty:
+        bas, haut = np.percentile(fond[variable].to_numpy(dtype=float), [1, 99])
+    return np.linspace(bas, haut, n_points)
+
+
+def echantillon_fond(df: Optional[pd.DataFrame], n_par_segment: int = 50, graine: int = 42) -> pd.DataFrame:
+    """Lignes de fond par région et culture pour moyenner les autres variables"""
+    if df is None or df.empty:
+        return pd.DataFrame([PARCELLE_DEFAUT])
+    melange = df.sample(frac=1.0, random_state=graine)
+    return melange.groupby(["region", "culture"]).head(n_par_segment).reset_index(drop=True)
+
+
+def dependance_partielle(modele, fond: pd.DataFrame, variable: str, grille: np.ndarray,
+                         regions: Sequence[str] = REGIONS,
+                         cultures: Sequence[str] = CULTURES) -> pd.DataFrame:
+    """Dépendance partielle du rendement à `variable`, par région et culture.
+
+    Toutes les combinaisons (segment x fond x grille) sont assemblées en un seul
+    DataFrame et évaluées en un unique appel à `modele.predict`.
+    """
+    blocs = []
+    for region in regions:
+        for culture in cultures:
+            fond_seg = fond
+            if "region" in fond.columns:
+                seg = fond[(fond["region"] == region) & (fond["culture"] == culture)]
+                # Segment absent du jeu d'entraînement : on garde tout le fond
+                fond_seg = seg if not seg.empty else fond
+            bloc = fond_seg.drop(columns=["region", "culture"], errors="ignore").copy()
+            bloc["region"] = region
+            bloc["culture"] = culture
+            blocs.append(bloc)
+
+    segments = pd.concat(blocs, ignore_index=True)
+    n_grille = len(grille)
+
+    # Chaque ligne de fond est répétée pour chaque point de la grille
+    lot = segments.loc[segments.index.repeat(n_grille), COLONNES].reset_index(drop=True)
+    lot[variable] = np.tile(grille, len(segments))
+
+    lot["rendement"] = modele.predict(lot[COLONNES])
+    return (
+        lot.groupby(["region", "culture", variable], as_index=False, sort=False)["rendement"]
+        .mean()
+    )
+
+
+def grille_sensibilite(modele, parcelle: Dict, axe_x: str, valeurs_x: Sequence,
+                       axe_y: str, valeurs_y: Sequence) -> pd.DataFrame:
+    """Rendement ajusté de la parcelle sur la grille axe_y x axe_x (tableau croisé).
+
+    `parcelle` contient les colonnes du modèle plus `irrigation` et `fertilisation`.
+    Seules les combinaisons distinctes des entrées du modèle sont prédites, en un
+    seul appel ; les facteurs d'ajustement sont ensuite appliqués en bloc.
+    """
+    xx, yy = np.meshgrid(np.asarray(valeurs_x), np.asarray(valeurs_y))
+    scenarios = pd.DataFrame({cle: [valeur] * xx.size for cle, valeur in parcelle.items()})
+    scenarios[axe_x] = xx.ravel()
+    scenarios[axe_y] = yy.ravel()
+
+    entrees = scenarios[COLONNES].drop_duplicates().reset_index(drop=True)
+    entrees["base"] = modele.predict(entrees[COLONNES])
+    scenarios = scenarios.merge(entrees, on=COLONNES, how="left")
+
+    scenarios["rendement"] = ajuster_rendement(
+        scenarios["base"],
+        scenarios["pluviometrie_mm"],
+        scenarios["temperature_moyenne_c"],
+        scenarios["irrigation"],
+        scenarios["fertilisation"]
+    )
+    return scenarios.pivot(index=axe_y, columns=axe_x, values="rendement")
@@ -0,0 +1,232 @@
+"""Banc de charge : utilisateurs simultanés simulés, par paliers, jusqu'à saturation.
+
+Deux cibles :
+  - service    : POST /predict (ou /predict/batch avec --lot) sur le service HTTP ;
+  - interface  : parcours des pages Streamlit via AppTest, dans ce processus
+                 (exécution du script côté serveur, sans navigateur ni websocket).
+
+Les parcelles sont tirées du jeu d'entraînement (distribution réelle des
+régions, cultures, sols, surfaces et climats), avec un temps de réflexion
+exponentiel entre deux actions. Chaque palier rapporte débit et latences
+p50 / p95 / p99 ; le point de saturation est le palier à partir duquel le
+débit ne progresse plus (moins de 10 %) ou la latence p95 dépasse --slo-ms.
+Avec la cible interface, --meteo-locale lance le substitut Open-Meteo :
+tout fonctionne hors ligne.
+
+    python service_prediction.py --port 8000 &
+    python banc_charge.py service --url http://127.0.0.1:8000 --utilisateurs 1 2 4 8 16 32 64
+    python banc_charge.py interface --meteo-locale --utilisateurs 1 2 4 8 --reflexion 2
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+from donnees import CHEMIN_DONNEES
+from predict import COLONNES
+
+# Fréquentation relative des pages de l'interface
+PAGES_INTERFACE = {"Prévision": 0.6, "Visualisations": 0.15, "Historique": 0.15, "Accueil": 0.1}
+
+GAIN_MIN_DEBIT = 0.10
+TAUX_ERREUR_MAX = 0.01
+
+
+class Mesures:
+    """Latences et erreurs d'un palier, partagées par les utilisateurs"""
+
+    def __init__(self):
+        self.latences: List[float] = []
+        self.erreurs = 0
+        self._verrou = threading.Lock()
+
+    def ajouter(self, latence: float, succes: bool) -> None:
+        with self._verrou:
+            if succes:
+                self.latences.append(latence)
+            else:
+                self.erreurs += 1
+
+
+def charger_parcelles(chemin: str) -> List[Dict]:
+    df = pd.read_csv(chemin, usecols=COLONNES)
+    return df.to_dict("records")
+
+
+def utilisateur_service(url: str, parcelles: List[Dict], lot: int, reflexion: float,
+                        echeance: float, mesures: Mesures, graine: int) -> None:
+    rng = np.random.default_rng(graine)
+    adresse = urlsplit(url)
+    connexion = http.client.HTTPConnection(adresse.hostname, adresse.port or 80, timeout=30)
+    while time.monotonic() < echeance:
+        choix = [parcelles[i] for i in rng.integers(len(parcelles), size=lot)]
+        if lot == 1:
+            chemin, corps = "/predict", choix[0]
+        else:
+            chemin, corps = "/predict/batch", {"parcelles": choix}
+
+        debut = time.perf_counter()
+        try:
+            connexion.request("POST", chemin, json.dumps(corps), {"Content-Type": "application/json"})
+            reponse = connexion.getresponse()
+            reponse.read()
+            succes = reponse.status == 200
+        except (OSError, http.client.HTTPException):
+            succes = False
+            connexion.close()
+            connexion = http.client.HTTPConnection(adresse.hostname, adresse.port or 80, timeout=30)
+        mesures.ajouter(time.perf_counter() - debut, succes)
+
+        if reflexion > 0:
+            time.sleep(rng.exponential(reflexion))
+    connexion.close()
+
+
+def _widget(widgets, libelle: str):
+    return next(w for w in widgets if w.label.startswith(libelle))
+
+
+def utilisateur_interface(script: str, parcelles: List[Dict], reflexion: float,
+                          echeance: float, mesures: Mesures, graine: int) -> None:
+    from streamlit.testing.v1 import AppTest
+
+    rng = np.random.default_rng(graine)
+    pages, poids = list(PAGES_INTERFACE), list(PAGES_INTERFACE.values())
+    app = AppTest.from_file(script, default_timeout=120)
+    app.run()
+    while time.monotonic() < echeance:
+        page = pages[rng.choice(len(pages), p=poids)]
+        debut = time.perf_counter()
+        try:
+            app.sidebar.radio[0].set_value(page)
+            if page == "Prévision":
+                app.run()
+                parcelle = parcelles[rng.integers(len(parcelles))]
+                _widget(app.selectbox, "Région agricole").set_value(parcelle["region"])
+                _widget(app.selectbox, "Type de culture").set_value(parcelle["culture"])
+                _widget(app.selectbox, "Type de sol").set_value(parcelle["type_sol"])
+                _widget(app.number_input, "Superficie").set_value(float(np.clip(parcelle["surface_ha"], 0.1, 1000)))
+                # Une moitié des utilisateurs saisit son climat, l'autre prend la météo du jour
+                if rng.random() < 0.5:
+                    _widget(app.checkbox, "Utiliser les données météo").uncheck()
+                    app.run()
+                    _widget(app.number_input, "Température").set_value(
+                        float(np.clip(parcelle["temperature_moyenne_c"], 15, 45)))
+                    _widget(app.number_input, "Pluviométrie").set_value(
+                        int(np.clip(parcelle["pluviometrie_mm"], 0, 3000)))
+                else:
+                    _widget(app.checkbox, "Utiliser les données météo").check()
+                app.button[0].click()
+            app.run()
+            succes = not app.exception
+        except Exception:
+            succes = False
+            app = AppTest.from_file(script, default_timeout=120)
+            app.run()
+        mesures.ajouter(time.perf_counter() - debut, succes)
+
+        if reflexion > 0:
+            time.sleep(rng.exponential(reflexion))
+
+
+def executer_palier(cible: str, n_utilisateurs: int, duree: float, args, parcelles: List[Dict]) -> Dict:
+    mesures = Mesures()
+    echeance = time.monotonic() + duree
+    if cible == "service":
+        fonction, parametres = utilisateur_service, (args.url, parcelles, args.lot, args.reflexion)
+    else:
+        fonction, parametres = utilisateur_interface, (args.script, parcelles, args.reflexion)
+
+    fils = [
+        threading.Thread(target=fonction, args=parametres + (echeance, mesures, args.graine + i), daemon=True)
+        for i in range(n_utilisateurs)
+    ]
+    debut = time.perf_counter()
+    for fil in fils:
+        fil.start()
+    for fil in fils:
+        fil.join()
+    ecoule = time.perf_counter() - debut
+
+    latences = np.array(mesures.latences) * 1000
+    total = len(latences) + mesures.erreurs
+    p50, p95, p99 = np.percentile(latences, [50, 95, 99]) if len(latences) else (np.nan,) * 3
+    return {
+        "utilisateurs": n_utilisateurs,
+        "requetes": total,
+        "debit": len(latences) / ecoule,
+        "p50": p50,
+        "p95": p95,
+        "p99": p99,
+        "taux_erreur": mesures.erreurs / total if total else 0.0
+    }
+
+
+def point_saturation(resultats: List[Dict], slo_ms: float) -> Optional[Tuple[Dict, str]]:
+    """Premier palier où la latence p95 dépasse le SLO, où les erreurs montent ou le débit cesse de progresser"""
+    for precedent, courant in zip([None] + resultats[:-1], resultats):
+        if courant["p95"] > slo_ms:
+            return courant, f"p95 {courant['p95']:.0f} ms > {slo_ms:.0f} ms"
+        if courant["taux_erreur"] > TAUX_ERREUR_MAX:
+            return courant, f"{courant['taux_erreur']:.1%} d'erreurs"
+        if precedent is not None and courant["debit"] < precedent["debit"] * (1 + GAIN_MIN_DEBIT):
+            return courant, f"débit +{courant['debit'] / precedent['debit'] - 1:.0%} seulement"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc de charge du service et de l'interface")
+    parser.add_argument("cible", choices=["service", "interface"])
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Service HTTP (cible service)")
+    parser.add_argument("--script", default="Prevision_Interface.py", help="Application Streamlit (cible interface)")
+    parser.add_argument("--donnees", default=CHEMIN_DONNEES)
+    parser.add_argument("--utilisateurs", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32],
+                        help="Paliers : nombre d'utilisateurs simultanés")
+    parser.add_argument("--duree", type=float, default=20.0, help="Durée de chaque palier (s)")
+    parser.add_argument("--reflexion", type=float, default=0.0, help="Temps de réflexion moyen entre deux actions (s)")
+    parser.add_argument("--lot", type=int, default=1, help="Parcelles par requête (cible service)")
+    parser.add_argument("--slo-ms", type=float, default=500.0, help="Latence p95 au-delà de laquelle on sature")
+    parser.add_argument("--meteo-locale", action="store_true",
+                        help="Lance le substitut Open-Meteo local (cible interface, hors ligne)")
+    parser.add_argument("--graine", type=int, default=0)
+    args = parser.parse_args()
+
+    parcelles = charger_parcelles(args.donnees)
+
+    if args.meteo_locale:
+        import meteo
+        import meteo_locale
+
+        serveur = meteo_locale.demarrer()
+        meteo.URL_METEO = f"http://127.0.0.1:{serveur.server_port}/v1/forecast"
+
+    print(f"{'Utilisateurs':>12}{'Requêtes':>10}{'Débit (req/s)':>15}"
+          f"{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'Erreurs':>9}")
+    print("-" * 76)
+    resultats = []
+    for n in args.utilisateurs:
+        r = executer_palier(args.cible, n, args.duree, args, parcelles)
+        resultats.append(r)
+        print(f"{r['utilisateurs']:>12}{r['requetes']:>10}{r['debit']:>15.1f}"
+              f"{r['p50']:>10.1f}{r['p95']:>10.1f}{r['p99']:>10.1f}{r['taux_erreur']:>9.1%}")
+
+    saturation = point_saturation(resultats, args.slo_ms)
+    meilleur = max(resultats, key=lambda r: r["debit"])
+    print()
+    if saturation is None:
+        print(f"Pas de saturation jusqu'à {resultats[-1]['utilisateurs']} utilisateurs "
+              f"(débit max {meilleur['debit']:.1f} req/s) : ajouter des paliers.")
+    else:
+        palier, raison = saturation
+        print(f"Saturation à {palier['utilisateurs']} utilisateurs ({raison}) ; "
+              f"débit max {meilleur['debit']:.1f} req/s à {meilleur['utilisateurs']} utilisateurs.")
+
+
+if __name__ == "__main__":
+    main()
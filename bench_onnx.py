@@ -0,0 +1,82 @@
+"""Comparaison des moteurs scikit-learn et onnxruntime.
+
+Vérifie d'abord la parité des prédictions (parite_onnx.py : parcelles
+d'entraînement, domaine complet et voisinage des seuils), puis mesure le temps
+de chargement, la latence et le débit pour des lots de 1 à 100 000 parcelles.
+Code de sortie non nul si la parité n'est pas respectée.
+
+    python train_modele.py --onnx
+    python bench_onnx.py
+    python bench_onnx.py --tolerance 1e-3 --lots 1 100 10000
+"""
+import argparse
+import sys
+import time
+
+import joblib
+import pandas as pd
+
+from donnees import CHEMIN_DONNEES
+from parite_onnx import TOLERANCE, controler
+from predict import CHEMIN_MODELE, COLONNES, chemin_moteur
+
+LOTS_PAR_DEFAUT = [1, 10, 100, 1000, 10_000, 100_000]
+
+
+def echantillon(chemin_donnees: str, n: int, graine: int = 0) -> pd.DataFrame:
+    """n parcelles tirées (avec remise) du jeu d'entraînement"""
+    df = pd.read_csv(chemin_donnees, usecols=COLONNES)
+    return df.sample(n=n, replace=True, random_state=graine).reset_index(drop=True)
+
+
+def chronometrer(fonction, repetitions: int) -> float:
+    """Meilleur temps (s) sur `repetitions` appels"""
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parité et performances sklearn / onnxruntime")
+    parser.add_argument("--modele", default=CHEMIN_MODELE)
+    parser.add_argument("--donnees", default=CHEMIN_DONNEES)
+    parser.add_argument("--lots", type=int, nargs="*", default=LOTS_PAR_DEFAUT)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="Écart absolu maximal admis (t/ha) ; la forêt ONNX calcule en float32")
+    parser.add_argument("--threads", type=int, default=0, help="Fils onnxruntime (0 : tous les cœurs)")
+    args = parser.parse_args()
+
+    from onnx_modele import ModeleOnnx
+
+    chemin_onnx = chemin_moteur(args.modele, "onnx")
+    debut = time.perf_counter()
+    modele_sklearn = joblib.load(args.modele)
+    chargement_sklearn = time.perf_counter() - debut
+    debut = time.perf_counter()
+    modele_onnx = ModeleOnnx(chemin_onnx, n_threads=args.threads)
+    chargement_onnx = time.perf_counter() - debut
+    print(f"Chargement : sklearn {chargement_sklearn * 1000:.0f} ms, onnx {chargement_onnx * 1000:.0f} ms")
+
+    # Parité
+    if not controler(args.modele, args.donnees, tolerance=args.tolerance,
+                     modele_sklearn=modele_sklearn, modele_onnx=modele_onnx):
+        sys.exit(1)
+
+    # Latence et débit
+    print()
+    print(f"{'Lot':>8}{'sklearn (ms)':>15}{'onnx (ms)':>12}{'sklearn (l/s)':>16}{'onnx (l/s)':>14}{'gain':>8}")
+    print("-" * 73)
+    for taille in args.lots:
+        lot = echantillon(args.donnees, taille)
+        repetitions = max(1, min(20, 20_000 // taille))
+        t_sklearn = chronometrer(lambda: modele_sklearn.predict(lot), repetitions)
+        t_onnx = chronometrer(lambda: modele_onnx.predict(lot), repetitions)
+        print(f"{taille:>8}{t_sklearn * 1000:>15.2f}{t_onnx * 1000:>12.2f}"
+              f"{taille / t_sklearn:>16.0f}{taille / t_onnx:>14.0f}{t_sklearn / t_onnx:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Carte nationale des rendements : grille régulière sur le Togo, prédite par tuiles.
+
+Chaque maille reçoit une région (bandes de latitude), le sol dominant et la
+surface médiane de sa région, et un climat interpolé (pondération inverse
+de la distance) entre les points de référence des cinq régions. La grille
+entière est prédite pour chaque culture en tuiles vectorisées, réparties sur
+un pool de processus qui gardent le modèle chargé.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from analyse_modele import PARCELLE_DEFAUT
+from donnees import CULTURES, REGIONS
+from meteo import REGIONS_COORDINATES
+from predict import CHEMIN_MODELE, COLONNES, charger_modele, predict_lot
+
+# Contour simplifié du territoire (lon, lat), sens horaire depuis Lomé
+CONTOUR_TOGO = np.array([
+    (1.20, 6.10), (1.05, 6.45), (0.75, 6.60), (0.53, 6.95), (0.65, 7.35), (0.50, 7.55),
+    (0.60, 8.00), (0.40, 8.50), (0.45, 8.90), (0.30, 9.40), (0.35, 9.80), (0.35, 10.30),
+    (0.00, 10.65), (-0.10, 11.00), (0.92, 11.00), (0.78, 10.35), (1.35, 9.95), (1.40, 9.30),
+    (1.62, 9.00), (1.65, 8.40), (1.62, 6.95), (1.78, 6.28), (1.20, 6.10)
+])
+
+# Limite nord (latitude) de chaque région, du sud au nord
+LIMITES_REGIONS = [(6.85, "Maritime"), (8.15, "Plateaux"), (9.20, "Centrale"), (10.05, "Kara"), (90.0, "Savanes")]
+
+KM_PAR_DEGRE = 111.32
+TAILLE_TUILE = 20_000
+LIGNES_MIN_POOL = 2 * TAILLE_TUILE
+
+
+def _dans_contour(lon: np.ndarray, lat: np.ndarray, contour: np.ndarray = CONTOUR_TOGO) -> np.ndarray:
+    """Test point-dans-polygone (lancer de rayon), vectorisé sur tous les points"""
+    dedans = np.zeros(len(lon), dtype=bool)
+    x1, y1 = contour[:-1, 0], contour[:-1, 1]
+    x2, y2 = contour[1:, 0], contour[1:, 1]
+    for a, b, c, d in zip(x1, y1, x2, y2):
+        croise = (b > lat) != (d > lat)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_intersection = a + (lat - b) * (c - a) / (d - b)
+        dedans ^= croise & (lon < x_intersection)
+    return dedans
+
+
+def region_latitude(lat: np.ndarray) -> np.ndarray:
+    limites = np.array([limite for limite, _ in LIMITES_REGIONS])
+    noms = np.array([nom for _, nom in LIMITES_REGIONS], dtype=object)
+    return noms[np.searchsorted(limites, lat)]
+
+
+def grille_togo(pas_km: float) -> pd.DataFrame:
+    """Centres des mailles de `pas_km` km couvrant le territoire ; i, j : indices ligne / colonne"""
+    lon_min, lat_min = CONTOUR_TOGO.min(axis=0)
+    lon_max, lat_max = CONTOUR_TOGO.max(axis=0)
+    pas_lat = pas_km / KM_PAR_DEGRE
+    pas_lon = pas_km / (KM_PAR_DEGRE * np.cos(np.radians((lat_min + lat_max) / 2)))
+    lats = np.arange(lat_min + pas_lat / 2, lat_max, pas_lat)
+    lons = np.arange(lon_min + pas_lon / 2, lon_max, pas_lon)
+
+    i, j = np.meshgrid(np.arange(len(lats)), np.arange(len(lons)), indexing="ij")
+    i, j = i.ravel(), j.ravel()
+    lat, lon = lats[i], lons[j]
+    dedans = _dans_contour(lon, lat)
+    return pd.DataFrame({
+        "i": i[dedans], "j": j[dedans], "lat": lat[dedans], "lon": lon[dedans],
+        "region": region_latitude(lat[dedans])
+    })
+
+
+def reference_regions(df: Optional[pd.DataFrame]) -> Dict[str, Dict]:
+    """Sol dominant, surface, pluie et température médianes de chaque région"""
+    reference = {}
+    for region in REGIONS:
+        seg = df[df["region"] == region] if df is not None and not df.empty else None
+        if seg is None or seg.empty:
+            reference[region] = dict(PARCELLE_DEFAUT)
+            continue
+        reference[region] = {
+            "type_sol": seg["type_sol"].mode().iloc[0],
+            "surface_ha": float(seg["surface_ha"].median()),
+            "pluviometrie_mm": float(seg["pluviometrie_mm"].median()),
+            "temperature_moyenne_c": float(seg["temperature_moyenne_c"].median())
+        }
+    return reference
+
+
+def interpoler_climat(grille: pd.DataFrame, climat_regions: Dict[str, Tuple[float, float]],
+                      puissance: float = 2.0) -> Tuple[np.ndarray, np.ndarray]:
+    """Pluie et température de chaque maille, par pondération inverse de la distance aux 5 régions"""
+    points = np.array([(REGIONS_COORDINATES[r]["lon"], REGIONS_COORDINATES[r]["lat"]) for r in climat_regions])
+    valeurs = np.array(list(climat_regions.values()), dtype=float)  # (n_regions, 2)
+    distances = np.hypot(grille["lon"].to_numpy()[:, None] - points[:, 0],
+                         grille["lat"].to_numpy()[:, None] - points[:, 1])
+    poids = 1.0 / np.maximum(distances, 1e-6) ** puissance
+    climat = poids @ valeurs / poids.sum(axis=1, keepdims=True)
+    return climat[:, 0], climat[:, 1]
+
+
+def entrees_grille(grille: pd.DataFrame, reference: Dict[str, Dict],
+                   climat_regions: Dict[str, Tuple[float, float]], culture: str) -> pd.DataFrame:
+    """Lignes du modèle pour une culture : une par maille"""
+    pluie, temperature = interpoler_climat(grille, climat_regions)
+    regions = grille["region"]
+    return pd.DataFrame({
+        "region": regions.to_numpy(),
+        "culture": culture,
+        "type_sol": regions.map({r: v["type_sol"] for r, v in reference.items()}).to_numpy(),
+        "surface_ha": regions.map({r: v["surface_ha"] for r, v in reference.items()}).to_numpy(),
+        "pluviometrie_mm": pluie,
+        "temperature_moyenne_c": temperature
+    })[COLONNES]
+
+
+def _initialiser_worker(chemin: str) -> None:
+    # Le modèle est chargé une fois par processus, avant la première tuile
+    charger_modele(chemin)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_cle: Optional[Tuple] = None
+
+
+def _pool_processus(chemin: str, n_processus: int) -> ProcessPoolExecutor:
+    """Pool réutilisé d'un appel à l'autre ; recréé si le modèle ou le nombre de processus configuré changent"""
+    global _pool, _pool_cle
+    cle = (chemin, n_processus)
+    if _pool is None or _pool_cle != cle:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        # spawn : pas de fork d'un processus multi-fils (Streamlit)
+        _pool = ProcessPoolExecutor(n_processus, mp_context=multiprocessing.get_context("spawn"),
+                                    initializer=_initialiser_worker, initargs=(chemin,))
+        _pool_cle = cle
+    return _pool
+
+
+def predire_grille(grille: pd.DataFrame, reference: Dict[str, Dict],
+                   climat_regions: Dict[str, Tuple[float, float]],
+                   cultures: Sequence[str] = CULTURES, chemin: str = CHEMIN_MODELE,
+                   n_processus: Optional[int] = None, taille_tuile: int = TAILLE_TUILE) -> pd.DataFrame:
+    """Rendement (t/ha) de chaque maille pour chaque culture : une colonne par culture"""
+    entrees = pd.concat([entrees_grille(grille, reference, climat_regions, c) for c in cultures],
+                        ignore_index=True)
+    tuiles = [entrees.iloc[debut:debut + taille_tuile] for debut in range(0, len(entrees), taille_tuile)]
+
+    n_processus = n_processus or os.cpu_count() or 1
+    if n_processus > 1 and len(entrees) >= LIGNES_MIN_POOL:
+        # Clé indépendante du nombre de tuiles : changer la taille des mailles ne relance pas les workers
+        pool = _pool_processus(chemin, n_processus)
+        resultats = list(pool.map(predict_lot, tuiles, [chemin] * len(tuiles)))
+    else:
+        resultats = [predict_lot(tuile, chemin) for tuile in tuiles]
+
+    rendements = np.concatenate(resultats).reshape(len(cultures), len(grille))
+    carte = grille.copy()
+    for culture, valeurs in zip(cultures, rendements):
+        carte[culture] = valeurs
+    return carte
+
+
+def matrice_carte(carte: pd.DataFrame, colonne: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(lons, lats, z) : valeurs sur la grille régulière, NaN hors du territoire"""
+    n_i, n_j = carte["i"].max() + 1, carte["j"].max() + 1
+    z = np.full((n_i, n_j), np.nan)
+    z[carte["i"].to_numpy(), carte["j"].to_numpy()] = carte[colonne].to_numpy()
+    # Axes réguliers : interpolés sur les lignes / colonnes sans maille
+    lignes = carte.groupby("i")["lat"].first()
+    colonnes = carte.groupby("j")["lon"].first()
+    lats = np.interp(np.arange(n_i), lignes.index, lignes.to_numpy())
+    lons = np.interp(np.arange(n_j), colonnes.index, colonnes.to_numpy())
+    return lons, lats, z
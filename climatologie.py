@@ -0,0 +1,159 @@
+"""Climatologie embarquée : normales journalières de chaque région, disponibles sans réseau.
+
+Table float32 (régions x 366 jours x variables) livrée dans climatologie_togo.npy
+et ouverte en mémoire partagée (np.load(mmap_mode="r")) : aucune lecture du
+fichier au démarrage, les pages tirent les jours utiles à la demande. Elle
+fournit les valeurs par défaut du formulaire (selon région, culture et date de
+semis) et remplace l'API météo quand celle-ci ne répond pas.
+
+La table livrée vient d'un modèle documenté (pas de réanalyse accessible
+hors ligne) :
+  - température moyenne : normale annuelle de la région + cycle annuel de
+    phenologie.py (maximum vers la mi-mars, minimum en août) ;
+  - température maximale : moyenne + demi-amplitude diurne de la région ;
+  - pluie : normale annuelle de la région répartie selon PART_PLUIE_MENSUELLE,
+    lissée sur une fenêtre circulaire de 31 jours (cumul annuel conservé).
+Avec le réseau, --archive recalcule les normales depuis l'archive Open-Meteo
+(réanalyse ERA5).
+
+    python climatologie.py                        # reconstruit climatologie_togo.npy (modèle)
+    python climatologie.py --archive 1991 2020    # normales ERA5 1991-2020
+"""
+import argparse
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from phenologie import AMPLITUDE_ANNUELLE, JOUR_MAXIMUM, JOURS_MAX, JOURS_PAR_MOIS, PART_PLUIE_MENSUELLE, dates_recolte
+
+CHEMIN_CLIMATOLOGIE = "climatologie_togo.npy"
+URL_ARCHIVE = "https://archive-api.open-meteo.com/v1/archive"
+
+REGIONS = list(PART_PLUIE_MENSUELLE)
+VARIABLES = ["temperature_moyenne", "temperature_max", "pluie"]
+JOURS_AN = 366
+FENETRE_LISSAGE = 31
+
+# Normales annuelles des stations de référence (Lomé, Atakpamé, Sokodé, Kara, Dapaong) :
+# température moyenne (°C), demi-amplitude diurne (°C) et cumul de pluie (mm)
+NORMALES_REGIONS = {
+    "Maritime": {"temperature": 27.3, "demi_amplitude": 3.5, "pluie": 1000.0},
+    "Plateaux": {"temperature": 26.4, "demi_amplitude": 5.0, "pluie": 1450.0},
+    "Centrale": {"temperature": 26.6, "demi_amplitude": 5.5, "pluie": 1350.0},
+    "Kara": {"temperature": 27.2, "demi_amplitude": 6.0, "pluie": 1300.0},
+    "Savanes": {"temperature": 28.0, "demi_amplitude": 6.5, "pluie": 1050.0}
+}
+
+
+def _lisser(valeurs: np.ndarray, fenetre: int = FENETRE_LISSAGE) -> np.ndarray:
+    """Moyenne mobile circulaire le long du dernier axe (l'année se referme sur elle-même)"""
+    demi = fenetre // 2
+    etendu = np.concatenate([valeurs[..., -demi:], valeurs, valeurs[..., :demi]], axis=-1)
+    cumul = np.cumsum(np.concatenate([np.zeros(valeurs.shape[:-1] + (1,)), etendu], axis=-1), axis=-1)
+    return (cumul[..., fenetre:] - cumul[..., :-fenetre]) / fenetre
+
+
+def construire_table() -> np.ndarray:
+    """Normales journalières (régions, 366, variables) du modèle climatique documenté"""
+    jours_an = np.arange(1, JOURS_AN + 1)
+    cycle = AMPLITUDE_ANNUELLE * np.cos(2 * np.pi * (jours_an - JOUR_MAXIMUM) / 365.25)
+    table = np.empty((len(REGIONS), JOURS_AN, len(VARIABLES)), dtype=np.float32)
+    for i, region in enumerate(REGIONS):
+        normales = NORMALES_REGIONS[region]
+        mensuel = np.asarray(PART_PLUIE_MENSUELLE[region], dtype=float)
+        quotidien = _lisser(np.repeat(mensuel / mensuel.sum() / JOURS_PAR_MOIS, JOURS_PAR_MOIS))
+        table[i, :, 0] = normales["temperature"] + cycle
+        table[i, :, 1] = table[i, :, 0] + normales["demi_amplitude"]
+        # 29 février des années bissextiles : la pluie du 31 décembre
+        table[i, :, 2] = normales["pluie"] * np.append(quotidien, quotidien[-1])
+    return table
+
+
+def construire_table_archive(premiere_annee: int, derniere_annee: int) -> np.ndarray:
+    """Normales journalières calculées sur l'archive Open-Meteo (réanalyse ERA5) ; nécessite le réseau"""
+    import requests
+
+    from meteo import REGIONS_COORDINATES
+
+    table = np.empty((len(REGIONS), JOURS_AN, len(VARIABLES)), dtype=np.float32)
+    for i, region in enumerate(REGIONS):
+        response = requests.get(URL_ARCHIVE, params={
+            "latitude": REGIONS_COORDINATES[region]["lat"],
+            "longitude": REGIONS_COORDINATES[region]["lon"],
+            "start_date": f"{premiere_annee}-01-01",
+            "end_date": f"{derniere_annee}-12-31",
+            "daily": "temperature_2m_mean,temperature_2m_max,precipitation_sum",
+            "timezone": "Africa/Lome"
+        }, timeout=120)
+        response.raise_for_status()
+        quotidien = pd.DataFrame(response.json()["daily"])
+        jour_an = pd.to_datetime(quotidien["time"]).dt.dayofyear
+        moyennes = quotidien.groupby(jour_an)[["temperature_2m_mean", "temperature_2m_max", "precipitation_sum"]].mean()
+        moyennes = moyennes.reindex(range(1, JOURS_AN + 1)).interpolate(limit_direction="both")
+        table[i] = _lisser(moyennes.to_numpy().T).T
+    return table
+
+
+@lru_cache(maxsize=4)
+def charger_table(chemin: str = CHEMIN_CLIMATOLOGIE) -> np.ndarray:
+    """Table ouverte en mémoire partagée ; recalculée depuis le modèle si le fichier manque ou ne convient pas"""
+    try:
+        table = np.load(chemin, mmap_mode="r")
+    except (OSError, ValueError):
+        return construire_table()
+    if table.shape != (len(REGIONS), JOURS_AN, len(VARIABLES)):
+        return construire_table()
+    return table
+
+
+def normales_periode(region: str, debut: Optional[date] = None, jours: int = 7,
+                     chemin: str = CHEMIN_CLIMATOLOGIE) -> np.ndarray:
+    """Normales (jours, variables) de la région à partir de `debut` (aujourd'hui par défaut)"""
+    indices = pd.date_range(debut or date.today(), periods=jours).dayofyear.to_numpy() - 1
+    return np.asarray(charger_table(chemin)[REGIONS.index(region), indices], dtype=float)
+
+
+def meteo_normale(region: str, jour: Optional[date] = None, jours: int = 7) -> Dict:
+    """Normales au format de meteo.meteo_region : température maximale moyenne et cumul de pluie sur `jours`"""
+    normales = normales_periode(region, jour, jours)
+    return {
+        "source": "climatologie",
+        "temperature_actuelle": round(float(normales[0, 0]), 1),
+        "temperature_moyenne": round(float(normales[:, 1].mean()), 1),
+        "precipitation_cumul": round(float(normales[:, 2].sum()), 1)
+    }
+
+
+def normales_cycle(region: str, culture: str, date_semis: date) -> Dict:
+    """Durée, température moyenne et cumul de pluie normaux du semis à la maturité"""
+    normales = normales_periode(region, date_semis, JOURS_MAX)
+    jours = dates_recolte([date_semis], [culture], None, temperatures=normales[None, :, 0])["jours"].iloc[0]
+    # Sans maturité dans l'année, la saison entière
+    n = JOURS_MAX if np.isnan(jours) else int(jours)
+    return {
+        "jours": n,
+        "temperature_moyenne": round(float(normales[:n, 0].mean()), 1),
+        "pluviometrie": round(float(normales[:n, 2].sum()), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construit la table des normales climatiques journalières")
+    parser.add_argument("--sortie", default=CHEMIN_CLIMATOLOGIE)
+    parser.add_argument("--archive", type=int, nargs=2, metavar=("PREMIERE", "DERNIERE"),
+                        help="Années de l'archive Open-Meteo (réseau nécessaire) ; sinon le modèle documenté")
+    args = parser.parse_args()
+
+    table = construire_table_archive(*args.archive) if args.archive else construire_table()
+    np.save(args.sortie, table)
+    cumuls = table[:, :365, 2].sum(axis=1)
+    for region, temperature, cumul in zip(REGIONS, table[:, :, 0].mean(axis=1), cumuls):
+        print(f"{region:10s} {temperature:5.1f} °C  {cumul:7.0f} mm/an")
+    print(f"Table {table.shape} écrite dans {args.sortie} ({table.nbytes / 1e3:.0f} ko)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""Surveillance de la dérive des entrées par rapport aux données d'entraînement.
+
+`train_modele.py` enregistre, à côté du modèle, des résumés de référence :
+histogrammes des variables numériques sur les déciles d'entraînement et
+fréquences des modalités, pour l'ensemble et pour chaque région. En service,
+`moniteur()` tient les mêmes résumés pour les entrées reçues, en mémoire
+constante (compteurs sur les bornes de référence, réservoir d'échantillons
+pour les quantiles), et calcule un indice de stabilité de population (PSI)
+par variable et par région :
+
+    PSI = somme (p_obs - p_ref) * ln(p_obs / p_ref)
+    < 0,1 stable ; 0,1 - 0,25 dérive modérée ; > 0,25 dérive forte
+"""
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from donnees import CHEMIN_DONNEES
+from metriques import REGISTRE
+from predict import CHEMIN_MODELE
+
+NUMERIQUES = ["surface_ha", "pluviometrie_mm", "temperature_moyenne_c"]
+CATEGORIELLES = ["region", "culture", "type_sol"]
+TOUTES = "Toutes"
+
+N_CLASSES = 10
+QUANTILES = (0.1, 0.5, 0.9)
+TAILLE_RESERVOIR = 2048
+TAILLE_TAMPON = 256
+# En deçà, l'échantillon est trop petit pour un PSI significatif
+OBSERVATIONS_MIN = 50
+SEUIL_MODERE, SEUIL_FORT = 0.1, 0.25
+
+PSI = REGISTRE.jauge(
+    "prevision_derive_psi", "Indice de stabilité (PSI) des entrées par rapport à l'entraînement", ("variable", "region")
+)
+OBSERVATIONS = REGISTRE.jauge("prevision_derive_observations", "Parcelles observées par le moniteur de dérive")
+
+
+def chemin_reference(chemin_modele: str = CHEMIN_MODELE) -> str:
+    return os.path.splitext(chemin_modele)[0] + ".reference.json"
+
+
+def _proportions(comptes: np.ndarray) -> List[float]:
+    total = comptes.sum()
+    return (comptes / total).tolist() if total else [0.0] * len(comptes)
+
+
+def construire_reference(X: pd.DataFrame) -> Dict:
+    """Résumés des entrées d'entraînement : bornes de classes, proportions, quantiles"""
+    regions = sorted(X["region"].astype(str).unique())
+    reference = {"lignes": len(X), "regions": regions, "numeriques": {}, "categorielles": {}}
+
+    for variable in NUMERIQUES:
+        valeurs = X[variable].to_numpy(dtype=float)
+        # Bornes intérieures : déciles (dédoublonnés) ; les classes extrêmes sont ouvertes
+        bornes = np.unique(np.quantile(valeurs, np.linspace(0, 1, N_CLASSES + 1)[1:-1]))
+        classes = np.searchsorted(bornes, valeurs, side="right")
+        reference["numeriques"][variable] = {
+            "bornes": bornes.tolist(),
+            "quantiles": np.quantile(valeurs, QUANTILES).tolist(),
+            "proportions": {
+                TOUTES: _proportions(np.bincount(classes, minlength=len(bornes) + 1)),
+                **{r: _proportions(np.bincount(classes[X["region"].to_numpy() == r], minlength=len(bornes) + 1))
+                   for r in regions}
+            }
+        }
+
+    for variable in CATEGORIELLES:
+        modalites = sorted(X[variable].astype(str).unique())
+        proportions = {TOUTES: X[variable].astype(str).value_counts(normalize=True).reindex(modalites, fill_value=0)}
+        if variable != "region":
+            for region, groupe in X.groupby("region")[variable]:
+                proportions[str(region)] = groupe.astype(str).value_counts(normalize=True).reindex(modalites, fill_value=0)
+        reference["categorielles"][variable] = {
+            "modalites": modalites,
+            "proportions": {r: p.tolist() for r, p in proportions.items()}
+        }
+    return reference
+
+
+def enregistrer_reference(reference: Dict, chemin_modele: str = CHEMIN_MODELE) -> str:
+    chemin = chemin_reference(chemin_modele)
+    with open(chemin, "w", encoding="utf-8") as f:
+        json.dump(reference, f, ensure_ascii=False)
+    return chemin
+
+
+def charger_reference(chemin_modele: str = CHEMIN_MODELE) -> Optional[Dict]:
+    """Référence enregistrée avec le modèle ; à défaut, recalculée sur le jeu d'entraînement"""
+    chemin = chemin_reference(chemin_modele)
+    if os.path.exists(chemin):
+        with open(chemin, encoding="utf-8") as f:
+            return json.load(f)
+    if os.path.exists(CHEMIN_DONNEES):
+        return construire_reference(pd.read_csv(CHEMIN_DONNEES))
+    return None
+
+
+def psi(observe: np.ndarray, reference: np.ndarray) -> float:
+    """Indice de stabilité de population entre comptes observés et proportions de référence"""
+    # Lissage : une classe vide de part et d'autre ne rend pas l'indice infini
+    p_obs = (observe + 0.5) / (observe.sum() + 0.5 * len(observe))
+    p_ref = np.maximum(np.asarray(reference, dtype=float), 1e-4)
+    p_ref = p_ref / p_ref.sum()
+    return float(np.sum((p_obs - p_ref) * np.log(p_obs / p_ref)))
+
+
+class MoniteurDerive:
+    """Résumés en flux des entrées reçues, en mémoire constante.
+
+    Les parcelles isolées (`observer_lignes`) sont mises en tampon puis
+    intégrées par lots de TAILLE_TAMPON : une prédiction ne paie qu'un ajout à
+    une liste. Les scores ne sont calculés qu'à la lecture (`scores`).
+    """
+
+    def __init__(self, reference: Dict, taille_reservoir: int = TAILLE_RESERVOIR, graine: int = 0):
+        self.reference = reference
+        self.regions = reference["regions"]
+        self._bornes = {v: np.asarray(d["bornes"]) for v, d in reference["numeriques"].items()}
+        self._modalites = {v: pd.Index(d["modalites"]) for v, d in reference["categorielles"].items()}
+        self._verrou = threading.Lock()
+        self._rng = np.random.default_rng(graine)
+        self.taille_reservoir = taille_reservoir
+        self.reinitialiser()
+
+    def reinitialiser(self) -> None:
+        n_regions = len(self.regions)
+        with self._verrou:
+            self.n = 0
+            self._tampon: List[Dict] = []
+            # Ligne supplémentaire : régions inconnues de l'entraînement
+            self._histogrammes = {v: np.zeros((n_regions + 1, len(b) + 1)) for v, b in self._bornes.items()}
+            self._comptes = {v: np.zeros((n_regions + 1, len(m) + 1)) for v, m in self._modalites.items()}
+            self._reservoirs = {v: np.empty(self.taille_reservoir) for v in self._bornes}
+
+    def observer_lignes(self, lignes: List[Dict]) -> None:
+        """Parcelles (dictionnaires) reçues par un chemin de prédiction unitaire"""
+        with self._verrou:
+            self._tampon.extend(lignes)
+            if len(self._tampon) >= TAILLE_TAMPON:
+                self._vider_tampon()
+
+    def observer(self, data: pd.DataFrame) -> None:
+        """Lot d'entrées (colonnes du modèle), intégré immédiatement"""
+        colonnes = {v: data[v].to_numpy() for v in NUMERIQUES + CATEGORIELLES}
+        with self._verrou:
+            self._integrer(colonnes)
+
+    def _vider_tampon(self) -> None:
+        if self._tampon:
+            lignes, self._tampon = self._tampon, []
+            self._integrer({v: np.array([ligne[v] for ligne in lignes]) for v in NUMERIQUES + CATEGORIELLES})
+
+    def _integrer(self, colonnes: Dict[str, np.ndarray]) -> None:
+        # Appelé verrou tenu
+        m = len(colonnes["region"])
+        if m == 0:
+            return
+        # Codes des modalités ; inconnues de l'entraînement : dernière classe
+        modalites = {}
+        for v, connues in self._modalites.items():
+            codes = connues.get_indexer(colonnes[v])
+            modalites[v] = np.where(codes < 0, len(connues), codes)
+        regions = modalites["region"]
+        valeurs = {v: colonnes[v].astype(float) for v in self._bornes}
+
+        for v, b in self._bornes.items():
+            self._ajouter(self._histogrammes[v], regions, np.searchsorted(b, valeurs[v], side="right"))
+        for v, c in modalites.items():
+            self._ajouter(self._comptes[v], regions, c)
+        # Réservoir (algorithme R, vectorisé) : échantillon uniforme de toutes les entrées vues
+        rangs = self.n + np.arange(m)
+        remplissage = rangs < self.taille_reservoir
+        tirages = self._rng.integers(0, rangs + 1)
+        retenus = ~remplissage & (tirages < self.taille_reservoir)
+        for v, x in valeurs.items():
+            self._reservoirs[v][rangs[remplissage]] = x[remplissage]
+            self._reservoirs[v][tirages[retenus]] = x[retenus]
+        self.n += m
+
+    @staticmethod
+    def _ajouter(comptes: np.ndarray, lignes: np.ndarray, classes: np.ndarray) -> None:
+        comptes += np.bincount(lignes * comptes.shape[1] + classes, minlength=comptes.size).reshape(comptes.shape)
+
+    def scores(self) -> pd.DataFrame:
+        """PSI par variable (lignes) et région (colonnes) ; NaN si trop peu d'observations"""
+        with self._verrou:
+            self._vider_tampon()
+            histogrammes = {v: h.copy() for v, h in self._histogrammes.items()}
+            comptes = {v: c.copy() for v, c in self._comptes.items()}
+
+        colonnes = [TOUTES] + self.regions
+        resultat = pd.DataFrame(np.nan, index=NUMERIQUES + CATEGORIELLES, columns=colonnes)
+        for v, h in histogrammes.items():
+            reference = self.reference["numeriques"][v]["proportions"]
+            for j, region in enumerate(colonnes):
+                observe = h.sum(axis=0) if region == TOUTES else h[j - 1]
+                if observe.sum() >= OBSERVATIONS_MIN:
+                    resultat.loc[v, region] = psi(observe, reference[region])
+        for v, c in comptes.items():
+            reference = self.reference["categorielles"][v]["proportions"]
+            for j, region in enumerate(colonnes):
+                if region not in reference:
+                    continue
+                observe = c.sum(axis=0) if region == TOUTES else c[j - 1]
+                # Modalités inconnues de l'entraînement : classe supplémentaire de référence nulle
+                if observe.sum() >= OBSERVATIONS_MIN:
+                    resultat.loc[v, region] = psi(observe, reference[region] + [0.0])
+        return resultat
+
+    def quantiles(self) -> pd.DataFrame:
+        """Quantiles observés (réservoir) et d'entraînement des variables numériques"""
+        with self._verrou:
+            self._vider_tampon()
+            n = min(self.n, self.taille_reservoir)
+            echantillons = {v: r[:n].copy() for v, r in self._reservoirs.items()}
+        lignes = []
+        for v, echantillon in echantillons.items():
+            observes = np.quantile(echantillon, QUANTILES) if n else [np.nan] * len(QUANTILES)
+            for q, obs, ref in zip(QUANTILES, observes, self.reference["numeriques"][v]["quantiles"]):
+                lignes.append({"variable": v, "quantile": f"p{int(q * 100)}", "entrainement": ref, "observe": obs})
+        return pd.DataFrame(lignes)
+
+    def alertes(self, seuil: float = SEUIL_MODERE) -> pd.DataFrame:
+        """Couples (variable, région) dont le PSI dépasse le seuil, du plus fort au plus faible"""
+        scores = self.scores().stack().rename("psi").reset_index()
+        scores.columns = ["variable", "region", "psi"]
+        return scores[scores["psi"] > seuil].sort_values("psi", ascending=False).reset_index(drop=True)
+
+
+_moniteurs: Dict[str, MoniteurDerive] = {}
+_verrou_moniteurs = threading.Lock()
+
+
+def moniteur(chemin_modele: str = CHEMIN_MODELE) -> Optional[MoniteurDerive]:
+    """Moniteur du processus pour un modèle (créé au premier appel ; None sans référence)"""
+    if chemin_modele not in _moniteurs:
+        with _verrou_moniteurs:
+            if chemin_modele not in _moniteurs:
+                reference = charger_reference(chemin_modele)
+                _moniteurs[chemin_modele] = MoniteurDerive(reference) if reference else None
+    return _moniteurs[chemin_modele]
+
+
+def observer_lignes(lignes: List[Dict], chemin_modele: str = CHEMIN_MODELE) -> None:
+    """Point d'entrée des chemins de prédiction : parcelles réellement reçues (pas les scénarios)"""
+    suivi = moniteur(chemin_modele)
+    if suivi is not None:
+        suivi.observer_lignes(lignes)
+
+
+def observer(data: pd.DataFrame, chemin_modele: str = CHEMIN_MODELE) -> None:
+    """Comme `observer_lignes`, pour un lot de parcelles en DataFrame"""
+    suivi = moniteur(chemin_modele)
+    if suivi is not None:
+        suivi.observer(data)
+
+
+def _collecter() -> None:
+    for suivi in list(_moniteurs.values()):
+        if suivi is None:
+            continue
+        # scores() intègre d'abord le tampon : n est à jour ensuite
+        for (variable, region), valeur in suivi.scores().stack().dropna().items():
+            PSI.fixer(round(valeur, 6), variable=variable, region=region)
+        OBSERVATIONS.fixer(suivi.n)
+
+
+REGISTRE.avant_collecte(_collecter)
@@ -0,0 +1,100 @@
+import hashlib
+import os
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# Jeu de données d'entraînement (même chemin que train_modele.py)
+CHEMIN_DONNEES = "donnees_agricoles_togo.csv"
+
+REGIONS = ["Maritime", "Plateaux", "Centrale", "Kara", "Savanes"]
+CULTURES = ["Maïs", "Sorgho", "Mil"]
+
+# Mémo des empreintes : (chemin, taille, date de modification) -> sha256
+_empreintes: Dict[Tuple[str, int, int], str] = {}
+
+
+def empreinte_fichier(chemin: str) -> Optional[str]:
+    """Empreinte SHA-256 du contenu d'un fichier (None si absent).
+
+    Le fichier n'est relu que si sa taille ou sa date de modification change,
+    ce qui rend l'appel quasi gratuit à chaque rerun.
+    """
+    try:
+        stat = os.stat(chemin)
+    except OSError:
+        return None
+
+    cle = (os.path.abspath(chemin), stat.st_size, stat.st_mtime_ns)
+    if cle not in _empreintes:
+        h = hashlib.sha256()
+        with open(chemin, "rb") as f:
+            for bloc in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloc)
+        _empreintes[cle] = h.hexdigest()
+    return _empreintes[cle]
+
+
+def empreinte_dataframe(df: pd.DataFrame) -> str:
+    """Empreinte du contenu d'un DataFrame (historique des prévisions)."""
+    valeurs = pd.util.hash_pandas_object(df, index=False).values
+    return hashlib.sha256(valeurs.tobytes()).hexdigest()
+
+
+def agreger_rendements(df: pd.DataFrame, colonne_rendement: str) -> pd.DataFrame:
+    """Somme et effectif des rendements par région et culture.
+
+    On garde somme et effectif (plutôt que la moyenne) pour pouvoir combiner
+    plusieurs sources sans relire les données brutes.
+    """
+    agregat = (
+        df.groupby(["region", "culture"], observed=True)[colonne_rendement]
+        .agg(["sum", "count"])
+        .rename(columns={"sum": "somme", "count": "effectif"})
+        .reset_index()
+    )
+    return agregat
+
+
+def agreger_fichier(chemin: str = CHEMIN_DONNEES, taille_bloc: int = 500_000) -> pd.DataFrame:
+    """Agrège le jeu d'entraînement par blocs, sans le charger entièrement."""
+    morceaux: List[pd.DataFrame] = []
+    lecteur = pd.read_csv(
+        chemin,
+        usecols=["region", "culture", "rendement_t_ha"],
+        dtype={"region": "category", "culture": "category"},
+        chunksize=taille_bloc,
+    )
+    for bloc in lecteur:
+        morceaux.append(agreger_rendements(bloc, "rendement_t_ha"))
+
+    if not morceaux:
+        return pd.DataFrame(columns=["region", "culture", "somme", "effectif"])
+    return (
+        pd.concat(morceaux, ignore_index=True)
+        .astype({"region": str, "culture": str})
+        .groupby(["region", "culture"], as_index=False)[["somme", "effectif"]]
+        .sum()
+    )
+
+
+def combiner_agregats(*agregats: pd.DataFrame) -> pd.DataFrame:
+    """Fusionne des agrégats (somme, effectif) et calcule le rendement moyen."""
+    non_vides = [a for a in agregats if a is not None and not a.empty]
+    if not non_vides:
+        return pd.DataFrame(columns=["Région", "Culture", "Rendement", "Effectif"])
+
+    total = (
+        pd.concat(non_vides, ignore_index=True)
+        .groupby(["region", "culture"], as_index=False)[["somme", "effectif"]]
+        .sum()
+    )
+    total["Rendement"] = total["somme"] / total["effectif"]
+    total = total.rename(columns={"region": "Région", "culture": "Culture", "effectif": "Effectif"})
+
+    # Ordre d'affichage habituel des régions (du sud au nord) et des cultures
+    for colonne, ordre in (("Région", REGIONS), ("Culture", CULTURES)):
+        autres = sorted(set(total[colonne]) - set(ordre))
+        total[colonne] = pd.Categorical(total[colonne], categories=ordre + autres, ordered=True)
+    total = total.sort_values(["Région", "Culture"]).reset_index(drop=True)
+    return total[["Région", "Culture", "Rendement", "Effectif"]]
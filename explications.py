@@ -0,0 +1,227 @@
+"""Contributions de chaque variable à une prévision (valeurs de Shapley TreeSHAP).
+
+La valeur d'une coalition S de variables est l'espérance « chemin » de
+TreeSHAP : on suit la branche de la parcelle aux nœuds qui testent une
+variable de S, sinon on pondère les branches par leurs effectifs
+d'entraînement. Les colonnes one-hot d'une variable catégorielle forment un
+seul joueur : les contributions portent directement sur `region`, `culture`,
+`type_sol` et les variables numériques.
+
+Chaque feuille pèse, pour une coalition S, le produit sur les variables g de
+A_g (la parcelle respecte les tests de g sur le chemin) si g est dans S, de
+R_g (part des effectifs conservée par ces tests) sinon. La valeur de Shapley
+de ce jeu produit se lit sur le polynôme prod_g (R_g + A_g t) de chaque
+feuille : toutes les feuilles de tous les arbres sont traitées ensemble, en
+tableaux, sans énumérer les 2^6 coalitions.
+"""
+from functools import lru_cache
+from math import factorial
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from predict import CHEMIN_MODELE, COLONNES, charger_modele, version_modele
+
+N_VARIABLES = len(COLONNES)
+# Poids de Shapley d'une coalition de k autres variables
+POIDS_SHAPLEY = np.array([
+    factorial(k) * factorial(N_VARIABLES - k - 1) / factorial(N_VARIABLES) for k in range(N_VARIABLES)
+])
+
+# Tuile lignes x feuilles traitée ensemble (mémoire : ~250 Mo pour une forêt de 300 arbres de profondeur 12)
+LIGNES_BLOC = 1024
+FEUILLES_BLOC = 2048
+
+
+class StructureForet:
+    """Feuilles de tous les arbres, avec les tests de leur chemin regroupés par (feuille, variable)"""
+
+    def __init__(self, foret, groupes_colonnes: np.ndarray):
+        arbres = [estimateur.tree_ for estimateur in foret.estimators_]
+        decalages = np.cumsum([0] + [arbre.node_count for arbre in arbres])
+        gauche = np.concatenate([np.where(a.children_left >= 0, a.children_left + d, -1)
+                                 for a, d in zip(arbres, decalages)])
+        droite = np.concatenate([np.where(a.children_right >= 0, a.children_right + d, -1)
+                                 for a, d in zip(arbres, decalages)])
+        colonne = np.concatenate([np.maximum(a.feature, 0) for a in arbres])
+        seuil = np.concatenate([a.threshold for a in arbres])
+        effectif = np.concatenate([a.weighted_n_node_samples for a in arbres])
+        valeur = np.concatenate([a.value[:, 0, 0] for a in arbres])
+
+        parent = np.full(len(gauche), -1)
+        internes = np.flatnonzero(gauche >= 0)
+        parent[gauche[internes]] = internes
+        parent[droite[internes]] = internes
+
+        feuilles = np.flatnonzero(gauche < 0)
+        self.n_arbres = len(arbres)
+        self.valeur = valeur[feuilles]
+        self.n_feuilles = len(feuilles)
+
+        # Remontée simultanée de toutes les feuilles jusqu'aux racines
+        tests_feuille, tests_noeud, tests_gauche = [], [], []
+        log_ratios = np.zeros((self.n_feuilles, N_VARIABLES))
+        courant = feuilles.copy()
+        indices = np.arange(self.n_feuilles)
+        while len(courant):
+            p = parent[courant]
+            actifs = p >= 0
+            courant, p, indices = courant[actifs], p[actifs], indices[actifs]
+            tests_feuille.append(indices)
+            tests_noeud.append(p)
+            tests_gauche.append(gauche[p] == courant)
+            np.add.at(log_ratios, (indices, groupes_colonnes[colonne[p]]), np.log(effectif[courant] / effectif[p]))
+            courant = p
+        self.ratios = np.exp(log_ratios)
+
+        feuille = np.concatenate(tests_feuille)
+        noeud = np.concatenate(tests_noeud)
+        groupe = groupes_colonnes[colonne[noeud]]
+        ordre = np.lexsort((groupe, feuille))
+        self.test_colonne = colonne[noeud][ordre]
+        self.test_seuil = seuil[noeud][ordre]
+        self.test_gauche = np.concatenate(tests_gauche)[ordre]
+        cle = (feuille * N_VARIABLES + groupe)[ordre]
+        self.debuts_segments = np.flatnonzero(np.r_[True, cle[1:] != cle[:-1]])
+        self.segment_feuille = cle[self.debuts_segments] // N_VARIABLES
+        self.segment_groupe = cle[self.debuts_segments] % N_VARIABLES
+
+
+def _groupes_colonnes(preprocesseur) -> np.ndarray:
+    """Indice (dans COLONNES) de la variable d'origine de chaque colonne transformée"""
+    groupes = []
+    for _, transformeur, colonnes in preprocesseur.transformers_:
+        if transformeur == "drop" or len(colonnes) == 0:
+            continue
+        if hasattr(transformeur, "categories_"):
+            for colonne, valeurs in zip(colonnes, transformeur.categories_):
+                groupes.extend([COLONNES.index(colonne)] * len(valeurs))
+        else:
+            groupes.extend(COLONNES.index(colonne) for colonne in colonnes)
+    return np.array(groupes)
+
+
+def _contributions_feuilles(valeur: np.ndarray, R: np.ndarray, A: np.ndarray) -> np.ndarray:
+    """Contributions (entrées, variables) de feuilles de valeurs `valeur`, ratios R et indicatrices A"""
+    # G(t) = prod_g (R_g + A_g t) : le coefficient k somme les coalitions de k variables
+    G = [np.ones(len(R))] + [np.zeros(len(R))] * N_VARIABLES
+    for g in range(N_VARIABLES):
+        G = [G[0] * R[:, g]] + [G[k] * R[:, g] + G[k - 1] * A[:, g] for k in range(1, N_VARIABLES + 1)]
+
+    contributions = np.empty((len(R), N_VARIABLES))
+    for i in range(N_VARIABLES):
+        # Division de G par (R_i + A_i t) : coalitions des autres variables. Si A_i = 1, division
+        # depuis le terme de plus haut degré (stable car R_i <= 1) ; si A_i = 0, simple division par R_i.
+        R_i, A_i = R[:, i], A[:, i] > 0
+        quotient = [None] * N_VARIABLES
+        quotient[-1] = G[N_VARIABLES]
+        for k in range(N_VARIABLES - 1, 0, -1):
+            quotient[k - 1] = G[k] - R_i * quotient[k]
+        somme = np.zeros(len(R))
+        for k in range(N_VARIABLES):
+            somme += POIDS_SHAPLEY[k] * np.where(A_i, quotient[k], G[k] / R_i)
+        contributions[:, i] = valeur * (A_i - R_i) * somme
+    return contributions
+
+
+def shapley_foret(structure: StructureForet, Xt: np.ndarray) -> np.ndarray:
+    """Contributions (n_lignes, variables) et valeur de base (n_lignes,) de la forêt.
+
+    Une feuille ne dépend de la parcelle que par son motif : l'ensemble des
+    variables dont la parcelle respecte les tests du chemin (au plus 2^6
+    motifs). Le calcul parcourt des tuiles lignes x feuilles ; dans une tuile,
+    chaque couple (feuille, motif) présent n'est calculé qu'une fois puis relu
+    pour toutes les lignes qui le partagent : le coût par ligne baisse avec la
+    taille du lot.
+    """
+    # Comparaisons identiques à sklearn (float32) ; une ligne par colonne, les parcelles contiguës
+    XT = np.ascontiguousarray(np.asarray(Xt, dtype=np.float32).T)
+    contributions = np.zeros((len(Xt), N_VARIABLES))
+    n_motifs = 2 ** N_VARIABLES
+    fins_segments = np.append(structure.debuts_segments, len(structure.test_colonne))
+
+    for premiere in range(0, structure.n_feuilles, FEUILLES_BLOC):
+        derniere = min(premiere + FEUILLES_BLOC, structure.n_feuilles)
+        s0, s1 = np.searchsorted(structure.segment_feuille, [premiere, derniere])
+        t0, t1 = fins_segments[s0], fins_segments[s1]
+        colonnes, seuils, gauches = (structure.test_colonne[t0:t1], structure.test_seuil[t0:t1],
+                                     structure.test_gauche[t0:t1])
+        feuille_segment = structure.segment_feuille[s0:s1] - premiere
+        groupe_segment = structure.segment_groupe[s0:s1]
+        debuts = structure.debuts_segments[s0:s1] - t0
+        n = derniere - premiere
+
+        for debut in range(0, len(Xt), LIGNES_BLOC):
+            X = XT[:, debut:debut + LIGNES_BLOC]
+            # Bit g du motif à 0 si la parcelle enfreint un test de la variable g sur le chemin de la feuille
+            respecte = (X[colonnes] <= seuils[:, None]) == gauches[:, None]
+            echecs = ~np.logical_and.reduceat(respecte, debuts, axis=0)
+            motifs = np.full((n, X.shape[1]), n_motifs - 1, dtype=np.int32)
+            for g in range(N_VARIABLES):
+                segments = groupe_segment == g
+                motifs[feuille_segment[segments]] -= echecs[segments].astype(np.int32) << g
+            couples = motifs + np.arange(0, n * n_motifs, n_motifs, dtype=np.int32)[:, None]
+
+            # Couples présents dans la tuile, numérotés sans tri
+            present = np.zeros(n * n_motifs, dtype=bool)
+            present[couples.ravel()] = True
+            distincts = np.flatnonzero(present)
+            feuilles = premiere + distincts // n_motifs
+            A = ((distincts[:, None] % n_motifs >> np.arange(N_VARIABLES)) & 1).astype(float)
+            numeros = np.empty(n * n_motifs, dtype=np.int32)
+            numeros[distincts] = np.arange(len(distincts), dtype=np.int32)
+            phi = _contributions_feuilles(structure.valeur[feuilles], structure.ratios[feuilles], A)
+            contributions[debut:debut + X.shape[1]] += phi[numeros[couples]].sum(axis=0)
+
+    base = (structure.valeur * structure.ratios.prod(axis=1)).sum() / structure.n_arbres
+    return contributions / structure.n_arbres, np.full(len(Xt), base)
+
+
+def contributions_pipeline(pipeline, data: pd.DataFrame, structure: Optional[StructureForet] = None) -> pd.DataFrame:
+    """Contribution de chaque variable (t/ha) et valeur de base, une ligne par parcelle"""
+    preprocesseur = pipeline[:-1]
+    if structure is None:
+        structure = StructureForet(pipeline[-1], _groupes_colonnes(preprocesseur[-1]))
+    Xt = preprocesseur.transform(data[COLONNES])
+    if hasattr(Xt, "toarray"):
+        Xt = Xt.toarray()
+    phi, base = shapley_foret(structure, Xt)
+    contributions = pd.DataFrame(phi, columns=COLONNES, index=data.index)
+    contributions["base"] = base
+    return contributions
+
+
+def contributions_modele(modele, data: pd.DataFrame, structures: Dict) -> pd.DataFrame:
+    """Pipeline ou routeur de sous-modèles : chaque ligne est expliquée par le modèle qui la prédit"""
+    if not hasattr(modele, "_affecter"):
+        if None not in structures:
+            structures[None] = StructureForet(modele[-1], _groupes_colonnes(modele[0]))
+        return contributions_pipeline(modele, data, structures[None])
+
+    X = data[COLONNES].reset_index(drop=True)
+    resultat = pd.DataFrame(0.0, index=X.index, columns=COLONNES + ["base"])
+    for niveau, cle, positions in modele._affecter(X):
+        sous_modele = modele.modeles[niveau][cle]
+        if (niveau, cle) not in structures:
+            structures[(niveau, cle)] = StructureForet(sous_modele[-1], _groupes_colonnes(sous_modele[0]))
+        resultat.iloc[positions] = contributions_pipeline(
+            sous_modele, X.iloc[positions], structures[(niveau, cle)]
+        ).to_numpy()
+    resultat.index = data.index
+    return resultat
+
+
+@lru_cache(maxsize=2)
+def _structures(chemin: str, version: Optional[str]) -> Dict:
+    # Structures des forêts, construites à la première explication puis conservées
+    return {}
+
+
+def expliquer_lot(data: pd.DataFrame, chemin: str = CHEMIN_MODELE) -> pd.DataFrame:
+    """Contributions pour un lot de parcelles, avec le pickle scikit-learn enregistré.
+
+    Pour chaque ligne : base + somme des contributions = prédiction du modèle.
+    """
+    modele = charger_modele(chemin, "sklearn")
+    return contributions_modele(modele, data, _structures(chemin, version_modele(chemin, "sklearn")))
@@ -0,0 +1,247 @@
+"""File de travaux persistante pour la prévision de fichiers de parcelles.
+
+Les travaux sont enregistrés dans une base SQLite (`TRAVAUX_DOSSIER/file.sqlite3`),
+les parcelles validées dans un fichier par travail. Des processus workers
+réservent les travaux un par un, les prédisent par tranches en mettant à jour
+l'avancement, et écrivent les résultats en CSV. Un travail dont le worker a
+disparu (plus de battement depuis DELAI_ABANDON) est repris par un autre.
+
+Workers autonomes (sinon l'interface en lance TRAVAUX_WORKERS, 1 par défaut) :
+    python file_travaux.py --workers 2
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from predict import BORNES_ENTREES, CHEMIN_MODELE, COLONNES, ErreurValidation, charger_modele, predict_lot
+
+logger = logging.getLogger("file_travaux")
+
+DOSSIER_TRAVAUX = os.environ.get("TRAVAUX_DOSSIER", "travaux")
+TAILLE_TRANCHE = 5_000
+# Un travail « en cours » sans battement depuis ce délai est repris (worker arrêté)
+DELAI_ABANDON = 120.0
+CONSERVATION_JOURS = 7
+
+EN_ATTENTE, EN_COURS, TERMINE, ECHEC = "en attente", "en cours", "terminé", "échec"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS travaux (
+    id TEXT PRIMARY KEY,
+    nom TEXT NOT NULL,
+    statut TEXT NOT NULL,
+    lignes INTEGER NOT NULL,
+    traitees INTEGER NOT NULL DEFAULT 0,
+    soumis REAL NOT NULL,
+    debut REAL,
+    fin REAL,
+    battement REAL,
+    erreur TEXT
+)
+"""
+
+
+def _connexion(dossier: str) -> sqlite3.Connection:
+    os.makedirs(dossier, exist_ok=True)
+    # Autocommit : les transactions sont ouvertes explicitement (BEGIN IMMEDIATE)
+    connexion = sqlite3.connect(os.path.join(dossier, "file.sqlite3"), timeout=30, isolation_level=None)
+    connexion.row_factory = sqlite3.Row
+    connexion.execute("PRAGMA journal_mode=WAL")
+    connexion.execute(_SCHEMA)
+    return connexion
+
+
+def _chemin_entree(dossier: str, id_travail: str) -> str:
+    return os.path.join(dossier, f"{id_travail}.entree.pkl")
+
+
+def chemin_resultats(dossier: str, id_travail: str) -> str:
+    return os.path.join(dossier, f"{id_travail}.resultats.csv")
+
+
+def valider_tableau(df: pd.DataFrame, categories: Dict[str, List[str]]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Validation vectorisée d'un fichier de parcelles.
+
+    Renvoie les lignes valides (colonnes du modèle converties, autres colonnes
+    conservées) et les erreurs (ligne du fichier, message) des autres lignes.
+    """
+    manquantes = [c for c in COLONNES if c not in df.columns]
+    if manquantes:
+        raise ErreurValidation([f"colonne obligatoire absente : {c}" for c in manquantes])
+
+    df = df.reset_index(drop=True).copy()
+    messages = pd.Series("", index=df.index)
+    for colonne, valeurs in categories.items():
+        texte = df[colonne].astype("string").str.strip()
+        inconnues = ~texte.isin(valeurs).fillna(False).to_numpy(dtype=bool)
+        messages[inconnues] += f"{colonne} : valeur inconnue (attendu : {', '.join(valeurs)}) ; "
+        df[colonne] = texte.astype(object)
+
+    for colonne, (bas, haut) in BORNES_ENTREES.items():
+        valeurs = pd.to_numeric(df[colonne], errors="coerce").to_numpy(dtype=float)
+        manquant = np.isnan(valeurs)
+        hors_bornes = ~manquant & ((valeurs < bas) | (valeurs > haut))
+        messages[manquant] += f"{colonne} : nombre attendu ; "
+        messages[hors_bornes] += f"{colonne} : hors bornes [{bas}, {haut}] ; "
+        df[colonne] = valeurs
+
+    invalides = (messages != "").to_numpy()
+    erreurs = pd.DataFrame({
+        # Numéro de ligne du fichier (en-tête = ligne 1)
+        "ligne": np.flatnonzero(invalides) + 2,
+        "erreurs": messages[invalides].str.rstrip(" ;").to_numpy()
+    })
+    return df[~invalides].reset_index(drop=True), erreurs
+
+
+def soumettre(df: pd.DataFrame, nom: str, dossier: str = DOSSIER_TRAVAUX) -> str:
+    """Enregistre des parcelles validées et place le travail dans la file ; renvoie son identifiant"""
+    id_travail = uuid.uuid4().hex
+    with closing(_connexion(dossier)) as connexion:
+        df.to_pickle(_chemin_entree(dossier, id_travail))
+        connexion.execute(
+            "INSERT INTO travaux (id, nom, statut, lignes, soumis) VALUES (?, ?, ?, ?, ?)",
+            (id_travail, nom, EN_ATTENTE, len(df), time.time())
+        )
+    return id_travail
+
+
+def etat_travaux(ids: List[str], dossier: str = DOSSIER_TRAVAUX) -> pd.DataFrame:
+    """État des travaux demandés, du plus récent au plus ancien"""
+    colonnes = ["id", "nom", "statut", "lignes", "traitees", "soumis", "debut", "fin", "erreur"]
+    if not ids:
+        return pd.DataFrame(columns=colonnes)
+    with closing(_connexion(dossier)) as connexion:
+        lignes = connexion.execute(
+            f"SELECT {', '.join(colonnes)} FROM travaux WHERE id IN ({', '.join('?' * len(ids))}) "
+            "ORDER BY soumis DESC", ids
+        ).fetchall()
+    return pd.DataFrame([dict(ligne) for ligne in lignes], columns=colonnes)
+
+
+def reserver(dossier: str = DOSSIER_TRAVAUX) -> Optional[Dict]:
+    """Attribue au worker appelant le plus ancien travail en attente (ou abandonné)"""
+    maintenant = time.time()
+    with closing(_connexion(dossier)) as connexion:
+        connexion.execute("BEGIN IMMEDIATE")
+        ligne = connexion.execute(
+            "SELECT id, nom, lignes FROM travaux WHERE statut = ? OR (statut = ? AND battement < ?) "
+            "ORDER BY soumis LIMIT 1",
+            (EN_ATTENTE, EN_COURS, maintenant - DELAI_ABANDON)
+        ).fetchone()
+        if ligne is None:
+            connexion.execute("COMMIT")
+            return None
+        connexion.execute(
+            "UPDATE travaux SET statut = ?, traitees = 0, debut = ?, battement = ? WHERE id = ?",
+            (EN_COURS, maintenant, maintenant, ligne["id"])
+        )
+        connexion.execute("COMMIT")
+    return dict(ligne)
+
+
+def traiter(travail: Dict, dossier: str = DOSSIER_TRAVAUX, chemin_modele: str = CHEMIN_MODELE,
+            taille_tranche: int = TAILLE_TRANCHE) -> None:
+    """Prédit un travail réservé, tranche par tranche, avec mise à jour de l'avancement"""
+    id_travail = travail["id"]
+    partiel = chemin_resultats(dossier, id_travail) + ".partiel"
+    with closing(_connexion(dossier)) as connexion:
+        try:
+            df = pd.read_pickle(_chemin_entree(dossier, id_travail))
+            for debut in range(0, len(df), taille_tranche):
+                tranche = df.iloc[debut:debut + taille_tranche].copy()
+                tranche["rendement_t_ha"] = np.round(predict_lot(tranche, chemin_modele), 3)
+                tranche["production_t"] = np.round(tranche["rendement_t_ha"] * tranche["surface_ha"], 3)
+                tranche.to_csv(partiel, mode="w" if debut == 0 else "a", header=debut == 0, index=False)
+                connexion.execute(
+                    "UPDATE travaux SET traitees = ?, battement = ? WHERE id = ?",
+                    (debut + len(tranche), time.time(), id_travail)
+                )
+            os.replace(partiel, chemin_resultats(dossier, id_travail))
+            os.remove(_chemin_entree(dossier, id_travail))
+            connexion.execute("UPDATE travaux SET statut = ?, fin = ? WHERE id = ?",
+                              (TERMINE, time.time(), id_travail))
+        except Exception as e:
+            logger.exception("Échec du travail %s", id_travail)
+            if os.path.exists(partiel):
+                os.remove(partiel)
+            connexion.execute("UPDATE travaux SET statut = ?, fin = ?, erreur = ? WHERE id = ?",
+                              (ECHEC, time.time(), f"{type(e).__name__} : {e}", id_travail))
+
+
+def purger(dossier: str = DOSSIER_TRAVAUX, jours: float = CONSERVATION_JOURS) -> int:
+    """Supprime les travaux terminés (ou en échec) depuis plus de `jours` jours et leurs fichiers, partiels compris"""
+    limite = time.time() - jours * 86400
+    with closing(_connexion(dossier)) as connexion:
+        ids = [ligne["id"] for ligne in connexion.execute(
+            "SELECT id FROM travaux WHERE statut IN (?, ?) AND fin < ?", (TERMINE, ECHEC, limite)
+        )]
+        for id_travail in ids:
+            resultats = chemin_resultats(dossier, id_travail)
+            for chemin in (_chemin_entree(dossier, id_travail), resultats, resultats + ".partiel"):
+                if os.path.exists(chemin):
+                    os.remove(chemin)
+            connexion.execute("DELETE FROM travaux WHERE id = ?", (id_travail,))
+    return len(ids)
+
+
+def executer_worker(dossier: str = DOSSIER_TRAVAUX, chemin_modele: str = CHEMIN_MODELE,
+                    taille_tranche: int = TAILLE_TRANCHE, attente: float = 1.0) -> None:
+    """Boucle d'un worker : modèle chargé une fois, puis un travail après l'autre"""
+    charger_modele(chemin_modele)
+    while True:
+        travail = reserver(dossier)
+        if travail is None:
+            time.sleep(attente)
+            continue
+        logger.info("Travail %s (%d lignes)", travail["id"][:8], travail["lignes"])
+        traiter(travail, dossier, chemin_modele, taille_tranche)
+
+
+def demarrer_workers(n_workers: int, dossier: str = DOSSIER_TRAVAUX, chemin_modele: str = CHEMIN_MODELE,
+                     taille_tranche: int = TAILLE_TRANCHE, daemon: bool = True) -> List[multiprocessing.Process]:
+    """Workers en processus séparés (spawn : pas de fork d'un processus multi-fils comme Streamlit)"""
+    contexte = multiprocessing.get_context("spawn")
+    workers = [
+        contexte.Process(target=executer_worker, args=(dossier, chemin_modele, taille_tranche),
+                         name=f"travaux-{i}", daemon=daemon)
+        for i in range(n_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Workers de la file de travaux de prévision")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--dossier", default=DOSSIER_TRAVAUX)
+    parser.add_argument("--modele", default=CHEMIN_MODELE)
+    parser.add_argument("--tranche", type=int, default=TAILLE_TRANCHE, help="Lignes prédites par tranche")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(process)d %(asctime)s %(name)s %(levelname)s %(message)s")
+    if args.workers == 1:
+        executer_worker(args.dossier, args.modele, args.tranche)
+        return
+
+    workers = demarrer_workers(args.workers, args.dossier, args.modele, args.tranche, daemon=False)
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Générateur de jeux de données synthétiques, au schéma de donnees_agricoles_togo.csv.
+
+Les lois sont apprises sur le jeu réel :
+  - (région, culture, sol) : fréquences de chacune des combinaisons ;
+  - surface, pluie, température : quantiles empiriques de chaque région,
+    liés par une copule gaussienne (corrélations de la région) ;
+  - rendement : régression sur les variables (effets des modalités, termes
+    quadratiques et interactions avec la culture) plus un résidu tiré parmi
+    les résidus réels de la culture.
+
+L'écriture se fait par blocs (mémoire bornée) ; chaque bloc a son propre
+générateur aléatoire dérivé de la graine : même graine, même fichier.
+
+    python generer_donnees.py --lignes 10000000 --sortie synthetique_10M.csv
+    python generer_donnees.py --lignes 1000000 --sortie synthetique_1M.parquet --graine 7 --verifier
+"""
+import argparse
+import os
+import time
+from typing import Dict, Iterator
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+
+from donnees import CHEMIN_DONNEES
+
+CATEGORIELLES = ["region", "culture", "type_sol"]
+NUMERIQUES = ["surface_ha", "pluviometrie_mm", "temperature_moyenne_c"]
+CIBLE = "rendement_t_ha"
+
+N_QUANTILES = 201
+TAILLE_BLOC = 500_000
+
+
+def _decimales(valeurs: np.ndarray) -> int:
+    """Nombre de décimales des valeurs d'origine (pour écrire les mêmes)"""
+    for d in range(6):
+        if np.allclose(np.round(valeurs, d), valeurs, atol=1e-9):
+            return d
+    return 6
+
+
+def _plan(df: pd.DataFrame, niveaux: Dict[str, list]) -> np.ndarray:
+    """Variables de la régression du rendement"""
+    colonnes = [np.ones(len(df))]
+    for variable in CATEGORIELLES:
+        for modalite in niveaux[variable][1:]:
+            colonnes.append((df[variable].to_numpy() == modalite).astype(float))
+    numeriques = [df[v].to_numpy(dtype=float) for v in NUMERIQUES]
+    colonnes += numeriques + [x ** 2 for x in numeriques]
+    for modalite in niveaux["culture"][1:]:
+        indicatrice = (df["culture"].to_numpy() == modalite).astype(float)
+        colonnes += [indicatrice * x for x in numeriques]
+    return np.column_stack(colonnes)
+
+
+def apprendre(df: pd.DataFrame) -> Dict:
+    """Lois marginales et conditionnelles du jeu réel"""
+    niveaux = {v: sorted(df[v].astype(str).unique()) for v in CATEGORIELLES}
+    combinaisons = df.groupby(CATEGORIELLES).size()
+    modele = {
+        "niveaux": niveaux,
+        "combinaisons": combinaisons.index.to_frame(index=False),
+        "probabilites": (combinaisons / combinaisons.sum()).to_numpy(),
+        "decimales": {v: _decimales(df[v].to_numpy(dtype=float)) for v in NUMERIQUES + [CIBLE]},
+        "regions": {}
+    }
+
+    niveaux_q = np.linspace(0, 1, N_QUANTILES)
+    for region, groupe in df.groupby("region"):
+        valeurs = groupe[NUMERIQUES].to_numpy(dtype=float)
+        # Corrélations des rangs ramenés en scores normaux : la copule de la région
+        rangs = (pd.DataFrame(valeurs).rank().to_numpy() - 0.5) / len(groupe)
+        scores = ndtri(rangs)
+        modele["regions"][region] = {
+            "quantiles": np.quantile(valeurs, niveaux_q, axis=0),
+            "cholesky": np.linalg.cholesky(np.corrcoef(scores, rowvar=False) + 1e-9 * np.eye(len(NUMERIQUES)))
+        }
+
+    X = _plan(df, niveaux)
+    y = df[CIBLE].to_numpy(dtype=float)
+    coefficients, *_ = np.linalg.lstsq(X, y, rcond=None)
+    residus = y - X @ coefficients
+    modele["coefficients"] = coefficients
+    modele["residus"] = {c: residus[df["culture"].to_numpy() == c] for c in niveaux["culture"]}
+    modele["bornes_cible"] = (float(y.min()) * 0.5, float(y.max()) * 1.5)
+    return modele
+
+
+def generer_bloc(modele: Dict, n: int, rng: np.random.Generator) -> pd.DataFrame:
+    """n lignes synthétiques"""
+    tirage = rng.choice(len(modele["probabilites"]), size=n, p=modele["probabilites"])
+    bloc = modele["combinaisons"].iloc[tirage].reset_index(drop=True)
+
+    numeriques = np.empty((n, len(NUMERIQUES)))
+    niveaux_q = np.linspace(0, 1, N_QUANTILES)
+    for region, lois in modele["regions"].items():
+        lignes = np.flatnonzero(bloc["region"].to_numpy() == region)
+        u = ndtr(rng.standard_normal((len(lignes), len(NUMERIQUES))) @ lois["cholesky"].T)
+        for j in range(len(NUMERIQUES)):
+            numeriques[lignes, j] = np.interp(u[:, j], niveaux_q, lois["quantiles"][:, j])
+    for j, variable in enumerate(NUMERIQUES):
+        bloc[variable] = np.round(numeriques[:, j], modele["decimales"][variable])
+
+    rendement = _plan(bloc, modele["niveaux"]) @ modele["coefficients"]
+    for culture, residus in modele["residus"].items():
+        lignes = np.flatnonzero(bloc["culture"].to_numpy() == culture)
+        rendement[lignes] += rng.choice(residus, size=len(lignes))
+    bloc[CIBLE] = np.round(np.clip(rendement, *modele["bornes_cible"]), modele["decimales"][CIBLE])
+    return bloc
+
+
+def generer(modele: Dict, n_lignes: int, taille_bloc: int = TAILLE_BLOC, graine: int = 0) -> Iterator[pd.DataFrame]:
+    """Blocs successifs ; le bloc i ne dépend que de (graine, i) et de la taille des blocs"""
+    for i, debut in enumerate(range(0, n_lignes, taille_bloc)):
+        rng = np.random.default_rng([graine, i])
+        yield generer_bloc(modele, min(taille_bloc, n_lignes - debut), rng)
+
+
+def ecrire(blocs: Iterator[pd.DataFrame], sortie: str) -> int:
+    """Écrit les blocs en CSV ou en Parquet (selon l'extension) ; renvoie le nombre de lignes"""
+    n = 0
+    if sortie.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        ecrivain = None
+        try:
+            for bloc in blocs:
+                table = pa.Table.from_pandas(bloc, preserve_index=False)
+                if ecrivain is None:
+                    ecrivain = pq.ParquetWriter(sortie, table.schema)
+                ecrivain.write_table(table)
+                n += len(bloc)
+        finally:
+            if ecrivain is not None:
+                ecrivain.close()
+    else:
+        for i, bloc in enumerate(blocs):
+            bloc.to_csv(sortie, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            n += len(bloc)
+    return n
+
+
+def verifier(reel: pd.DataFrame, synthetique: pd.DataFrame) -> None:
+    """Comparaison des lois : PSI par variable et région, rendement moyen par région x culture"""
+    from derive import MoniteurDerive, construire_reference
+
+    suivi = MoniteurDerive(construire_reference(reel))
+    suivi.observer(synthetique)
+    scores = suivi.scores()
+    print("PSI synthétique / réel (< 0,1 : lois conformes)")
+    print(scores.round(3).to_string())
+
+    moyennes = pd.DataFrame({
+        "reel": reel.groupby(["region", "culture"])[CIBLE].mean(),
+        "synthetique": synthetique.groupby(["region", "culture"])[CIBLE].mean()
+    })
+    ecart = (moyennes["synthetique"] - moyennes["reel"]).abs().max()
+    print(f"Rendement moyen par région x culture : écart maximal {ecart:.3f} t/ha")
+    correlations = (synthetique[NUMERIQUES + [CIBLE]].corr() - reel[NUMERIQUES + [CIBLE]].corr()).abs().max().max()
+    print(f"Corrélations : écart maximal {correlations:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère un jeu de données agricoles synthétique")
+    parser.add_argument("--lignes", type=int, required=True)
+    parser.add_argument("--sortie", required=True, help="Fichier .csv ou .parquet")
+    parser.add_argument("--source", default=CHEMIN_DONNEES, help="Jeu réel dont on apprend les lois")
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument("--bloc", type=int, default=TAILLE_BLOC, help="Lignes générées et écrites par bloc")
+    parser.add_argument("--verifier", action="store_true", help="Compare le premier bloc aux lois du jeu réel")
+    args = parser.parse_args()
+
+    reel = pd.read_csv(args.source)
+    modele = apprendre(reel)
+
+    debut = time.perf_counter()
+    n = ecrire(generer(modele, args.lignes, args.bloc, args.graine), args.sortie)
+    duree = time.perf_counter() - debut
+    taille = os.path.getsize(args.sortie) / 1e6
+    print(f"{n} lignes écrites dans {args.sortie} ({taille:.1f} Mo) en {duree:.1f} s ({n / duree:,.0f} lignes/s)")
+
+    if args.verifier:
+        verifier(reel, next(generer(modele, min(args.lignes, args.bloc), args.bloc, args.graine)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Au-delà de ce nombre de points, on passe en WebGL et on sous-échantillonne
+SEUIL_WEBGL = 5000
+POINTS_MAX_PAR_SERIE = 2000
+
+COULEURS_CULTURES = {"Maïs": "#4CAF50", "Sorgho": "#FF9800", "Mil": "#2196F3"}
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_sortie: int) -> np.ndarray:
+    """Indices retenus par l'algorithme Largest-Triangle-Three-Buckets.
+
+    Conserve la forme visuelle de la série (pics et creux) avec `n_sortie` points.
+    """
+    n = len(x)
+    if n_sortie >= n or n_sortie < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    bornes = np.linspace(1, n - 1, n_sortie - 1).astype(np.int64)
+
+    indices = np.empty(n_sortie, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(n_sortie - 2):
+        debut, fin = bornes[i], bornes[i + 1]
+        # Point moyen du seau suivant (le dernier point pour le dernier seau)
+        suivant_fin = bornes[i + 2] if i + 2 < len(bornes) else n
+        mx = x[fin:suivant_fin].mean()
+        my = y[fin:suivant_fin].mean()
+
+        aires = np.abs((x[a] - mx) * (y[debut:fin] - y[a]) - (x[a] - x[debut:fin]) * (my - y[a]))
+        a = debut + int(np.argmax(aires))
+        indices[i + 1] = a
+    return indices
+
+
+def figure_historique(df_historique: pd.DataFrame, seuil_webgl: int = SEUIL_WEBGL,
+                      points_max: int = POINTS_MAX_PAR_SERIE) -> go.Figure:
+    """Évolution des rendements prévus, une série par culture.
+
+    Les grands historiques passent en Scattergl et chaque série est réduite à
+    `points_max` points par LTTB, ce qui borne la taille envoyée au navigateur.
+    """
+    df = df_historique[["date", "culture", "rendement"]].copy()
+    df["date"] = pd.to_datetime(df["date"])
+    df = df.sort_values("date", kind="stable")
+
+    grand = len(df) > seuil_webgl
+    trace = go.Scattergl if grand else go.Scatter
+
+    fig = go.Figure()
+    for culture, serie in df.groupby("culture", sort=False):
+        x = serie["date"].to_numpy()
+        y = serie["rendement"].to_numpy(dtype=float)
+        if grand:
+            garde = lttb(x.astype("datetime64[ns]").astype(np.int64), y, points_max)
+            x, y = x[garde], y[garde]
+        fig.add_trace(trace(
+            x=x,
+            y=y,
+            name=culture,
+            mode="lines" if grand else "lines+markers",
+            line={"color": COULEURS_CULTURES.get(culture)}
+        ))
+
+    titre = "Évolution des Rendements Prévus"
+    if grand:
+        titre += f" ({len(df)} prévisions, vue sous-échantillonnée)"
+    fig.update_layout(
+        title=titre,
+        xaxis_title="date",
+        yaxis_title="rendement",
+        legend_title="culture",
+        height=400
+    )
+    return fig
+
+
+def figure_comparaison(rendement_prevu: float, rendement_moyen: float,
+                       p10: Optional[float] = None, p90: Optional[float] = None) -> go.Figure:
+    """Barres prévu / moyen / optimal, avec l'intervalle P10-P90 si disponible"""
+    fig = go.Figure()
+    categories = ['Rendement\nPrévu', 'Rendement\nMoyen', 'Rendement\nOptimal']
+    valeurs = [rendement_prevu, rendement_moyen, rendement_moyen * 1.3]
+    couleurs = ['#4CAF50', '#FFC107', '#2196F3']
+
+    # Barre d'erreur P10-P90 sur le rendement prévu
+    erreur = None
+    if p10 is not None and p90 is not None:
+        erreur = dict(
+            type='data',
+            symmetric=False,
+            array=[max(p90 - rendement_prevu, 0), 0, 0],
+            arrayminus=[max(rendement_prevu - p10, 0), 0, 0],
+            visible=True
+        )
+
+    fig.add_trace(go.Bar(
+        x=categories,
+        y=valeurs,
+        marker_color=couleurs,
+        error_y=erreur,
+        text=[f'{v:.2f} t/ha' for v in valeurs],
+        textposition='outside'
+    ))
+
+    fig.update_layout(
+        title="Comparaison des Rendements",
+        yaxis_title="Rendement (t/ha)",
+        height=400
+    )
+    return fig
+
+
+def figure_jauge(niveau_risque: int, titre: str = "Indice de Risque (%)") -> go.Figure:
+    """Jauge de l'indice de risque"""
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number+delta",
+        value=niveau_risque,
+        title={'text': titre},
+        delta={'reference': 50},
+        gauge={
+            'axis': {'range': [None, 100]},
+            'bar': {'color': "darkred" if niveau_risque > 60 else "orange" if niveau_risque > 30 else "green"},
+            'steps': [
+                {'range': [0, 30], 'color': "lightgreen"},
+                {'range': [30, 60], 'color': "lightyellow"},
+                {'range': [60, 100], 'color': "lightcoral"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': 70
+            }
+        }
+    ))
+    fig.update_layout(height=400)
+    return fig
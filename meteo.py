@@ -0,0 +1,150 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Sequence
+
+import numpy as np
+
+from climatologie import meteo_normale
+from metriques import REGISTRE
+
+# API de prévision ; METEO_URL permet de viser le substitut local (meteo_locale.py)
+URL_METEO = os.environ.get("METEO_URL", "https://api.open-meteo.com/v1/forecast")
+
+DUREE_REQUETE = REGISTRE.histogramme("prevision_meteo_requete_duree_secondes", "Durée des appels à l'API météo")
+ERREURS = REGISTRE.compteur("prevision_meteo_erreurs_total", "Appels à l'API météo en échec")
+
+# Requêtes groupées : nombre de points par requête (liste de coordonnées séparées par des virgules)
+TAILLE_LOT_METEO = 100
+
+# Colonnes renvoyées par meteo_points (une valeur par point)
+CHAMPS_POINTS = ["temperature_actuelle", "temperature_moyenne", "precipitation_cumul", "humidite", "vitesse_vent"]
+
+# Coordonnées des régions du Togo
+REGIONS_COORDINATES = {
+    "Maritime": {"lat": 6.1256, "lon": 1.2256},
+    "Plateaux": {"lat": 6.9000, "lon": 0.8500},
+    "Centrale": {"lat": 8.9711, "lon": 1.1056},
+    "Kara": {"lat": 9.5511, "lon": 1.1856},
+    "Savanes": {"lat": 10.5700, "lon": 0.2200}
+}
+
+
+def meteo_region(region: str) -> Dict:
+    """Récupère les données météo en temps réel via Open-Meteo (GRATUIT)"""
+    # Import local : seule la page Prévision interroge l'API
+    import requests
+
+    if region not in REGIONS_COORDINATES:
+        return {"success": False, "error": "Région inconnue"}
+    
+    coords = REGIONS_COORDINATES[region]
+    params = {
+        "latitude": coords["lat"],
+        "longitude": coords["lon"],
+        "current": ["temperature_2m", "precipitation", "relative_humidity_2m", "wind_speed_10m"],
+        "daily": ["temperature_2m_max", "temperature_2m_min", "precipitation_sum"],
+        "timezone": "Africa/Lome",
+        "forecast_days": 7
+    }
+    
+    debut = time.perf_counter()
+    try:
+        response = requests.get(URL_METEO, params=params, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+        
+        current = data.get("current", {})
+        daily = data.get("daily", {})
+        
+        precipitation_cumul = sum(daily.get("precipitation_sum", [])) if daily else 0
+        temp_max_list = daily.get("temperature_2m_max", [])
+        temp_moyenne = sum(temp_max_list) / len(temp_max_list) if temp_max_list else current.get("temperature_2m", 27)
+        
+        return {
+            "success": True,
+            "temperature_actuelle": current.get("temperature_2m", 27),
+            "temperature_moyenne": round(temp_moyenne, 1),
+            "precipitation_cumul": round(precipitation_cumul, 1),
+            "humidite": current.get("relative_humidity_2m", 60),
+            "vitesse_vent": current.get("wind_speed_10m", 0)
+        }
+    except Exception as e:
+        ERREURS.inc()
+        # Réseau indisponible : normales de la région pour les 7 prochains jours
+        return {"success": False, "error": str(e), **meteo_normale(region)}
+    finally:
+        DUREE_REQUETE.observe(time.perf_counter() - debut)
+
+
+def _requete_lot(requests, latitudes: np.ndarray, longitudes: np.ndarray, jours: int):
+    """Un appel pour un lot de points ; liste d'un objet par point, dans l'ordre"""
+    params = {
+        "latitude": ",".join(f"{v:.4f}" for v in latitudes),
+        "longitude": ",".join(f"{v:.4f}" for v in longitudes),
+        "current": "temperature_2m,relative_humidity_2m,wind_speed_10m",
+        "daily": "temperature_2m_max,precipitation_sum",
+        "timezone": "Africa/Lome",
+        "forecast_days": jours
+    }
+    debut = time.perf_counter()
+    try:
+        response = requests.get(URL_METEO, params=params, timeout=30)
+        response.raise_for_status()
+        data = response.json()
+    finally:
+        DUREE_REQUETE.observe(time.perf_counter() - debut)
+    # Un seul point : l'API renvoie un objet et non une liste
+    return data if isinstance(data, list) else [data]
+
+
+def meteo_points(latitudes: Sequence[float], longitudes: Sequence[float],
+                 taille_lot: int = TAILLE_LOT_METEO, n_fils: int = 4, jours: int = 7) -> Dict[str, np.ndarray]:
+    """Météo de nombreux points en quelques requêtes groupées, exécutées en parallèle.
+
+    Renvoie des colonnes (un tableau par champ de CHAMPS_POINTS, plus le masque
+    `succes`) ; les points d'un lot en échec valent NaN.
+    """
+    import requests
+
+    latitudes = np.asarray(latitudes, dtype=float)
+    longitudes = np.asarray(longitudes, dtype=float)
+    n = len(latitudes)
+    resultat = {champ: np.full(n, np.nan) for champ in CHAMPS_POINTS}
+    resultat["succes"] = np.zeros(n, dtype=bool)
+
+    def traiter(debut: int) -> None:
+        fin = min(debut + taille_lot, n)
+        try:
+            points = _requete_lot(requests, latitudes[debut:fin], longitudes[debut:fin], jours)
+        except Exception:
+            ERREURS.inc()
+            return
+        if len(points) != fin - debut:
+            ERREURS.inc()
+            return
+
+        courant = [p.get("current", {}) for p in points]
+        quotidien = [p.get("daily", {}) for p in points]
+        # (points, jours) ; les valeurs manquantes (null) deviennent NaN
+        t_max = np.array([q.get("temperature_2m_max", [np.nan] * jours) for q in quotidien], dtype=float)
+        pluie = np.array([q.get("precipitation_sum", [np.nan] * jours) for q in quotidien], dtype=float)
+        tranche = slice(debut, fin)
+        resultat["temperature_actuelle"][tranche] = [c.get("temperature_2m", np.nan) for c in courant]
+        resultat["humidite"][tranche] = [c.get("relative_humidity_2m", np.nan) for c in courant]
+        resultat["vitesse_vent"][tranche] = [c.get("wind_speed_10m", np.nan) for c in courant]
+        jours_valides = (~np.isnan(t_max)).sum(axis=1)
+        resultat["temperature_moyenne"][tranche] = np.where(
+            jours_valides > 0, np.nansum(t_max, axis=1) / np.maximum(jours_valides, 1), np.nan
+        )
+        resultat["precipitation_cumul"][tranche] = np.nansum(pluie, axis=1)
+        resultat["succes"][tranche] = True
+
+    debuts = range(0, n, taille_lot)
+    if len(debuts) <= 1:
+        for debut in debuts:
+            traiter(debut)
+    else:
+        with ThreadPoolExecutor(min(n_fils, len(debuts))) as executeur:
+            list(executeur.map(traiter, debuts))
+    return resultat
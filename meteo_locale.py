@@ -0,0 +1,136 @@
+"""Substitut local de l'API Open-Meteo (prévisions), pour travailler hors ligne.
+
+Répond sur /v1/forecast avec le même format JSON que l'API (blocs `current`
+et `daily`, une liste d'objets pour des coordonnées multiples) ; les valeurs
+sont synthétiques mais stables pour un lieu et un jour donnés, avec un
+gradient sud humide / nord chaud et sec comme au Togo.
+
+    python meteo_locale.py --port 8090 --latence-ms 50
+    METEO_URL=http://127.0.0.1:8090/v1/forecast streamlit run Prevision_Interface.py
+"""
+import argparse
+import json
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Union
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+POINTS_MAX = 1000
+
+
+def _parametre(requete: Dict[str, List[str]], nom: str, defaut: str) -> str:
+    return requete.get(nom, [defaut])[0]
+
+
+def prevision_synthetique(latitude: float, longitude: float, jours: int = 7, debut: date = None) -> Dict:
+    """Prévision au format Open-Meteo pour un point (déterministe pour un lieu et une date)"""
+    debut = debut or date.today()
+    graine = zlib.crc32(f"{latitude:.2f},{longitude:.2f},{debut.isoformat()}".encode())
+    rng = np.random.default_rng(graine)
+
+    # Sud (6° N) : ~27 °C et pluies fréquentes ; nord (11° N) : plus chaud, plus sec
+    nord = float(np.clip((latitude - 6.0) / 5.0, 0.0, 1.0))
+    saison = np.sin(2 * np.pi * (debut.timetuple().tm_yday - 80) / 365)
+    t_max = 30.0 + 5.0 * nord + 2.0 * saison + rng.normal(0, 1.2, jours)
+    t_min = t_max - 8.0 - 3.0 * nord + rng.normal(0, 0.8, jours)
+    pluie_moyenne = max(0.2, (5.0 - 3.0 * nord) * (1 + saison))
+    pluie = np.where(rng.random(jours) < 0.55 - 0.25 * nord, rng.exponential(pluie_moyenne * 2, jours), 0.0)
+
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "timezone": "Africa/Lome",
+        "current": {
+            "time": f"{debut.isoformat()}T12:00",
+            "temperature_2m": round(float(t_max[0] - 2.0), 1),
+            "precipitation": round(float(pluie[0] / 8), 1),
+            "relative_humidity_2m": int(np.clip(80 - 35 * nord + rng.normal(0, 5), 15, 100)),
+            "wind_speed_10m": round(float(rng.uniform(3, 15)), 1)
+        },
+        "daily": {
+            "time": [(debut + timedelta(days=i)).isoformat() for i in range(jours)],
+            "temperature_2m_max": np.round(t_max, 1).tolist(),
+            "temperature_2m_min": np.round(t_min, 1).tolist(),
+            "precipitation_sum": np.round(pluie, 1).tolist()
+        }
+    }
+
+
+class GestionnaireMeteo(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _repondre(self, statut: int, contenu: Union[Dict, List[Dict]]) -> None:
+        corps = json.dumps(contenu).encode("utf-8")
+        self.send_response(statut)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path != "/v1/forecast":
+            self._repondre(404, {"error": True, "reason": "Not Found"})
+            return
+        requete = parse_qs(url.query)
+        try:
+            # Plusieurs points : listes de coordonnées séparées par des virgules
+            latitudes = [float(v) for v in _parametre(requete, "latitude", "").split(",")]
+            longitudes = [float(v) for v in _parametre(requete, "longitude", "").split(",")]
+            jours = int(_parametre(requete, "forecast_days", "7"))
+        except ValueError:
+            self._repondre(400, {"error": True, "reason": "Paramètres latitude / longitude invalides"})
+            return
+        if len(latitudes) != len(longitudes) or len(latitudes) > POINTS_MAX:
+            self._repondre(400, {"error": True, "reason": f"Listes de coordonnées de même longueur (max {POINTS_MAX})"})
+            return
+
+        if self.server.latence > 0:
+            time.sleep(self.server.latence)
+        previsions = [prevision_synthetique(lat, lon, jours) for lat, lon in zip(latitudes, longitudes)]
+        # Comme l'API : un objet pour un point, une liste d'objets pour plusieurs
+        self._repondre(200, previsions[0] if len(previsions) == 1 else previsions)
+
+
+class ServeurMeteo(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+    latence = 0.0
+
+
+def demarrer(hote: str = "127.0.0.1", port: int = 0, latence_ms: float = 0.0) -> ServeurMeteo:
+    """Serveur dans un fil d'arrière-plan ; `port=0` choisit un port libre (serveur.server_port)"""
+    serveur = ServeurMeteo((hote, port), GestionnaireMeteo)
+    serveur.latence = latence_ms / 1000.0
+    threading.Thread(target=serveur.serve_forever, name="meteo-locale", daemon=True).start()
+    return serveur
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Substitut local de l'API Open-Meteo")
+    parser.add_argument("--hote", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latence-ms", type=float, default=0.0, help="Latence simulée de chaque réponse")
+    args = parser.parse_args()
+
+    serveur = ServeurMeteo((args.hote, args.port), GestionnaireMeteo)
+    serveur.latence = args.latence_ms / 1000.0
+    print(f"Météo locale : http://{args.hote}:{args.port}/v1/forecast")
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""Métriques d'exploitation au format texte Prometheus (sans dépendance externe).
+
+Compteurs, jauges et histogrammes enregistrés dans un registre de processus ;
+`REGISTRE.exposition()` produit le texte servi sur /metrics. Les valeurs
+tenues ailleurs (statistiques d'un lru_cache, sessions Streamlit) sont
+recopiées au moment de la collecte par des fonctions `avant_collecte`.
+
+En mode prefork, chaque processus publie ses propres incréments dans un
+dossier partagé (`REGISTRE.partager`) : /metrics, servi par n'importe quel
+worker, additionne compteurs et histogrammes de tous les processus et expose
+les jauges par worker (étiquette `worker`).
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+TYPE_CONTENU = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bornes (s) adaptées aux latences d'une prédiction, d'un appel météo ou d'un chargement
+BORNES_LATENCE = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Mode prefork : retard maximal (s) des valeurs des autres workers dans une collecte
+PERIODE_PUBLICATION = 1.0
+
+
+def _format_etiquettes(noms: Sequence[str], valeurs: Tuple, supplement: str = "") -> str:
+    paires = [
+        f'{nom}="' + str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for nom, v in zip(noms, valeurs)
+    ]
+    if supplement:
+        paires.append(supplement)
+    return "{" + ",".join(paires) + "}" if paires else ""
+
+
+def _format_valeur(valeur: float) -> str:
+    if valeur == float("inf"):
+        return "+Inf"
+    return repr(float(valeur)) if isinstance(valeur, float) else str(valeur)
+
+
+def _combiner(a, b, signe: int = 1):
+    """a + b (ou a - b) pour une valeur de compteur ou une série d'histogramme"""
+    if isinstance(a, list):
+        return [x + signe * y for x, y in zip(a, b)]
+    return a + signe * b
+
+
+def _processus_vivant(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class _Metrique:
+    type_metrique = ""
+
+    def __init__(self, nom: str, aide: str, etiquettes: Sequence[str] = ()):
+        self.nom = nom
+        self.aide = aide
+        self.etiquettes = tuple(etiquettes)
+        self._verrou = threading.Lock()
+        self._valeurs: Dict[Tuple, object] = {}
+
+    def _cle(self, etiquettes: Dict[str, str]) -> Tuple:
+        return tuple(str(etiquettes[nom]) for nom in self.etiquettes)
+
+    def valeurs(self) -> Dict[Tuple, object]:
+        """Copie des valeurs par jeu d'étiquettes"""
+        with self._verrou:
+            return {cle: list(v) if isinstance(v, list) else v for cle, v in self._valeurs.items()}
+
+    def _lignes(self, valeurs: Dict[Tuple, object], noms: Sequence[str]) -> List[str]:
+        raise NotImplementedError
+
+    def exposition(self, valeurs: Optional[Dict[Tuple, object]] = None,
+                   noms: Optional[Sequence[str]] = None) -> List[str]:
+        valeurs = self.valeurs() if valeurs is None else valeurs
+        return ([f"# HELP {self.nom} {self.aide}", f"# TYPE {self.nom} {self.type_metrique}"]
+                + self._lignes(valeurs, self.etiquettes if noms is None else noms))
+
+
+class Compteur(_Metrique):
+    type_metrique = "counter"
+
+    def inc(self, valeur: float = 1, **etiquettes) -> None:
+        cle = self._cle(etiquettes)
+        with self._verrou:
+            self._valeurs[cle] = self._valeurs.get(cle, 0) + valeur
+
+    def fixer(self, valeur: float, **etiquettes) -> None:
+        """Recopie un compteur tenu ailleurs (ex. `cache_info()` d'un lru_cache)"""
+        with self._verrou:
+            self._valeurs[self._cle(etiquettes)] = valeur
+
+    def _lignes(self, valeurs: Dict[Tuple, object], noms: Sequence[str]) -> List[str]:
+        return [f"{self.nom}{_format_etiquettes(noms, cle)} {_format_valeur(v)}" for cle, v in valeurs.items()]
+
+
+class Jauge(Compteur):
+    type_metrique = "gauge"
+
+
+class Histogramme(_Metrique):
+    type_metrique = "histogram"
+
+    def __init__(self, nom: str, aide: str, etiquettes: Sequence[str] = (),
+                 bornes: Sequence[float] = BORNES_LATENCE):
+        super().__init__(nom, aide, etiquettes)
+        self.bornes = tuple(sorted(bornes)) + (float("inf"),)
+
+    def observe(self, valeur: float, **etiquettes) -> None:
+        cle = self._cle(etiquettes)
+        with self._verrou:
+            serie = self._valeurs.get(cle)
+            if serie is None:
+                # [effectifs par intervalle..., somme, nombre]
+                serie = self._valeurs[cle] = [0] * len(self.bornes) + [0.0, 0]
+            for i, borne in enumerate(self.bornes):
+                if valeur <= borne:
+                    serie[i] += 1
+                    break
+            serie[-2] += valeur
+            serie[-1] += 1
+
+    @contextmanager
+    def chronometrer(self, **etiquettes):
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - debut, **etiquettes)
+
+    def _lignes(self, valeurs: Dict[Tuple, object], noms: Sequence[str]) -> List[str]:
+        lignes = []
+        for cle, serie in valeurs.items():
+            cumul = 0
+            for borne, effectif in zip(self.bornes, serie):
+                cumul += effectif
+                le = f'le="{_format_valeur(borne)}"'
+                lignes.append(f"{self.nom}_bucket{_format_etiquettes(noms, cle, le)} {cumul}")
+            etiquettes = _format_etiquettes(noms, cle)
+            lignes.append(f"{self.nom}_sum{etiquettes} {_format_valeur(serie[-2])}")
+            lignes.append(f"{self.nom}_count{etiquettes} {serie[-1]}")
+        return lignes
+
+
+class Registre:
+    def __init__(self):
+        self._metriques: Dict[str, _Metrique] = {}
+        self._collecteurs: List[Callable[[], None]] = []
+        self._verrou = threading.Lock()
+        # Mode multi-processus : dossier partagé et valeurs héritées au fork
+        self._dossier: Optional[str] = None
+        self._base: Dict[str, Dict[Tuple, object]] = {}
+        self._verrou_publication = threading.Lock()
+
+    def _enregistrer(self, metrique: _Metrique) -> _Metrique:
+        with self._verrou:
+            # Réimport d'un module (rerun Streamlit) : on garde la métrique existante
+            return self._metriques.setdefault(metrique.nom, metrique)
+
+    def compteur(self, nom: str, aide: str, etiquettes: Sequence[str] = ()) -> Compteur:
+        return self._enregistrer(Compteur(nom, aide, etiquettes))
+
+    def jauge(self, nom: str, aide: str, etiquettes: Sequence[str] = ()) -> Jauge:
+        return self._enregistrer(Jauge(nom, aide, etiquettes))
+
+    def histogramme(self, nom: str, aide: str, etiquettes: Sequence[str] = (),
+                    bornes: Sequence[float] = BORNES_LATENCE) -> Histogramme:
+        return self._enregistrer(Histogramme(nom, aide, etiquettes, bornes))
+
+    def avant_collecte(self, fonction: Callable[[], None]) -> None:
+        """Fonction appelée à chaque collecte pour mettre à jour des valeurs externes"""
+        with self._verrou:
+            if fonction not in self._collecteurs:
+                self._collecteurs.append(fonction)
+
+    def _instantane(self) -> Dict[str, Dict[Tuple, object]]:
+        for fonction in list(self._collecteurs):
+            fonction()
+        return {nom: metrique.valeurs() for nom, metrique in list(self._metriques.items())}
+
+    def partager(self, dossier: str, periode: Optional[float] = None) -> None:
+        """Mode multi-processus : /metrics agrège les valeurs publiées dans `dossier` par chaque processus.
+
+        Les valeurs présentes à l'appel (héritées du maître au fork) servent de base : le processus
+        ne publie que ses propres incréments. Avec `periode`, un fil les republie à ce rythme.
+        """
+        self._dossier = dossier
+        self._base = self._instantane()
+        if periode:
+            def publier_en_boucle():
+                while True:
+                    time.sleep(periode)
+                    self.publier()
+
+            threading.Thread(target=publier_en_boucle, name="publication-metriques", daemon=True).start()
+
+    def publier(self) -> None:
+        """Écrit dans le dossier partagé les valeurs propres du processus (jauges telles quelles)"""
+        publication = {}
+        for nom, valeurs in self._instantane().items():
+            base = {} if self._metriques[nom].type_metrique == "gauge" else self._base.get(nom, {})
+            publication[nom] = [[list(cle), _combiner(v, base[cle], -1) if cle in base else v]
+                                for cle, v in valeurs.items()]
+        chemin = os.path.join(self._dossier, f"{os.getpid()}.json")
+        with self._verrou_publication:
+            with open(chemin + ".tmp", "w") as f:
+                json.dump(publication, f)
+            os.replace(chemin + ".tmp", chemin)
+
+    def _agreger(self) -> Dict[str, Dict[Tuple, object]]:
+        """Compteurs et histogrammes sommés sur tous les processus, workers arrêtés compris ;
+        jauges des seuls processus vivants, étiquetées par pid"""
+        agregat: Dict[str, Dict[Tuple, object]] = {nom: {} for nom in self._metriques}
+        for fichier in sorted(os.listdir(self._dossier)):
+            if not fichier.endswith(".json"):
+                continue
+            pid = int(fichier[:-len(".json")])
+            try:
+                with open(os.path.join(self._dossier, fichier)) as f:
+                    publication = json.load(f)
+            except (OSError, ValueError):
+                continue
+            vivant = _processus_vivant(pid)
+            for nom, valeurs in publication.items():
+                metrique = self._metriques.get(nom)
+                if metrique is None:
+                    continue
+                jauge = metrique.type_metrique == "gauge"
+                if jauge and not vivant:
+                    continue
+                cumul = agregat[nom]
+                for cle, v in valeurs:
+                    cle = tuple(cle) + ((str(pid),) if jauge else ())
+                    cumul[cle] = _combiner(cumul[cle], v) if cle in cumul else v
+        return agregat
+
+    def exposition(self) -> str:
+        if self._dossier is None:
+            valeurs = self._instantane()
+        else:
+            self.publier()
+            valeurs = self._agreger()
+        lignes = []
+        for nom, metrique in list(self._metriques.items()):
+            noms = None
+            if self._dossier is not None and metrique.type_metrique == "gauge":
+                noms = metrique.etiquettes + ("worker",)
+            lignes.extend(metrique.exposition(valeurs.get(nom, {}), noms))
+        return "\n".join(lignes) + "\n"
+
+
+REGISTRE = Registre()
+
+# Caches (modèle, météo, prédictions) : succès / échecs de lecture
+CACHE_REQUETES = REGISTRE.compteur(
+    "prevision_cache_requetes_total", "Lectures de cache par cache et résultat (hit/miss)", ("cache", "resultat")
+)
+
+# Prédictions servies (service HTTP : chemins unitaire / lot ; interface Streamlit)
+PARCELLES_PREDITES = REGISTRE.compteur("prevision_parcelles_predites_total", "Parcelles prédites", ("chemin",))
+DUREE_PREDICTION = REGISTRE.histogramme(
+    "prevision_prediction_duree_secondes", "Latence d'une demande de prédiction", ("chemin",)
+)
+
+_local = threading.local()
+
+
+def marquer_calcul() -> None:
+    """À appeler dans le corps d'une fonction mise en cache : il ne s'exécute qu'en cas d'échec"""
+    _local.calcul = True
+
+
+def appel_cache(cache: str, fonction: Callable, *args, **kwargs):
+    """Appelle une fonction mise en cache et compte un hit ou un miss selon `marquer_calcul`"""
+    precedent = getattr(_local, "calcul", False)
+    _local.calcul = False
+    try:
+        resultat = fonction(*args, **kwargs)
+        manque = _local.calcul
+    finally:
+        _local.calcul = precedent
+    CACHE_REQUETES.inc(cache=cache, resultat="miss" if manque else "hit")
+    return resultat
+
+
+class _GestionnaireMetriques(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        corps = REGISTRE.exposition().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", TYPE_CONTENU)
+        self.send_header("Content-Length", str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+
+def demarrer_serveur_metriques(hote: str, port: int) -> ThreadingHTTPServer:
+    """Serveur /metrics dans un fil d'arrière-plan (processus sans serveur HTTP propre)"""
+    serveur = ThreadingHTTPServer((hote, port), _GestionnaireMetriques)
+    serveur.daemon_threads = True
+    threading.Thread(target=serveur.serve_forever, name="metriques", daemon=True).start()
+    return serveur
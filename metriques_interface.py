@@ -0,0 +1,65 @@
+"""Métriques de l'application Streamlit : sessions actives et taille des historiques.
+
+Streamlit ne permet pas d'ajouter une route /metrics : avec METRIQUES_PORT
+défini, un petit serveur HTTP sert les métriques du processus sur ce port.
+
+    METRIQUES_PORT=9464 streamlit run Prevision_Interface.py
+    curl localhost:9464/metrics
+"""
+import os
+import threading
+from typing import Dict
+
+import streamlit as st
+
+from metriques import REGISTRE, demarrer_serveur_metriques
+
+SESSIONS_ACTIVES = REGISTRE.jauge("prevision_sessions_actives", "Sessions Streamlit actives")
+TAILLE_HISTORIQUE = REGISTRE.jauge(
+    "prevision_historique_previsions", "Prévisions conservées dans l'historique des sessions actives"
+)
+
+# Taille de l'historique de chaque session, relevée à chacun de ses reruns
+_tailles_historique: Dict[str, int] = {}
+_verrou = threading.Lock()
+
+
+def _sessions_actives():
+    from streamlit.runtime import Runtime
+
+    if not Runtime.exists():
+        return None
+    # API interne de Streamlit : pas d'accès public à la liste des sessions
+    gestionnaire = Runtime.instance()._session_mgr
+    return {info.session.id for info in gestionnaire.list_active_sessions()}
+
+
+def _collecter() -> None:
+    actives = _sessions_actives()
+    with _verrou:
+        if actives is not None:
+            for session in set(_tailles_historique) - actives:
+                del _tailles_historique[session]
+        SESSIONS_ACTIVES.fixer(len(actives) if actives is not None else len(_tailles_historique))
+        TAILLE_HISTORIQUE.fixer(sum(_tailles_historique.values()))
+
+
+@st.cache_resource
+def _demarrer():
+    """Une seule fois par processus : collecteur et serveur /metrics éventuel"""
+    REGISTRE.avant_collecte(_collecter)
+    port = os.environ.get("METRIQUES_PORT")
+    if port:
+        return demarrer_serveur_metriques(os.environ.get("METRIQUES_HOTE", "127.0.0.1"), int(port))
+    return None
+
+
+def suivre_session() -> None:
+    """Relève la taille de l'historique de la session en cours"""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    _demarrer()
+    contexte = get_script_run_ctx()
+    if contexte is not None:
+        with _verrou:
+            _tailles_historique[contexte.session_id] = len(st.session_state.historique)
@@ -0,0 +1,92 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+
+class _Requete:
+    __slots__ = ("lignes", "future")
+
+    def __init__(self, lignes: List[Dict]):
+        self.lignes = lignes
+        self.future: Future = Future()
+
+
+class OrdonnanceurLots:
+    """Regroupe les requêtes concurrentes en micro-lots pour un seul appel au modèle.
+
+    Une requête attend au plus `attente_max_ms` que d'autres la rejoignent, ou que
+    le lot atteigne `lignes_max` lignes ; le lot est alors prédit en une fois et
+    chaque appelant reçoit sa propre tranche de résultats.
+    """
+
+    def __init__(self, fonction_lot: Callable[[List[Dict]], List[float]],
+                 attente_max_ms: float = 5.0, lignes_max: int = 256, executeurs: int = 1):
+        self.fonction_lot = fonction_lot
+        self.attente_max = attente_max_ms / 1000.0
+        self.lignes_max = lignes_max
+        self._file: "queue.Queue[Optional[_Requete]]" = queue.Queue()
+        self._fils = [
+            threading.Thread(target=self._boucle, name=f"microlots-{i}", daemon=True)
+            for i in range(executeurs)
+        ]
+        for fil in self._fils:
+            fil.start()
+
+    def soumettre(self, lignes: List[Dict]) -> Future:
+        """Place des lignes dans la file ; le Future reçoit leurs prédictions"""
+        requete = _Requete(lignes)
+        self._file.put(requete)
+        return requete.future
+
+    def predire(self, lignes: List[Dict], timeout: Optional[float] = None) -> List[float]:
+        return self.soumettre(lignes).result(timeout)
+
+    def arreter(self) -> None:
+        for _ in self._fils:
+            self._file.put(None)
+        for fil in self._fils:
+            fil.join()
+
+    def _boucle(self) -> None:
+        while True:
+            premiere = self._file.get()
+            if premiere is None:
+                return
+
+            lot = [premiere]
+            n_lignes = len(premiere.lignes)
+            echeance = time.monotonic() + self.attente_max
+            arret = False
+            while n_lignes < self.lignes_max:
+                reste = echeance - time.monotonic()
+                try:
+                    # Les requêtes déjà en file sont prises sans attendre
+                    requete = self._file.get(timeout=reste) if reste > 0 else self._file.get_nowait()
+                except queue.Empty:
+                    break
+                if requete is None:
+                    arret = True
+                    break
+                lot.append(requete)
+                n_lignes += len(requete.lignes)
+
+            self._executer(lot)
+            if arret:
+                return
+
+    def _executer(self, lot: List[_Requete]) -> None:
+        lignes = [ligne for requete in lot for ligne in requete.lignes]
+        try:
+            resultats = self.fonction_lot(lignes)
+        except Exception as e:
+            for requete in lot:
+                requete.future.set_exception(e)
+            return
+
+        debut = 0
+        for requete in lot:
+            fin = debut + len(requete.lignes)
+            requete.future.set_result(resultats[debut:fin])
+            debut = fin
@@ -0,0 +1,58 @@
+import json
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from predict import COLONNES, categories_modele
+
+COLONNES_TEXTE = ["region", "culture", "type_sol"]
+
+
+def exporter_onnx(pipeline, chemin: str) -> None:
+    """Exporte le pipeline complet (prétraitement + forêt) au format ONNX.
+
+    Une entrée par colonne ; les modalités connues sont enregistrées dans les
+    métadonnées pour la validation côté service.
+    """
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType, StringTensorType
+
+    types_entrees = [
+        (colonne, StringTensorType([None, 1]) if colonne in COLONNES_TEXTE else FloatTensorType([None, 1]))
+        for colonne in COLONNES
+    ]
+    modele_onnx = convert_sklearn(pipeline, initial_types=types_entrees)
+
+    metadonnee = modele_onnx.metadata_props.add()
+    metadonnee.key = "categories"
+    metadonnee.value = json.dumps(categories_modele(pipeline), ensure_ascii=False)
+
+    with open(chemin, "wb") as f:
+        f.write(modele_onnx.SerializeToString())
+
+
+class ModeleOnnx:
+    """Pipeline exporté servi par onnxruntime (CPU), avec l'interface `predict` du pipeline sklearn"""
+
+    def __init__(self, chemin: str, n_threads: int = 0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = n_threads  # 0 : tous les cœurs
+        self.session = ort.InferenceSession(chemin, options, providers=["CPUExecutionProvider"])
+        self.nom_sortie = self.session.get_outputs()[0].name
+
+        metadonnees = self.session.get_modelmeta().custom_metadata_map
+        self.categories: Dict[str, List[str]] = json.loads(metadonnees.get("categories", "{}"))
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        entrees = {}
+        for colonne in COLONNES:
+            valeurs = X[colonne].to_numpy()
+            if colonne in COLONNES_TEXTE:
+                entrees[colonne] = valeurs.astype(str).astype(object).reshape(-1, 1)
+            else:
+                entrees[colonne] = valeurs.astype(np.float32).reshape(-1, 1)
+        sortie = self.session.run([self.nom_sortie], entrees)[0]
+        return sortie.ravel().astype(np.float64)
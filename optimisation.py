@@ -0,0 +1,167 @@
+"""Planification : meilleure combinaison culture x date de semis x irrigation x fertilisation.
+
+Pour une parcelle (région, sol, surface, culture et date de semis saisies,
+pluie de saison, température moyenne), chaque couple (culture, semis) donne
+un cycle (phénologie) : sa température moyenne et sa pluie. La pluviométrie
+saisie est celle du cycle de la parcelle ; rapportée à la part des pluies
+annuelles de la région tombée pendant ce cycle, elle donne la pluie de
+l'année, que chaque candidat reçoit au prorata de la part tombée pendant son
+propre cycle (dans les bornes des entrées du modèle). Un cycle saisi surtout
+en saison sèche (moins de PART_PLUIE_MIN des pluies annuelles) ne renseigne
+pas sur l'année : la normale régionale est retenue ; sinon, la pluie de
+l'année reste entre 0,5 et 2 fois cette normale. Ces couples passent en un
+seul lot dans le modèle ; l'irrigation et la fertilisation sont des
+facteurs multiplicatifs appliqués ensuite par diffusion numpy.
+
+Les options de conduite dominées (un autre couple irrigation x fertilisation
+rend au moins autant pour un coût au plus égal) sont écartées avant
+l'évaluation ; le classement porte sur la production ou sur la marge
+(prix de vente - coût des intrants), avec le front de Pareto production / coût.
+"""
+import time
+from datetime import date
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from climatologie import NORMALES_REGIONS
+from donnees import CULTURES
+from phenologie import dates_recolte, part_pluie_cycle, serie_saisonniere, HORIZON_JOURS, JOURS_MAX
+from predict import (BORNES_ENTREES, CHEMIN_MODELE, COLONNES, FACTEUR_FERTI, FACTEUR_IRRIGATION,
+                     ajuster_rendement, predict_lot)
+
+# Prix bord champ indicatifs (FCFA / t) et coûts des intrants par campagne (FCFA / ha)
+PRIX_CULTURES = {"Maïs": 150_000, "Sorgho": 175_000, "Mil": 200_000}
+COUTS_IRRIGATION = {"Aucun": 0, "Traditionnel": 50_000, "Goutte à goutte": 250_000, "Aspersion": 180_000}
+COUTS_FERTILISATION = {"Aucune": 0, "Organique": 40_000, "Chimique": 90_000, "Mixte": 70_000}
+
+PAS_SEMIS_JOURS = 7
+# En dessous de cette part des pluies annuelles, le cycle saisi ne renseigne pas sur l'année
+PART_PLUIE_MIN = 0.1
+# Pluie de l'année plausible, relative à la normale de la région
+PLUIE_ANNUELLE_RELATIVE = (0.5, 2.0)
+OBJECTIFS = ("production", "marge")
+
+
+def options_conduite(couts_irrigation: Dict[str, float] = COUTS_IRRIGATION,
+                     couts_fertilisation: Dict[str, float] = COUTS_FERTILISATION,
+                     objectif: str = "marge") -> pd.DataFrame:
+    """Couples irrigation x fertilisation non dominés (facteur de rendement, coût / ha)"""
+    options = pd.DataFrame(
+        [(i, f, FACTEUR_IRRIGATION[i] * FACTEUR_FERTI[f], couts_irrigation[i] + couts_fertilisation[f])
+         for i in FACTEUR_IRRIGATION for f in FACTEUR_FERTI],
+        columns=["irrigation", "fertilisation", "facteur", "cout_ha"]
+    )
+    if objectif == "production":
+        # Sans prise en compte des coûts, seul le facteur le plus élevé compte
+        return options[options["facteur"] == options["facteur"].max()].head(1).reset_index(drop=True)
+    return options[front_pareto(options["facteur"].to_numpy(), options["cout_ha"].to_numpy())].reset_index(drop=True)
+
+
+def front_pareto(gain: np.ndarray, cout: np.ndarray) -> np.ndarray:
+    """Masque des points non dominés (gain maximal, coût minimal)"""
+    ordre = np.lexsort((-gain, cout))
+    # Un point est retenu s'il rapporte strictement plus que tous les points moins chers
+    meilleur_avant = np.maximum.accumulate(np.concatenate([[-np.inf], gain[ordre][:-1]]))
+    masque = np.zeros(len(gain), dtype=bool)
+    masque[ordre] = gain[ordre] > meilleur_avant
+    return masque
+
+
+def pluie_annuelle(parcelle: Dict) -> float:
+    """Pluie de l'année (mm) impliquée par la pluviométrie saisie pour le cycle de la parcelle"""
+    recolte = dates_recolte([parcelle["date_semis"]], [parcelle["culture"]], [parcelle["temperature_moyenne_c"]])
+    # Sans maturité dans l'année, la saison entière
+    jours = recolte["jours"].fillna(JOURS_MAX).to_numpy()
+    part = part_pluie_cycle([parcelle["region"]], [parcelle["date_semis"]], jours)[0]
+    normale = NORMALES_REGIONS[parcelle["region"]]["pluie"]
+    # Cycle saisi surtout en saison sèche : la pluie saisie ne dit rien de l'année, normale de la région
+    if part < PART_PLUIE_MIN:
+        return normale
+    bas, haut = PLUIE_ANNUELLE_RELATIVE
+    return float(np.clip(parcelle["pluviometrie_mm"] / part, bas * normale, haut * normale))
+
+
+def cycles_candidats(parcelle: Dict, cultures: Sequence[str], annee: int,
+                     pas_jours: int = PAS_SEMIS_JOURS) -> pd.DataFrame:
+    """Couples (culture, semis) menant à maturité, avec le climat de leur cycle"""
+    semis = pd.date_range(date(annee, 1, 1), date(annee, 12, 31), freq=f"{pas_jours}D")
+    cycles = pd.DataFrame({
+        "culture": np.repeat(list(cultures), len(semis)),
+        "semis": np.tile(semis, len(cultures))
+    })
+    n = len(cycles)
+    recolte = dates_recolte(cycles["semis"], cycles["culture"], [parcelle["temperature_moyenne_c"]] * n)
+    cycles["jours"] = recolte["jours"].to_numpy()
+    cycles["recolte"] = recolte["date_recolte"].to_numpy()
+    cycles = cycles[cycles["jours"].notna()].reset_index(drop=True)
+
+    # Température moyenne et pluie du cycle
+    temperatures = serie_saisonniere([parcelle["temperature_moyenne_c"]] * len(cycles), cycles["semis"])
+    dans_cycle = np.arange(HORIZON_JOURS) < np.minimum(cycles["jours"].to_numpy(), HORIZON_JOURS)[:, None]
+    cycles["temperature_moyenne_c"] = (temperatures * dans_cycle).sum(axis=1) / dans_cycle.sum(axis=1)
+    parts = part_pluie_cycle([parcelle["region"]] * len(cycles), cycles["semis"], cycles["jours"])
+    cycles["pluviometrie_mm"] = np.clip(pluie_annuelle(parcelle) * parts, *BORNES_ENTREES["pluviometrie_mm"])
+    return cycles
+
+
+def optimiser(parcelle: Dict, objectif: str = "marge", annee: Optional[int] = None,
+              cultures: Sequence[str] = CULTURES, n_resultats: int = 10,
+              prix: Optional[Dict[str, float]] = None, chemin: str = CHEMIN_MODELE) -> Dict:
+    """Meilleures décisions pour une parcelle.
+
+    Renvoie {"classement": DataFrame des n meilleures, "candidats": tous les
+    candidats évalués, "front": masque de Pareto production / coût, "stats"}.
+    """
+    if objectif not in OBJECTIFS:
+        raise ValueError(f"objectif inconnu : {objectif} (attendu : {', '.join(OBJECTIFS)})")
+    debut = time.perf_counter()
+    prix = prix or PRIX_CULTURES
+    annee = annee or date.today().year
+
+    cycles = cycles_candidats(parcelle, cultures, annee)
+    options = options_conduite(objectif=objectif)
+    n_total = len(cultures) * len(pd.date_range(date(annee, 1, 1), date(annee, 12, 31),
+                                                freq=f"{PAS_SEMIS_JOURS}D")) * len(FACTEUR_IRRIGATION) * len(FACTEUR_FERTI)
+
+    # Un seul passage dans le modèle : un rendement par cycle
+    entrees = cycles.assign(region=parcelle["region"], type_sol=parcelle["type_sol"],
+                            surface_ha=parcelle["surface_ha"])[COLONNES]
+    base = predict_lot(entrees, chemin)
+
+    # Cycles x options de conduite, par diffusion
+    rendement = ajuster_rendement(base[:, None], cycles["pluviometrie_mm"].to_numpy()[:, None],
+                                  cycles["temperature_moyenne_c"].to_numpy()[:, None],
+                                  options["irrigation"].to_numpy(), options["fertilisation"].to_numpy())
+    production = rendement * parcelle["surface_ha"]
+    cout = np.broadcast_to(options["cout_ha"].to_numpy() * parcelle["surface_ha"], production.shape)
+    marge = production * cycles["culture"].map(prix).to_numpy()[:, None] - cout
+
+    i, j = np.indices(production.shape)
+    candidats = pd.DataFrame({
+        "culture": cycles["culture"].to_numpy()[i.ravel()],
+        "semis": cycles["semis"].to_numpy()[i.ravel()],
+        "recolte": cycles["recolte"].to_numpy()[i.ravel()],
+        "irrigation": options["irrigation"].to_numpy()[j.ravel()],
+        "fertilisation": options["fertilisation"].to_numpy()[j.ravel()],
+        "rendement_t_ha": rendement.ravel(),
+        "production_t": production.ravel(),
+        "cout_fcfa": cout.ravel(),
+        "marge_fcfa": marge.ravel()
+    })
+    front = front_pareto(candidats["production_t"].to_numpy(), candidats["cout_fcfa"].to_numpy())
+    colonne = "production_t" if objectif == "production" else "marge_fcfa"
+    classement = candidats.nlargest(n_resultats, colonne).reset_index(drop=True)
+
+    return {
+        "classement": classement,
+        "candidats": candidats,
+        "front": front,
+        "stats": {
+            "candidats": n_total,
+            "evalues": len(candidats),
+            "inferences": len(entrees),
+            "duree_s": time.perf_counter() - debut
+        }
+    }
@@ -0,0 +1,105 @@
+"""Contrôle de parité entre le pipeline scikit-learn et son export ONNX.
+
+Trois jeux de points de contrôle :
+  - entrainement : parcelles tirées du jeu d'entraînement ;
+  - domaine : parcelles tirées uniformément dans les bornes des entrées,
+    hors des valeurs vues à l'entraînement ;
+  - seuils : chaque variable numérique placée sur un seuil de découpe de la
+    forêt arrondi en float32 et sur ses voisins float32 immédiats, là où
+    l'arrondi des seuils ONNX (float32) peut faire basculer une découpe.
+Code de sortie non nul si un écart dépasse la tolérance.
+
+    python train_modele.py --onnx
+    python parite_onnx.py
+    python parite_onnx.py --tolerance 1e-4 --parcelles 20000
+"""
+import argparse
+import os
+import sys
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from donnees import CHEMIN_DONNEES
+from predict import BORNES_ENTREES, CHEMIN_MODELE, COLONNES, categories_modele, chemin_moteur, seuils_decoupe
+
+TOLERANCE = 1e-3  # t/ha ; la forêt ONNX calcule en float32
+
+
+def _parcelles_domaine(categories: Dict, n: int, rng: np.random.Generator) -> pd.DataFrame:
+    lot = pd.DataFrame({colonne: rng.choice(valeurs, n) for colonne, valeurs in categories.items()})
+    for variable, (bas, haut) in BORNES_ENTREES.items():
+        lot[variable] = rng.uniform(bas, haut, n)
+    return lot[COLONNES]
+
+
+def points_controle(pipeline, donnees: Optional[pd.DataFrame] = None, n: int = 5000,
+                    graine: int = 0) -> Dict[str, pd.DataFrame]:
+    """Jeux de points de contrôle (entrainement, domaine, seuils), n parcelles chacun"""
+    rng = np.random.default_rng(graine)
+    categories = categories_modele(pipeline)
+    lots = {}
+    if donnees is not None:
+        lots["entrainement"] = donnees.sample(n=n, replace=True, random_state=graine)[COLONNES].reset_index(drop=True)
+    lots["domaine"] = _parcelles_domaine(categories, n, rng)
+
+    # Par variable, un tiers des parcelles : seuil float32, voisin inférieur ou voisin supérieur
+    seuils = _parcelles_domaine(categories, n, rng)
+    variables = list(BORNES_ENTREES)
+    for variable, bloc in zip(variables, np.array_split(np.arange(n), len(variables))):
+        tires = rng.choice(seuils_decoupe(pipeline, [variable])[variable], len(bloc)).astype(np.float32)
+        sens = rng.integers(-1, 2, len(bloc))
+        voisins = np.where(sens < 0, np.nextafter(tires, np.float32(-np.inf)),
+                           np.where(sens > 0, np.nextafter(tires, np.float32(np.inf)), tires))
+        seuils.loc[bloc, variable] = voisins.astype(float)
+    lots["seuils"] = seuils
+    return lots
+
+
+def verifier_parite(reference, candidat, lots: Dict[str, pd.DataFrame],
+                    tolerance: float = TOLERANCE) -> pd.DataFrame:
+    """Écart absolu maximal et moyen de chaque jeu de points (t/ha), conforme si le maximum reste sous la tolérance"""
+    lignes = []
+    for origine, lot in lots.items():
+        ecart = np.abs(reference.predict(lot) - candidat.predict(lot))
+        lignes.append({"origine": origine, "parcelles": len(lot), "ecart_max": float(ecart.max()),
+                       "ecart_moyen": float(ecart.mean()), "conforme": bool(ecart.max() <= tolerance)})
+    return pd.DataFrame(lignes)
+
+
+def controler(chemin_modele: str = CHEMIN_MODELE, chemin_donnees: str = CHEMIN_DONNEES, n: int = 5000,
+              tolerance: float = TOLERANCE, modele_sklearn=None, modele_onnx=None) -> bool:
+    """Affiche la parité du pickle et du .onnx voisin ; True si tous les jeux sont conformes"""
+    import joblib
+
+    from onnx_modele import ModeleOnnx
+
+    if modele_sklearn is None:
+        modele_sklearn = joblib.load(chemin_modele)
+    if modele_onnx is None:
+        modele_onnx = ModeleOnnx(chemin_moteur(chemin_modele, "onnx"))
+    donnees = pd.read_csv(chemin_donnees, usecols=COLONNES) if os.path.exists(chemin_donnees) else None
+    resultats = verifier_parite(modele_sklearn, modele_onnx, points_controle(modele_sklearn, donnees, n), tolerance)
+    for ligne in resultats.itertuples():
+        print(f"Parité {ligne.origine:12s} {ligne.parcelles} parcelles : écart max {ligne.ecart_max:.2e} t/ha, "
+              f"moyen {ligne.ecart_moyen:.2e}")
+    conforme = bool(resultats["conforme"].all())
+    if not conforme:
+        print(f"ÉCHEC : écart supérieur à la tolérance {tolerance:g}")
+    return conforme
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parité des prédictions sklearn / onnxruntime")
+    parser.add_argument("--modele", default=CHEMIN_MODELE)
+    parser.add_argument("--donnees", default=CHEMIN_DONNEES)
+    parser.add_argument("--parcelles", type=int, default=5000, help="Parcelles par jeu de points de contrôle")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="Écart absolu maximal admis (t/ha)")
+    args = parser.parse_args()
+    if not controler(args.modele, args.donnees, args.parcelles, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
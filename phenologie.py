@@ -0,0 +1,135 @@
+"""Phénologie : date de récolte par cumul des degrés-jours de croissance (DJC).
+
+Chaque jour apporte max(0, min(T, T_plafond) - T_base) degrés-jours ; la
+culture est mûre quand le cumul atteint son seuil. Tout est calculé sur des
+tableaux (parcelles x jours) avec un cumsum : des milliers de parcelles en
+une seule opération, résultat déterministe.
+"""
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# T_base, T_plafond (°C) et DJC de la levée à la maturité, variétés locales courantes
+PARAMETRES_CULTURES: Dict[str, Dict[str, float]] = {
+    "Maïs": {"t_base": 10.0, "t_plafond": 30.0, "seuil": 1550.0},
+    "Sorgho": {"t_base": 10.0, "t_plafond": 35.0, "seuil": 1950.0},
+    "Mil": {"t_base": 12.0, "t_plafond": 34.0, "seuil": 1450.0}
+}
+
+# Cycle annuel moyen de la température au Togo : maximum vers la mi-mars, minimum en août
+AMPLITUDE_ANNUELLE = 1.75
+JOUR_MAXIMUM = 75
+
+# Semis recommandés (culture, saison, mois-jour) : milieu des fenêtres de semis habituelles
+SEMIS_RECOMMANDES = [
+    ("Maïs", "Première", "04-01"),
+    ("Maïs", "Deuxième", "09-01"),
+    ("Sorgho", "Première", "05-01"),
+    ("Sorgho", "Deuxième", "09-15"),
+    ("Mil", "Première", "06-01")
+]
+
+# Répartition mensuelle moyenne des pluies annuelles (%), de janvier à décembre : régime bimodal
+# au sud (grande et petite saison), une seule saison de plus en plus courte vers le nord
+PART_PLUIE_MENSUELLE = {
+    "Maritime": [1, 3, 7, 11, 14, 17, 7, 4, 9, 13, 5, 1],
+    "Plateaux": [1, 3, 7, 10, 13, 15, 10, 8, 13, 12, 3, 1],
+    "Centrale": [0.5, 2, 5, 9, 12, 14, 14, 14, 16, 9, 1.5, 0.5],
+    "Kara": [0.3, 1, 3, 7, 11, 13, 16, 18, 18, 8, 1, 0.3],
+    "Savanes": [0, 0.5, 1.5, 4, 9, 13, 19, 24, 20, 7, 1, 0]
+}
+JOURS_PAR_MOIS = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+
+HORIZON_JOURS = 240
+# Au-delà d'un an, la culture n'arrive pas à maturité dans ces conditions
+JOURS_MAX = 365
+
+
+def serie_saisonniere(temperatures_moyennes: Sequence[float], dates_semis, jours: int = HORIZON_JOURS) -> np.ndarray:
+    """Températures journalières (parcelles, jours) : moyenne de la parcelle + cycle annuel"""
+    t_moy = np.atleast_1d(np.asarray(temperatures_moyennes, dtype=float))
+    jour_an = pd.DatetimeIndex(np.atleast_1d(pd.to_datetime(dates_semis))).dayofyear.to_numpy()
+    jours_an = jour_an[:, None] + np.arange(jours)
+    return t_moy[:, None] + AMPLITUDE_ANNUELLE * np.cos(2 * np.pi * (jours_an - JOUR_MAXIMUM) / 365.25)
+
+
+def degres_jours(temperatures: np.ndarray, cultures: Sequence[str]) -> np.ndarray:
+    """DJC de chaque jour (parcelles, jours) selon les seuils de chaque culture"""
+    cultures = np.asarray(cultures, dtype=object)
+    t_base = np.array([PARAMETRES_CULTURES[c]["t_base"] for c in cultures])[:, None]
+    t_plafond = np.array([PARAMETRES_CULTURES[c]["t_plafond"] for c in cultures])[:, None]
+    return np.clip(np.minimum(temperatures, t_plafond) - t_base, 0.0, None)
+
+
+def jours_maturite(temperatures: np.ndarray, cultures: Sequence[str]) -> np.ndarray:
+    """Jours du semis à la maturité pour chaque parcelle.
+
+    Au-delà de la série fournie, le cumul est prolongé au rythme moyen de la
+    série ; NaN si la maturité n'est pas atteinte en JOURS_MAX jours.
+    """
+    temperatures = np.atleast_2d(np.asarray(temperatures, dtype=float))
+    seuils = np.array([PARAMETRES_CULTURES[c]["seuil"] for c in np.asarray(cultures, dtype=object)])
+    cumul = np.cumsum(degres_jours(temperatures, cultures), axis=1)
+
+    atteint = cumul >= seuils[:, None]
+    jours = np.argmax(atteint, axis=1).astype(float) + 1
+    restant = ~atteint[:, -1]
+    if restant.any():
+        rythme = cumul[restant, -1] / temperatures.shape[1]
+        with np.errstate(divide="ignore"):
+            supplement = np.ceil((seuils[restant] - cumul[restant, -1]) / rythme)
+        jours[restant] = np.where(rythme > 0, temperatures.shape[1] + supplement, np.nan)
+    jours[jours > JOURS_MAX] = np.nan
+    return jours
+
+
+def dates_recolte(dates_semis, cultures: Sequence[str], temperatures_moyennes: Sequence[float],
+                  temperatures: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """Durée du cycle et date de récolte de chaque parcelle.
+
+    `temperatures` (parcelles, jours) remplace la série saisonnière construite
+    à partir des températures moyennes (prévision journalière, climatologie…).
+    """
+    semis = pd.DatetimeIndex(np.atleast_1d(pd.to_datetime(dates_semis)))
+    if temperatures is None:
+        temperatures = serie_saisonniere(temperatures_moyennes, semis)
+    jours = jours_maturite(temperatures, cultures)
+    return pd.DataFrame({
+        "jours": jours,
+        "date_recolte": semis + pd.to_timedelta(jours, unit="D")
+    })
+
+
+def part_pluie_cycle(regions: Sequence[str], dates_semis, jours: np.ndarray) -> np.ndarray:
+    """Part de la pluie annuelle de la région tombée entre le semis et la maturité (NaN si non atteinte)"""
+    regions = np.asarray(regions, dtype=object)
+    debut = pd.DatetimeIndex(np.atleast_1d(pd.to_datetime(dates_semis))).dayofyear.to_numpy() - 1
+    debut = np.minimum(debut, 364)
+    jours = np.asarray(jours, dtype=float)
+    fin = debut + np.minimum(np.nan_to_num(jours), 365).astype(int)
+
+    parts = np.full(len(regions), np.nan)
+    for region in np.unique(regions):
+        mensuel = np.asarray(PART_PLUIE_MENSUELLE[region], dtype=float)
+        quotidien = np.repeat(mensuel / mensuel.sum() / JOURS_PAR_MOIS, JOURS_PAR_MOIS)
+        # Deux années de suite : un cycle peut passer d'une année sur l'autre
+        cumul = np.concatenate([[0.0], np.cumsum(np.tile(quotidien, 2))])
+        lignes = regions == region
+        parts[lignes] = cumul[fin[lignes]] - cumul[debut[lignes]]
+    parts[np.isnan(jours)] = np.nan
+    return parts
+
+
+def calendrier_cultural(temperature_moyenne: float, annee: int) -> pd.DataFrame:
+    """Récolte estimée de chaque semis recommandé pour une température moyenne de saison"""
+    cultures = [culture for culture, _, _ in SEMIS_RECOMMANDES]
+    semis = pd.to_datetime([f"{annee}-{jour}" for _, _, jour in SEMIS_RECOMMANDES])
+    recolte = dates_recolte(semis, cultures, [temperature_moyenne] * len(cultures))
+    return pd.DataFrame({
+        "Culture": cultures,
+        "Saison": [saison for _, saison, _ in SEMIS_RECOMMANDES],
+        "Semis": semis.strftime("%d/%m"),
+        "Récolte estimée": recolte["date_recolte"].dt.strftime("%d/%m").fillna("-"),
+        "Durée (jours)": recolte["jours"].astype("Int64")
+    })
@@ -1,19 +1,210 @@
-import joblib
-import pandas as pd
-
-# Chargement du modèle
-model = joblib.load("modele_rendement_agricole.pkl")
-
-def predict_rendement(region, culture, type_sol,
-                      surface_ha, pluviometrie_mm, temperature_c):
-    data = pd.DataFrame([{
-        "region": region,
-        "culture": culture,
-        "type_sol": type_sol,
-        "surface_ha": surface_ha,
-        "pluviometrie_mm": pluviometrie_mm,
-        "temperature_moyenne_c": temperature_c
-    }])
-
-    prediction = model.predict(data)
-    return round(prediction[0], 2)
+import os
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from donnees import empreinte_fichier
+from metriques import CACHE_REQUETES, REGISTRE
+
+CHEMIN_MODELE = "modele_rendement_agricole.pkl"
+
+# Moteur d'inférence : "sklearn" (pickle), "onnx" (onnxruntime, fichier .onnx voisin)
+# ou "surface" (surface de réponse tabulée, fichier .surface.npy voisin, voir surface_reponse.py)
+MOTEUR = os.environ.get("MOTEUR_PREDICTION", "sklearn")
+
+# Colonnes attendues par le pipeline (même ordre que train_modele.py)
+COLONNES = [
+    "region",
+    "culture",
+    "type_sol",
+    "surface_ha",
+    "pluviometrie_mm",
+    "temperature_moyenne_c"
+]
+
+# Bornes des variables numériques (identiques aux champs du formulaire)
+BORNES_ENTREES = {
+    "surface_ha": (0.1, 1000.0),
+    "pluviometrie_mm": (0.0, 3000.0),
+    "temperature_moyenne_c": (15.0, 45.0)
+}
+
+# Facteurs d'ajustement agronomiques appliqués au rendement du modèle
+FACTEUR_IRRIGATION = {"Aucun": 1.0, "Traditionnel": 1.1, "Goutte à goutte": 1.25, "Aspersion": 1.15}
+FACTEUR_FERTI = {"Aucune": 0.8, "Organique": 1.0, "Chimique": 1.2, "Mixte": 1.15}
+
+
+class ErreurValidation(ValueError):
+    """Entrées invalides ; `erreurs` détaille chaque problème"""
+
+    def __init__(self, erreurs: List[str]):
+        super().__init__("; ".join(erreurs))
+        self.erreurs = erreurs
+
+
+CHARGEMENTS = REGISTRE.compteur("prevision_modele_chargements_total", "Chargements du modèle depuis le disque")
+DUREE_CHARGEMENT = REGISTRE.histogramme(
+    "prevision_modele_chargement_duree_secondes", "Durée de chargement du modèle"
+)
+
+
+@lru_cache(maxsize=2)
+def _charger(chemin: str, version: Optional[str]):
+    debut = time.perf_counter()
+    if chemin.endswith(".onnx"):
+        from onnx_modele import ModeleOnnx
+        modele = ModeleOnnx(chemin)
+    elif chemin.endswith(".surface.npy"):
+        from surface_reponse import SurfaceReponse
+        modele = SurfaceReponse(chemin)
+    else:
+        modele = joblib.load(chemin)
+    DUREE_CHARGEMENT.observe(time.perf_counter() - debut)
+    CHARGEMENTS.inc()
+    return modele
+
+
+def chemin_moteur(chemin: str = CHEMIN_MODELE, moteur: Optional[str] = None) -> str:
+    """Fichier servi par le moteur choisi (le .onnx ou le .surface.npy voisin du pickle)"""
+    moteur = moteur or MOTEUR
+    if moteur == "onnx" and not chemin.endswith(".onnx"):
+        return os.path.splitext(chemin)[0] + ".onnx"
+    if moteur == "surface" and not chemin.endswith(".surface.npy"):
+        return os.path.splitext(chemin)[0] + ".surface.npy"
+    return chemin
+
+
+def version_modele(chemin: str = CHEMIN_MODELE, moteur: Optional[str] = None) -> Optional[str]:
+    """Version du modèle = empreinte du fichier servi"""
+    return empreinte_fichier(chemin_moteur(chemin, moteur))
+
+
+def charger_modele(chemin: str = CHEMIN_MODELE, moteur: Optional[str] = None):
+    """Chargement du modèle, une seule fois par version du fichier"""
+    chemin = chemin_moteur(chemin, moteur)
+    return _charger(chemin, empreinte_fichier(chemin))
+
+
+def predict_lot(data: pd.DataFrame, chemin: str = CHEMIN_MODELE):
+    """Prédiction vectorisée pour un lot de parcelles"""
+    return charger_modele(chemin).predict(data[COLONNES])
+
+
+def categories_modele(modele) -> Dict[str, List[str]]:
+    """Modalités connues de chaque variable catégorielle (lues dans le OneHotEncoder)"""
+    if hasattr(modele, "categories"):
+        # Routeur de sous-modèles (segments.py)
+        return modele.categories
+    categories = {}
+    for _, transformeur, colonnes in modele[0].transformers_:
+        if hasattr(transformeur, "categories_"):
+            for colonne, valeurs in zip(colonnes, transformeur.categories_):
+                categories[colonne] = [str(v) for v in valeurs]
+    return categories
+
+
+def valeurs_feuilles(foret) -> np.ndarray:
+    """Valeurs des nœuds de chaque arbre, complétées en tableau (n_arbres, max_noeuds)"""
+    arbres = [estimateur.tree_ for estimateur in foret.estimators_]
+    valeurs = np.zeros((len(arbres), max(arbre.node_count for arbre in arbres)))
+    for i, arbre in enumerate(arbres):
+        valeurs[i, :arbre.node_count] = arbre.value[:, 0, 0]
+    return valeurs
+
+
+def seuils_decoupe(pipeline, variables: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Seuils de découpe de la forêt sur chaque variable numérique (toutes les occurrences, tous les arbres)"""
+    noms = list(pipeline[:-1].get_feature_names_out())
+    seuils = {}
+    for variable in variables:
+        indices = [i for i, nom in enumerate(noms) if nom.split("__")[-1] == variable]
+        seuils[variable] = np.concatenate([
+            estimateur.tree_.threshold[np.isin(estimateur.tree_.feature, indices)]
+            for estimateur in pipeline[-1].estimators_
+        ])
+    return seuils
+
+
+@lru_cache(maxsize=2)
+def _valeurs_feuilles(chemin: str, version: Optional[str]) -> np.ndarray:
+    return valeurs_feuilles(_charger(chemin, version)[-1])
+
+
+def arbres_pipeline(pipeline, data: pd.DataFrame, valeurs: np.ndarray) -> np.ndarray:
+    """Prédiction de chaque arbre de la forêt, tableau (n_lignes, n_arbres).
+
+    `apply` renvoie en un seul passage la feuille atteinte dans chaque arbre ;
+    les valeurs sont ensuite lues par indexation avancée, sans boucle sur les arbres.
+    """
+    X = pipeline[:-1].transform(data)
+    feuilles = pipeline[-1].apply(X)
+    return valeurs[np.arange(valeurs.shape[0]), feuilles]
+
+
+def _collecter_caches() -> None:
+    for cache, fonction in (("modele", _charger), ("feuilles", _valeurs_feuilles)):
+        info = fonction.cache_info()
+        CACHE_REQUETES.fixer(info.hits, cache=cache, resultat="hit")
+        CACHE_REQUETES.fixer(info.misses, cache=cache, resultat="miss")
+
+
+REGISTRE.avant_collecte(_collecter_caches)
+
+
+def predict_arbres(data: pd.DataFrame, chemin: str = CHEMIN_MODELE) -> np.ndarray:
+    """Prédiction de chaque arbre du pipeline enregistré, (n_lignes, n_arbres).
+
+    Lit toujours le pickle scikit-learn, quel que soit le moteur d'inférence.
+    """
+    version = empreinte_fichier(chemin)
+    return arbres_pipeline(_charger(chemin, version), data[COLONNES], _valeurs_feuilles(chemin, version))
+
+
+def predict_quantiles(data: pd.DataFrame, quantiles: Sequence[float] = (0.1, 0.5, 0.9),
+                      chemin: str = CHEMIN_MODELE) -> np.ndarray:
+    """Quantiles (P10/P50/P90 par défaut) de la distribution des arbres, (n_lignes, n_quantiles)"""
+    modele = _charger(chemin, empreinte_fichier(chemin))
+    if hasattr(modele, "predict_quantiles"):
+        # Routeur de sous-modèles : quantiles calculés segment par segment
+        return modele.predict_quantiles(data[COLONNES], quantiles)
+    return np.quantile(predict_arbres(data, chemin), quantiles, axis=1).T
+
+
+def predict_rendement(region, culture, type_sol,
+                      surface_ha, pluviometrie_mm, temperature_c):
+    data = pd.DataFrame([{
+        "region": region,
+        "culture": culture,
+        "type_sol": type_sol,
+        "surface_ha": surface_ha,
+        "pluviometrie_mm": pluviometrie_mm,
+        "temperature_moyenne_c": temperature_c
+    }])
+
+    prediction = predict_lot(data)
+    return round(prediction[0], 2)
+
+
+def ajuster_rendement(base, pluviometrie_mm, temperature_c, irrigation, fertilisation):
+    """Applique les facteurs pluie, température, irrigation et fertilisation.
+
+    Accepte des scalaires ou des tableaux (diffusion numpy) : un lot de scénarios
+    est ajusté en une seule opération.
+    """
+    pluie = np.asarray(pluviometrie_mm, dtype=float)
+    temp = np.asarray(temperature_c, dtype=float)
+
+    facteur_pluie = np.minimum(pluie / 1000, 1.2)
+    facteur_temp = np.where((temp >= 25) & (temp <= 30), 1.0, 0.85)
+    facteur_irrigation = pd.Series(np.atleast_1d(irrigation)).map(FACTEUR_IRRIGATION).to_numpy()
+    facteur_ferti = pd.Series(np.atleast_1d(fertilisation)).map(FACTEUR_FERTI).to_numpy()
+    if np.ndim(irrigation) == 0:
+        facteur_irrigation = facteur_irrigation[0]
+    if np.ndim(fertilisation) == 0:
+        facteur_ferti = facteur_ferti[0]
+
+    return np.asarray(base, dtype=float) * facteur_pluie * facteur_temp * facteur_irrigation * facteur_ferti
@@ -0,0 +1,182 @@
+import gc
+import logging
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from typing import Dict
+
+from metriques import PERIODE_PUBLICATION, REGISTRE
+
+logger = logging.getLogger("prefork")
+
+
+class SuperviseurPrefork:
+    """Processus maître du mode prefork.
+
+    Le maître charge et préchauffe le modèle une seule fois, puis forke les
+    workers : ils partagent les pages du modèle en copie à l'écriture et
+    acceptent tous sur la même socket d'écoute. Le maître relance les workers
+    qui meurent, recharge le modèle sur SIGHUP (nouvelle génération de workers
+    puis arrêt propre de l'ancienne) et arrête tout sur SIGTERM / SIGINT.
+    Les métriques de tous les processus sont agrégées par un dossier partagé,
+    supprimé à l'arrêt : /metrics donne les mêmes totaux quel que soit le
+    worker qui répond.
+    """
+
+    def __init__(self, serveur, service, n_workers: int, delai_grace: float = 30.0):
+        if not hasattr(os, "fork"):
+            raise RuntimeError("Le mode prefork nécessite os.fork (Linux / macOS)")
+        self.serveur = serveur
+        self.service = service
+        self.n_workers = n_workers
+        self.delai_grace = delai_grace
+        self.workers: Dict[int, int] = {}  # pid -> génération
+        self.generation = 0
+        self._arret = False
+        self._rechargement = False
+        self.dossier_metriques = None
+
+    def lancer(self) -> None:
+        self.dossier_metriques = tempfile.mkdtemp(prefix="prefork-metriques-")
+        REGISTRE.partager(self.dossier_metriques)
+        self.service.charger()
+        REGISTRE.publier()
+        self._figer_memoire()
+
+        signal.signal(signal.SIGTERM, self._demander_arret)
+        signal.signal(signal.SIGINT, self._demander_arret)
+        signal.signal(signal.SIGHUP, self._demander_rechargement)
+
+        for _ in range(self.n_workers):
+            self._forker()
+
+        try:
+            while not self._arret:
+                if self._rechargement:
+                    self._rechargement = False
+                    self._recharger()
+                self._relancer_workers_morts()
+                time.sleep(0.2)
+        finally:
+            self._arreter_workers(list(self.workers))
+            self.serveur.server_close()
+            shutil.rmtree(self.dossier_metriques, ignore_errors=True)
+
+    def _figer_memoire(self) -> None:
+        # Les objets du modèle passent dans la génération permanente du GC :
+        # les collectes des workers ne touchent plus leurs pages partagées
+        gc.collect()
+        gc.freeze()
+
+    def _demander_arret(self, signum, frame) -> None:
+        self._arret = True
+
+    def _demander_rechargement(self, signum, frame) -> None:
+        self._rechargement = True
+
+    def _forker(self) -> None:
+        # Signaux bloqués pendant le fork : le worker installe ses propres
+        # gestionnaires avant de pouvoir recevoir SIGTERM
+        signaux = {signal.SIGTERM, signal.SIGINT, signal.SIGHUP}
+        signal.pthread_sigmask(signal.SIG_BLOCK, signaux)
+        try:
+            pid = os.fork()
+            if pid == 0:
+                self._executer_worker(signaux)
+        finally:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, signaux)
+        self.workers[pid] = self.generation
+        logger.info("Worker %d démarré (génération %d)", pid, self.generation)
+
+    def _executer_worker(self, signaux) -> None:
+        """Boucle d'un worker ; ne revient jamais (os._exit)"""
+        code = 0
+        try:
+            signal.signal(signal.SIGHUP, signal.SIG_IGN)
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, self._arreter_worker)
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, signaux)
+            # Compteurs hérités du maître : seuls les incréments du worker sont publiés
+            REGISTRE.partager(self.dossier_metriques, PERIODE_PUBLICATION)
+            # Fils de requête suivis : server_close() attend les requêtes en cours
+            self.serveur.daemon_threads = False
+            self.service.demarrer()
+            self.serveur.serve_forever()
+            self.serveur.server_close()
+            REGISTRE.publier()
+        except BaseException:
+            logger.exception("Worker %d arrêté sur erreur", os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _arreter_worker(self, signum, frame) -> None:
+        # shutdown() attend la fin de serve_forever : il doit venir d'un autre fil
+        self.serveur.arret_demande = True
+        threading.Thread(target=self.serveur.shutdown, daemon=True).start()
+
+    def _relancer_workers_morts(self) -> None:
+        while self.workers:
+            try:
+                pid, statut = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            generation = self.workers.pop(pid, None)
+            if generation == self.generation and not self._arret:
+                logger.warning("Worker %d terminé (statut %d), relance", pid, statut)
+                self._forker()
+
+    def _recharger(self) -> None:
+        """Recharge le modèle dans le maître, puis remplace les workers"""
+        logger.info("Rechargement du modèle")
+        try:
+            gc.unfreeze()
+            self.service.charger()
+        except Exception:
+            logger.exception("Échec du rechargement, les workers actuels sont conservés")
+            return
+        finally:
+            self._figer_memoire()
+        REGISTRE.publier()
+
+        anciens = list(self.workers)
+        self.generation += 1
+        for _ in range(self.n_workers):
+            self._forker()
+        self._arreter_workers(anciens)
+        logger.info("Rechargement terminé (modèle %s)", (self.service.version or "?")[:12])
+
+    def _arreter_workers(self, pids) -> None:
+        """SIGTERM puis attente (requêtes en cours terminées), SIGKILL après le délai de grâce"""
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        echeance = time.monotonic() + self.delai_grace
+        restants = set(pids)
+        while restants and time.monotonic() < echeance:
+            for pid in list(restants):
+                try:
+                    fini, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    fini = pid
+                if fini:
+                    restants.discard(pid)
+                    self.workers.pop(pid, None)
+            time.sleep(0.1)
+
+        for pid in restants:
+            logger.warning("Worker %d ne s'arrête pas, SIGKILL", pid)
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            self.workers.pop(pid, None)
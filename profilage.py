@@ -0,0 +1,97 @@
+"""Profilage optionnel des exécutions (reruns) de l'application Streamlit.
+
+Activé par la variable d'environnement PROFILAGE ou le paramètre d'URL
+`?profilage=` : "1" chronomètre les étapes nommées de chaque rerun et les
+affiche dans un panneau de débogage ; "cprofile" enregistre en plus un
+profil cProfile par rerun dans PROFILAGE_DOSSIER (défaut : profils/).
+
+    PROFILAGE=cprofile streamlit run Prevision_Interface.py
+    python -m pstats profils/<fichier>.prof
+"""
+import cProfile
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import streamlit as st
+
+MODES = ("1", "cprofile")
+DOSSIER_PROFILS = os.environ.get("PROFILAGE_DOSSIER", "profils")
+
+_CLE_SESSION = "_profil_rerun"
+
+
+class ProfilRerun:
+    """Durées des étapes d'un rerun, et profil cProfile si demandé"""
+
+    def __init__(self, page: str, cprofile: bool = False):
+        self.page = page
+        self.etapes: List[Tuple[str, float]] = []  # (nom, durée en s), dans l'ordre de fin
+        self.fichier: Optional[str] = None
+        self.total = 0.0
+        self._profileur = cProfile.Profile() if cprofile else None
+        self._debut = time.perf_counter()
+        if self._profileur is not None:
+            self._profileur.enable()
+
+    @contextmanager
+    def etape(self, nom: str):
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapes.append((nom, time.perf_counter() - debut))
+
+    def terminer(self, dossier: str = DOSSIER_PROFILS) -> None:
+        self.total = time.perf_counter() - self._debut
+        if self._profileur is None:
+            return
+        self._profileur.disable()
+        os.makedirs(dossier, exist_ok=True)
+        horodatage = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        nom_page = "".join(c if c.isalnum() else "_" for c in self.page)
+        self.fichier = os.path.join(dossier, f"{horodatage}_{nom_page}.prof")
+        self._profileur.dump_stats(self.fichier)
+
+
+def mode_profilage() -> Optional[str]:
+    """Mode demandé par l'URL, sinon par l'environnement ; None si désactivé"""
+    mode = st.query_params.get("profilage") or os.environ.get("PROFILAGE")
+    return mode if mode in MODES else None
+
+
+def demarrer_rerun(page: str) -> Optional[ProfilRerun]:
+    """Profil du rerun en cours (None si le profilage est désactivé)"""
+    mode = mode_profilage()
+    profil = ProfilRerun(page, cprofile=(mode == "cprofile")) if mode else None
+    st.session_state[_CLE_SESSION] = profil
+    return profil
+
+
+@contextmanager
+def etape(nom: str):
+    """Chronomètre une étape du rerun en cours ; sans effet hors profilage"""
+    profil = st.session_state.get(_CLE_SESSION)
+    if profil is None:
+        yield
+        return
+    with profil.etape(nom):
+        yield
+
+
+def afficher_panneau(profil: ProfilRerun) -> None:
+    """Panneau de débogage : durée de chaque étape et part du rerun"""
+    profil.terminer()
+    with st.expander(f"Profilage - {profil.page} : {profil.total * 1000:.0f} ms", expanded=True):
+        lignes = [
+            {"Étape": nom, "Durée (ms)": round(duree * 1000, 1), "Part (%)": round(100 * duree / profil.total, 1)}
+            for nom, duree in profil.etapes
+        ]
+        if lignes:
+            st.dataframe(lignes, use_container_width=True, hide_index=True)
+        else:
+            st.caption("Aucune étape chronométrée sur cette page.")
+        if profil.fichier:
+            st.caption(f"Profil cProfile : {profil.fichier} (python -m pstats {profil.fichier})")
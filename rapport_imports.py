@@ -0,0 +1,71 @@
+"""Rapport des temps d'import de chaque page de l'application.
+
+Chaque module est importé dans un interpréteur neuf avec `python -X importtime` ;
+on affiche le temps cumulé et les dépendances les plus coûteuses.
+
+    python rapport_imports.py
+    python rapport_imports.py --top 10 vues.prevision
+"""
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+MODULES_PAR_DEFAUT = [
+    "streamlit",
+    "vues.accueil",
+    "vues.prevision",
+    "vues.visualisations",
+    "vues.historique",
+    "vues.rapport",
+    "vues.a_propos"
+]
+
+LIGNE_IMPORTTIME = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def mesurer(module: str) -> List[Tuple[int, int, str]]:
+    """(temps propre µs, temps cumulé µs, profondeur, module) pour chaque import"""
+    resultat = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=Path(__file__).resolve().parent,
+        capture_output=True,
+        text=True
+    )
+    if resultat.returncode != 0:
+        raise RuntimeError(f"Import de {module} impossible :\n{resultat.stderr[-2000:]}")
+
+    mesures = []
+    for ligne in resultat.stderr.splitlines():
+        correspondance = LIGNE_IMPORTTIME.match(ligne)
+        if correspondance:
+            propre, cumule, indentation, nom = correspondance.groups()
+            mesures.append((int(propre), int(cumule), len(indentation) // 2, nom))
+    return mesures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps d'import des pages de l'application")
+    parser.add_argument("modules", nargs="*", default=MODULES_PAR_DEFAUT)
+    parser.add_argument("--top", type=int, default=5, help="Dépendances les plus coûteuses à afficher")
+    args = parser.parse_args()
+
+    print(f"{'Module':<24}{'Total (ms)':>12}   Dépendances principales (cumulé, ms)")
+    print("-" * 100)
+    for module in args.modules:
+        mesures = mesurer(module)
+        total = sum(propre for propre, _, _, _ in mesures) / 1000
+        # Paquets de premier niveau (profondeur 0 ou 1) triés par temps cumulé
+        principaux = sorted(
+            (m for m in mesures if m[2] <= 1 and m[3] != module),
+            key=lambda m: m[1],
+            reverse=True
+        )[:args.top]
+        detail = ", ".join(f"{nom} {cumule / 1000:.0f}" for _, cumule, _, nom in principaux)
+        print(f"{module:<24}{total:>12.0f}   {detail}")
+
+
+if __name__ == "__main__":
+    main()
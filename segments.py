@@ -0,0 +1,74 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from predict import COLONNES, arbres_pipeline, valeurs_feuilles
+
+# Niveaux de spécialisation, du plus fin au plus général ; () = modèle global
+NIVEAUX = [("region", "culture"), ("culture",), ()]
+
+
+class RouteurSegments:
+    """Sous-modèles spécialisés par segment derrière l'interface `predict` d'un pipeline.
+
+    Chaque ligne est servie par le modèle du segment le plus fin disponible
+    (région x culture, puis culture, puis modèle global). Un lot est découpé
+    par segment : un seul `predict` par segment présent dans le lot.
+    """
+
+    def __init__(self, modeles: Dict[Tuple[str, ...], Dict[Tuple, object]],
+                 categories: Dict[str, List[str]]):
+        self.modeles = modeles
+        self.categories = categories
+        self._valeurs: Dict[Tuple, np.ndarray] = {}
+
+    def __getstate__(self):
+        # Les tables de feuilles sont recalculées à la demande, pas enregistrées
+        etat = self.__dict__.copy()
+        etat["_valeurs"] = {}
+        return etat
+
+    def resume(self) -> Dict[str, int]:
+        """Nombre de sous-modèles par niveau"""
+        return {" x ".join(niveau) or "global": len(self.modeles.get(niveau, {})) for niveau in NIVEAUX}
+
+    def _affecter(self, X: pd.DataFrame) -> List[Tuple[Tuple, Tuple, np.ndarray]]:
+        """(niveau, clé, positions) de chaque groupe de lignes servi par un même modèle"""
+        restant = np.ones(len(X), dtype=bool)
+        groupes = []
+        for niveau in NIVEAUX:
+            positions_restantes = np.flatnonzero(restant)
+            if len(positions_restantes) == 0:
+                break
+            modeles = self.modeles.get(niveau, {})
+            if not niveau:
+                groupes.append(((), (), positions_restantes))
+                break
+            sous = X.iloc[positions_restantes]
+            for cle, indices in sous.groupby(list(niveau), sort=False).indices.items():
+                cle = cle if isinstance(cle, tuple) else (cle,)
+                if cle in modeles:
+                    positions = positions_restantes[indices]
+                    groupes.append((niveau, cle, positions))
+                    restant[positions] = False
+        return groupes
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        X = X[COLONNES].reset_index(drop=True)
+        resultat = np.empty(len(X))
+        for niveau, cle, positions in self._affecter(X):
+            resultat[positions] = self.modeles[niveau][cle].predict(X.iloc[positions])
+        return resultat
+
+    def predict_quantiles(self, X: pd.DataFrame, quantiles: Sequence[float]) -> np.ndarray:
+        """Quantiles de la distribution des arbres, calculés segment par segment"""
+        X = X[COLONNES].reset_index(drop=True)
+        resultat = np.empty((len(X), len(quantiles)))
+        for niveau, cle, positions in self._affecter(X):
+            modele = self.modeles[niveau][cle]
+            if (niveau, cle) not in self._valeurs:
+                self._valeurs[(niveau, cle)] = valeurs_feuilles(modele[-1])
+            par_arbre = arbres_pipeline(modele, X.iloc[positions], self._valeurs[(niveau, cle)])
+            resultat[positions] = np.quantile(par_arbre, quantiles, axis=1).T
+        return resultat
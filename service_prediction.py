@@ -0,0 +1,288 @@
+"""Service HTTP de prévision du rendement (sans Streamlit).
+
+Lancement :
+    python service_prediction.py --port 8000
+    python service_prediction.py --port 8000 --workers 4    # prefork, modèle partagé
+
+Points d'accès :
+    GET  /health          200 quand le modèle est chargé et préchauffé, 503 sinon
+    GET  /metrics         métriques au format Prometheus
+    POST /predict         {"region": ..., "culture": ..., "type_sol": ...,
+                           "surface_ha": ..., "pluviometrie_mm": ..., "temperature_moyenne_c": ...}
+    POST /predict/batch   {"parcelles": [ {...}, {...} ]}
+"""
+import argparse
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from analyse_modele import PARCELLE_DEFAUT
+from derive import observer_lignes
+from metriques import DUREE_PREDICTION, PARCELLES_PREDITES, REGISTRE, TYPE_CONTENU
+from microlots import OrdonnanceurLots
+from predict import (BORNES_ENTREES, CHEMIN_MODELE, COLONNES, ErreurValidation, categories_modele, charger_modele,
+                     version_modele)
+
+logger = logging.getLogger("service_prediction")
+
+TAILLE_MAX_CORPS = 10 * 1024 * 1024
+LIGNES_MAX_LOT = 100_000
+
+REQUETES = REGISTRE.compteur(
+    "prevision_requetes_total", "Requêtes de prédiction par chemin et statut HTTP", ("chemin", "statut")
+)
+
+
+class ErreurRequete(Exception):
+    """Requête HTTP mal formée (en-têtes incohérents) : réponse 400"""
+
+
+class ServicePrediction:
+    """Modèle chargé, validation des entrées et prédiction par lot.
+
+    Les requêtes concurrentes passent par un ordonnanceur de micro-lots : elles
+    sont regroupées en un seul `predict` vectorisé.
+    """
+
+    def __init__(self, chemin_modele: str = CHEMIN_MODELE,
+                 attente_max_ms: float = 5.0, lignes_max: int = 256, moteur: Optional[str] = None):
+        self.chemin_modele = chemin_modele
+        self.moteur = moteur
+        self.attente_max_ms = attente_max_ms
+        self.lignes_max = lignes_max
+        self.modele = None
+        self.version: Optional[str] = None
+        self.categories: Dict[str, List[str]] = {}
+        self.pret = threading.Event()
+        self.ordonnanceur: Optional[OrdonnanceurLots] = None
+
+    def demarrer(self) -> None:
+        """Lance les fils de l'ordonnanceur (après un éventuel fork : les fils n'y survivent pas)"""
+        self.ordonnanceur = OrdonnanceurLots(self.predire, self.attente_max_ms, self.lignes_max)
+
+    def charger(self) -> None:
+        """Charge le modèle puis le préchauffe avant de se déclarer prêt"""
+        self.modele = charger_modele(self.chemin_modele, self.moteur)
+        self.version = version_modele(self.chemin_modele, self.moteur)
+        self.categories = categories_modele(self.modele)
+
+        # Préchauffage : un lot couvrant chaque modalité connue
+        n = max(len(v) for v in self.categories.values())
+        lot = pd.DataFrame([PARCELLE_DEFAUT] * n)
+        for colonne, valeurs in self.categories.items():
+            lot[colonne] = [valeurs[i % len(valeurs)] for i in range(n)]
+        self.modele.predict(lot[COLONNES])
+
+        self.pret.set()
+        logger.info("Modèle %s chargé et préchauffé", (self.version or "?")[:12])
+
+    def valider(self, parcelle: Dict, position: Optional[int] = None) -> Dict:
+        """Vérifie une parcelle et renvoie la ligne à prédire"""
+        prefixe = f"parcelles[{position}]." if position is not None else ""
+        if not isinstance(parcelle, dict):
+            raise ErreurValidation([f"{prefixe[:-1] or 'corps'} : objet JSON attendu"])
+
+        erreurs = []
+        ligne = {}
+        for colonne, valeurs in self.categories.items():
+            valeur = parcelle.get(colonne)
+            if valeur is None:
+                erreurs.append(f"{prefixe}{colonne} : champ obligatoire")
+            elif str(valeur) not in valeurs:
+                erreurs.append(f"{prefixe}{colonne} : valeur inconnue '{valeur}' (attendu : {', '.join(valeurs)})")
+            else:
+                ligne[colonne] = str(valeur)
+
+        for colonne, (bas, haut) in BORNES_ENTREES.items():
+            valeur = parcelle.get(colonne)
+            if valeur is None:
+                erreurs.append(f"{prefixe}{colonne} : champ obligatoire")
+            elif isinstance(valeur, bool) or not isinstance(valeur, (int, float)):
+                erreurs.append(f"{prefixe}{colonne} : nombre attendu")
+            elif not bas <= valeur <= haut:
+                erreurs.append(f"{prefixe}{colonne} : hors bornes [{bas}, {haut}]")
+            else:
+                ligne[colonne] = float(valeur)
+
+        if erreurs:
+            raise ErreurValidation(erreurs)
+        return ligne
+
+    def predire(self, lignes: List[Dict]) -> List[float]:
+        """Prédiction vectorisée d'un lot de lignes déjà validées"""
+        observer_lignes(lignes, self.chemin_modele)
+        data = pd.DataFrame(lignes, columns=COLONNES)
+        return [round(float(v), 2) for v in self.modele.predict(data)]
+
+    def predire_regroupe(self, lignes: List[Dict]) -> List[float]:
+        """Prédiction via l'ordonnanceur de micro-lots (appel bloquant)"""
+        return self.ordonnanceur.predire(lignes)
+
+
+class GestionnaireHTTP(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "PrevisionAgricole/1.0"
+    # Les connexions persistantes inactives sont fermées (arrêt propre des workers)
+    timeout = 10
+
+    @property
+    def service(self) -> ServicePrediction:
+        return self.server.service
+
+    def log_message(self, format, *args):
+        logger.debug("%s - " + format, self.address_string(), *args)
+
+    def _repondre(self, statut: int, contenu: Dict) -> None:
+        self._envoyer(statut, json.dumps(contenu, ensure_ascii=False).encode("utf-8"),
+                      "application/json; charset=utf-8")
+
+    def _envoyer(self, statut: int, corps: bytes, type_contenu: str) -> None:
+        self.statut = statut
+        self.send_response(statut)
+        self.send_header("Content-Type", type_contenu)
+        self.send_header("Content-Length", str(len(corps)))
+        if getattr(self.server, "arret_demande", False):
+            # Arrêt en cours : on termine la requête puis on ferme la connexion
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def _lire_json(self):
+        try:
+            longueur = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            raise ErreurRequete("Content-Length invalide")
+        if longueur < 0:
+            raise ErreurRequete("Content-Length négatif")
+        if longueur > TAILLE_MAX_CORPS:
+            raise ErreurValidation([f"corps trop volumineux (max {TAILLE_MAX_CORPS} octets)"])
+        try:
+            return json.loads(self.rfile.read(longueur) or b"null")
+        except json.JSONDecodeError as e:
+            raise ErreurValidation([f"JSON invalide : {e}"])
+
+    def do_GET(self):
+        if self.path == "/health":
+            if self.service.pret.is_set():
+                self._repondre(200, {"statut": "pret", "version_modele": self.service.version})
+            else:
+                self._repondre(503, {"statut": "chargement"})
+        elif self.path == "/metrics":
+            self._envoyer(200, REGISTRE.exposition().encode("utf-8"), TYPE_CONTENU)
+        else:
+            self._repondre(404, {"erreur": "ressource inconnue"})
+
+    def do_POST(self):
+        if self.path not in ("/predict", "/predict/batch"):
+            self._repondre(404, {"erreur": "ressource inconnue"})
+            return
+        chemin = "unitaire" if self.path == "/predict" else "lot"
+        debut = time.perf_counter()
+        # Statut d'erreur par défaut : une exception avant toute réponse reste comptée
+        self.statut = 500
+        try:
+            self._predire(chemin)
+        finally:
+            REQUETES.inc(chemin=chemin, statut=self.statut)
+            if self.statut == 200:
+                DUREE_PREDICTION.observe(time.perf_counter() - debut, chemin=chemin)
+
+    def _predire(self, chemin: str) -> None:
+        if not self.service.pret.is_set():
+            self._repondre(503, {"erreur": "modèle en cours de chargement"})
+            return
+
+        try:
+            contenu = self._lire_json()
+            if chemin == "unitaire":
+                ligne = self.service.valider(contenu)
+                rendement = self.service.predire_regroupe([ligne])[0]
+                PARCELLES_PREDITES.inc(chemin=chemin)
+                self._repondre(200, {"rendement_t_ha": rendement})
+            else:
+                parcelles = contenu.get("parcelles") if isinstance(contenu, dict) else None
+                if not isinstance(parcelles, list) or not parcelles:
+                    raise ErreurValidation(["parcelles : liste non vide attendue"])
+                if len(parcelles) > LIGNES_MAX_LOT:
+                    raise ErreurValidation([f"parcelles : au plus {LIGNES_MAX_LOT} lignes par lot"])
+
+                lignes, erreurs = [], []
+                for i, parcelle in enumerate(parcelles):
+                    try:
+                        lignes.append(self.service.valider(parcelle, i))
+                    except ErreurValidation as e:
+                        erreurs.extend(e.erreurs)
+                if erreurs:
+                    raise ErreurValidation(erreurs)
+                rendements = self.service.predire_regroupe(lignes)
+                PARCELLES_PREDITES.inc(len(rendements), chemin=chemin)
+                self._repondre(200, {"rendements_t_ha": rendements})
+        except ErreurRequete as e:
+            self._repondre(400, {"erreur": str(e)})
+        except ErreurValidation as e:
+            self._repondre(422, {"erreurs": e.erreurs})
+        except Exception:
+            logger.exception("Erreur de prédiction")
+            self._repondre(500, {"erreur": "erreur interne"})
+
+
+class ServeurHTTP(ThreadingHTTPServer):
+    daemon_threads = True
+    # File d'attente de connexions suffisante pour des centaines de clients simultanés
+    request_queue_size = 1024
+    arret_demande = False
+
+
+def creer_serveur(hote: str, port: int, service: ServicePrediction) -> ServeurHTTP:
+    serveur = ServeurHTTP((hote, port), GestionnaireHTTP)
+    serveur.service = service
+    return serveur
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Service HTTP de prévision du rendement agricole")
+    parser.add_argument("--hote", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--modele", default=CHEMIN_MODELE, help="Chemin du pipeline entraîné (.pkl)")
+    parser.add_argument("--attente-ms", type=float, default=5.0,
+                        help="Attente maximale d'une requête avant exécution de son micro-lot")
+    parser.add_argument("--lot-max", type=int, default=256, help="Nombre maximal de lignes par micro-lot")
+    parser.add_argument("--moteur", choices=["sklearn", "onnx", "surface"], default=None,
+                        help="Moteur d'inférence (défaut : variable MOTEUR_PREDICTION, sinon sklearn)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Mode prefork : nombre de processus workers partageant le modèle (0 = un seul processus)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(process)d %(asctime)s %(name)s %(levelname)s %(message)s")
+
+    service = ServicePrediction(args.modele, args.attente_ms, args.lot_max, args.moteur)
+    serveur = creer_serveur(args.hote, args.port, service)
+
+    if args.workers > 0:
+        from prefork import SuperviseurPrefork
+
+        logger.info("Écoute sur http://%s:%d (prefork, %d workers)", args.hote, args.port, args.workers)
+        SuperviseurPrefork(serveur, service, args.workers).lancer()
+        return
+
+    # Le serveur écoute dès le départ ; /health reste à 503 jusqu'à la fin du préchauffage
+    service.demarrer()
+    threading.Thread(target=service.charger, daemon=True).start()
+
+    logger.info("Écoute sur http://%s:%d", args.hote, args.port)
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.server_close()
+
+
+if __name__ == "__main__":
+    main()
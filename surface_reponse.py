@@ -0,0 +1,343 @@
+"""Surface de réponse précalculée : le modèle tabulé sur une grille, servi par interpolation.
+
+L'espace des entrées est petit : 75 combinaisons région x culture x sol et
+trois variables numériques bornées. Pour chaque combinaison, le modèle est
+évalué une fois pour toutes sur une grille (surface x pluie x température) ;
+le tableau (float16, ~67 Mo) est ouvert en mémoire partagée et chaque
+prédiction est une interpolation trilinéaire : une dichotomie par axe,
+8 lectures, sans scikit-learn.
+
+Une forêt est une fonction en marches : une marche tombée au milieu d'une
+maille est interpolée avec une erreur jusqu'à la moitié de sa hauteur, quel
+que soit le pas de la grille. Chaque axe compte donc des points réguliers
+(POINTS_GRILLE) et, pour les seuils aux plus hautes marches (SEUILS_ANCRES,
+hauteur moyenne sur les arbres), deux nœuds float32 qui les encadrent : la
+marche est reproduite sans interpolation.
+
+Une forêt ne varie qu'entre ses seuils de découpe extrêmes : la grille va,
+pour chaque variable, du float32 au plus égal au plus petit seuil au float32
+strictement supérieur au plus grand (scikit-learn compare en float32 et
+envoie x <= seuil à gauche). Au-delà, le modèle ne dépend plus de la
+variable : les valeurs sont ramenées au bord de la grille sans erreur
+supplémentaire, et aux sommets de la grille la surface vaut le modèle à
+l'arrondi float16 près. L'erreur d'interpolation est mesurée contre le
+modèle à la construction (parcelles d'entraînement et points tirés dans tout
+le domaine) ; au-delà de ERREUR_MAX, la surface est rejetée et le fichier
+servi n'est pas remplacé.
+
+Les métadonnées (modalités, bornes, erreurs) suivent la table dans le même
+fichier .npy, remplacé d'un seul os.replace : un serveur qui charge pendant
+une reconstruction lit l'ancienne version ou la nouvelle, jamais un mélange.
+Le .json voisin n'en est qu'une copie lisible.
+
+    python surface_reponse.py                           # modele_rendement_agricole.surface.npy (+ .json)
+    python surface_reponse.py --points 24 161 81        # grille régulière plus fine
+    python surface_reponse.py --ancres 8 30 80          # plus de marches de température encadrées
+    python surface_reponse.py --erreur-max 0.2          # seuil de rejet plus strict
+    MOTEUR_PREDICTION=surface streamlit run Prevision_Interface.py
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from donnees import CHEMIN_DONNEES, empreinte_fichier
+from predict import BORNES_ENTREES, CHEMIN_MODELE, COLONNES, categories_modele, chemin_moteur, seuils_decoupe
+
+CATEGORIELLES = ["region", "culture", "type_sol"]
+NUMERIQUES = ["surface_ha", "pluviometrie_mm", "temperature_moyenne_c"]
+
+# Points réguliers de la grille par variable (surface, pluie, température)
+POINTS_GRILLE = (12, 61, 31)
+# Seuils ancrés par variable : les plus hautes marches de la forêt, chacune encadrée par deux nœuds
+SEUILS_ANCRES = (8, 30, 50)
+# En dessous, les modalités sont codées par dictionnaire (moins coûteux que pandas pour quelques lignes)
+PETIT_LOT = 32
+# Écart absolu maximal admis entre la surface et le modèle (t/ha), sur chaque jeu de contrôle
+ERREUR_MAX = 0.3
+
+
+def _pipelines(modele) -> List:
+    """Pipelines scikit-learn du modèle (un seul, ou ceux de chaque segment du routeur)"""
+    if hasattr(modele, "modeles"):
+        return [p for par_valeurs in modele.modeles.values() for p in par_valeurs.values()]
+    return [modele]
+
+
+def _float32_gauche(valeurs: np.ndarray) -> np.ndarray:
+    """Plus grand float32 <= chaque valeur : évalué comme la valeur, à gauche de son seuil"""
+    arrondi = np.asarray(valeurs).astype(np.float32)
+    return np.where(arrondi > valeurs, np.nextafter(arrondi, np.float32(-np.inf)), arrondi).astype(float)
+
+
+def _float32_droite(valeurs: np.ndarray) -> np.ndarray:
+    """Plus petit float32 > chaque valeur : premier point à droite du seuil (sklearn envoie x <= seuil à gauche)"""
+    arrondi = np.asarray(valeurs).astype(np.float32)
+    return np.where(arrondi <= valeurs, np.nextafter(arrondi, np.float32(np.inf)), arrondi).astype(float)
+
+
+def bornes_seuils(modele) -> Dict[str, Tuple[float, float]]:
+    """Intervalle de la grille de chaque variable numérique : au-delà, le modèle ne dépend plus d'elle.
+
+    Bas : plus grand float32 <= plus petit seuil ; haut : plus petit float32 > plus grand seuil.
+    """
+    seuils = [seuils_decoupe(pipeline, NUMERIQUES) for pipeline in _pipelines(modele)]
+    bornes = {}
+    for variable in NUMERIQUES:
+        valeurs = np.concatenate([par_variable[variable] for par_variable in seuils])
+        if not len(valeurs):
+            # Variable jamais utilisée : un seul point suffirait, deux pour interpoler
+            bornes[variable] = BORNES_ENTREES[variable]
+            continue
+        bornes[variable] = (float(_float32_gauche(valeurs.min())), float(_float32_droite(valeurs.max())))
+    return bornes
+
+
+def marches_seuils(modele) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Seuils distincts de chaque variable numérique et hauteur moyenne de leur marche (t/ha).
+
+    Chaque découpe contribue |valeur gauche - valeur droite| pondéré par la part des
+    échantillons qui atteignent le nœud, divisé par le nombre d'arbres.
+    """
+    seuils = {variable: [] for variable in NUMERIQUES}
+    hauteurs = {variable: [] for variable in NUMERIQUES}
+    n_arbres = 0
+    for pipeline in _pipelines(modele):
+        noms = list(pipeline[:-1].get_feature_names_out())
+        for estimateur in pipeline[-1].estimators_:
+            arbre = estimateur.tree_
+            n_arbres += 1
+            for variable in NUMERIQUES:
+                indices = [i for i, nom in enumerate(noms) if nom.split("__")[-1] == variable]
+                noeuds = np.flatnonzero(np.isin(arbre.feature, indices) & (arbre.children_left >= 0))
+                saut = np.abs(arbre.value[arbre.children_left[noeuds], 0, 0]
+                              - arbre.value[arbre.children_right[noeuds], 0, 0])
+                seuils[variable].append(arbre.threshold[noeuds])
+                hauteurs[variable].append(saut * arbre.weighted_n_node_samples[noeuds] / arbre.weighted_n_node_samples[0])
+    marches = {}
+    for variable in NUMERIQUES:
+        distincts, inverse = np.unique(np.concatenate(seuils[variable]), return_inverse=True)
+        marches[variable] = (distincts, np.bincount(inverse, np.concatenate(hauteurs[variable])) / n_arbres)
+    return marches
+
+
+def axes_grille(modele, points: Sequence[int] = POINTS_GRILLE,
+                ancres: Sequence[int] = SEUILS_ANCRES) -> Dict[str, np.ndarray]:
+    """Nœuds de chaque axe : `points` réguliers entre les bornes, plus deux nœuds encadrant chacun
+    des `ancres` seuils aux plus hautes marches (la marche tombe entre deux nœuds, sans être interpolée)"""
+    bornes = bornes_seuils(modele)
+    marches = marches_seuils(modele)
+    axes = {}
+    for variable, n, k in zip(NUMERIQUES, points, ancres):
+        seuils, hauteurs = marches[variable]
+        retenus = seuils[np.argsort(-hauteurs)[:k]]
+        noeuds = np.concatenate([np.linspace(*bornes[variable], n), _float32_gauche(retenus), _float32_droite(retenus)])
+        # Nœuds ramenés en float32, comme les entrées comparées par la forêt
+        axes[variable] = np.unique(noeuds.astype(np.float32)).astype(float)
+    return axes
+
+
+def construire_surface(modele, points: Sequence[int] = POINTS_GRILLE,
+                       ancres: Sequence[int] = SEUILS_ANCRES) -> Tuple[np.ndarray, Dict]:
+    """Prédictions du modèle sur la grille (combinaisons, surface, pluie, température) et métadonnées"""
+    categories = categories_modele(modele)
+    axes = axes_grille(modele, points, ancres)
+    forme = tuple(len(axes[v]) for v in NUMERIQUES)
+    grille = np.meshgrid(*(axes[v] for v in NUMERIQUES), indexing="ij")
+    numeriques = {v: g.ravel() for v, g in zip(NUMERIQUES, grille)}
+
+    combinaisons = list(itertools.product(*(categories[c] for c in CATEGORIELLES)))
+    table = np.empty((len(combinaisons),) + forme, dtype=np.float16)
+    for k, combinaison in enumerate(combinaisons):
+        lot = pd.DataFrame({**dict(zip(CATEGORIELLES, combinaison)), **numeriques})
+        table[k] = modele.predict(lot[COLONNES]).reshape(forme)
+
+    meta = {
+        "categories": {c: categories[c] for c in CATEGORIELLES},
+        "bornes": {v: [axes[v][0], axes[v][-1]] for v in NUMERIQUES},
+        "points": list(points),
+        "ancres": list(ancres),
+        "axes": {v: axes[v].tolist() for v in NUMERIQUES}
+    }
+    return table, meta
+
+
+def ecrire_surface(chemin: str, table: np.ndarray, meta: Dict) -> None:
+    """Table .npy suivie de ses métadonnées JSON, écrite à côté puis substituée d'un seul os.replace"""
+    provisoire = chemin + ".tmp"
+    with open(provisoire, "wb") as f:
+        np.save(f, table)
+        f.write(json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+    os.replace(provisoire, chemin)
+
+
+def lire_surface(chemin: str) -> Tuple[np.ndarray, Dict]:
+    """Table projetée en mémoire et ses métadonnées, lues par le même descripteur : toujours de la même version"""
+    with open(chemin, "rb") as f:
+        version = np.lib.format.read_magic(f)
+        lire_entete = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        forme, fortran, dtype = lire_entete(f)
+        decalage = f.tell()
+        table = np.memmap(f, dtype=dtype, mode="r", shape=forme, offset=decalage, order="F" if fortran else "C")
+        f.seek(decalage + table.nbytes)
+        meta = f.read()
+    if not meta:
+        raise ValueError(f"{chemin} : métadonnées absentes, reconstruire la surface (python surface_reponse.py)")
+    return table, json.loads(meta.decode("utf-8"))
+
+
+class SurfaceReponse:
+    """Surface tabulée servie par interpolation trilinéaire, avec l'interface `predict` du pipeline"""
+
+    def __init__(self, chemin: str):
+        self.table, self.meta = lire_surface(chemin)
+        self.categories: Dict[str, List[str]] = self.meta["categories"]
+        self._codes = [pd.Index(self.categories[c]) for c in CATEGORIELLES]
+        self._dictionnaires = [{v: i for i, v in enumerate(self.categories[c])} for c in CATEGORIELLES]
+        self._tailles = [len(self.categories[c]) for c in CATEGORIELLES]
+        self._axes = [np.array(self.meta["axes"][v]) for v in NUMERIQUES]
+        self._points = np.array(self.table.shape[1:])
+        # Vue ndarray du fichier projeté : l'indexation évite le surcoût de np.memmap
+        self._plat = np.asarray(self.table).reshape(-1)
+        # Sommets de la maille : décalages à plat et côté (0 : gauche, 1 : droite) sur chaque axe
+        ns, npl, nt = self._points
+        self._cotes = np.array(list(itertools.product((0, 1), repeat=3)))
+        self._decalages = (self._cotes[:, 0] * npl + self._cotes[:, 1]) * nt + self._cotes[:, 2]
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        combinaison = np.zeros(len(X), dtype=np.int64)
+        for colonne, index, dictionnaire, taille in zip(CATEGORIELLES, self._codes, self._dictionnaires, self._tailles):
+            if len(X) <= PETIT_LOT:
+                codes = np.array([dictionnaire.get(str(v), -1) for v in X[colonne].tolist()], dtype=np.int64)
+            else:
+                codes = index.get_indexer(X[colonne].astype(str))
+            if (codes < 0).any():
+                inconnues = sorted(set(X[colonne][codes < 0].astype(str)))
+                raise ValueError(f"{colonne} : modalité absente de la surface de réponse ({', '.join(inconnues)})")
+            combinaison = combinaison * taille + codes
+
+        # Maille de chaque axe par dichotomie ; hors des bornes, le modèle est constant
+        gauche = np.empty((len(X), len(NUMERIQUES)), dtype=np.int64)
+        poids = np.empty((len(X), len(NUMERIQUES)))
+        for j, (variable, axe) in enumerate(zip(NUMERIQUES, self._axes)):
+            x = np.clip(X[variable].to_numpy(dtype=float), axe[0], axe[-1])
+            g = np.minimum(np.searchsorted(axe, x, side="right") - 1, len(axe) - 2)
+            gauche[:, j] = g
+            poids[:, j] = (x - axe[g]) / (axe[g + 1] - axe[g])
+
+        # Indice à plat du coin inférieur, puis les 8 sommets de la maille en une lecture
+        ns, npl, nt = self._points
+        base = ((combinaison * ns + gauche[:, 0]) * npl + gauche[:, 1]) * nt + gauche[:, 2]
+        sommets = self._plat[base[:, None] + self._decalages].astype(float)
+        ponderations = np.where(self._cotes, poids[:, None, :], 1 - poids[:, None, :]).prod(axis=2)
+        return (sommets * ponderations).sum(axis=1)
+
+
+def points_domaine(categories: Dict[str, List[str]], n: int, graine: int = 0) -> pd.DataFrame:
+    """n parcelles tirées uniformément dans tout le domaine des entrées"""
+    rng = np.random.default_rng(graine)
+    lot = pd.DataFrame({c: rng.choice(categories[c], n) for c in CATEGORIELLES})
+    for variable, (bas, haut) in BORNES_ENTREES.items():
+        lot[variable] = rng.uniform(bas, haut, n)
+    return lot[COLONNES]
+
+
+def mesurer_erreur(surface: SurfaceReponse, modele, X: pd.DataFrame) -> Dict[str, float]:
+    """Écart absolu au modèle (t/ha) : moyenne, P99 et maximum"""
+    ecart = np.abs(surface.predict(X) - modele.predict(X[COLONNES]))
+    return {"moyenne": float(ecart.mean()), "p99": float(np.quantile(ecart, 0.99)), "max": float(ecart.max())}
+
+
+def _ecrire_rapport(chemin: str, meta: Dict) -> None:
+    # Copie lisible des métadonnées ; le chargement lit celles du fichier .npy
+    provisoire = os.path.splitext(chemin)[0] + ".json.tmp"
+    with open(provisoire, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(provisoire, os.path.splitext(chemin)[0] + ".json")
+
+
+def enregistrer_surface(modele, chemin_modele: str = CHEMIN_MODELE, points: Sequence[int] = POINTS_GRILLE,
+                        donnees: Optional[pd.DataFrame] = None, erreur_max: float = ERREUR_MAX,
+                        ancres: Sequence[int] = SEUILS_ANCRES) -> Dict:
+    """Construit la surface du modèle, mesure son erreur et l'écrit à côté du pickle ; renvoie les métadonnées.
+
+    ValueError si l'écart maximal dépasse `erreur_max` : la surface déjà servie est alors conservée.
+    """
+    debut = time.perf_counter()
+    table, meta = construire_surface(modele, points, ancres)
+    chemin = chemin_moteur(chemin_modele, "surface")
+    provisoire = os.path.splitext(chemin)[0] + ".construction.npy"
+    meta.update({
+        "modele": empreinte_fichier(chemin_modele),
+        "construite": datetime.now().isoformat(timespec="seconds"),
+        "duree_construction_s": round(time.perf_counter() - debut, 1),
+        "erreur_max": erreur_max
+    })
+    ecrire_surface(provisoire, table, meta)
+
+    surface = SurfaceReponse(provisoire)
+    meta["erreur"] = {"domaine": mesurer_erreur(surface, modele, points_domaine(surface.categories, 100_000))}
+    if donnees is not None:
+        meta["erreur"]["entrainement"] = mesurer_erreur(surface, modele, donnees)
+    depassements = {nom: erreur["max"] for nom, erreur in meta["erreur"].items() if erreur["max"] > erreur_max}
+    if depassements:
+        os.remove(provisoire)
+        detail = ", ".join(f"{nom} {ecart:.3f}" for nom, ecart in depassements.items())
+        raise ValueError(f"Surface de réponse rejetée : écart max au modèle ({detail} t/ha) "
+                         f"supérieur à {erreur_max:g} t/ha ; affiner la grille (--points, --ancres)")
+
+    # Table et métadonnées (erreurs comprises) remplacées ensemble : un lecteur voit l'ancienne ou la nouvelle
+    ecrire_surface(chemin, table, meta)
+    os.remove(provisoire)
+    _ecrire_rapport(chemin, meta)
+    return meta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construit la surface de réponse tabulée du modèle")
+    parser.add_argument("--modele", default=CHEMIN_MODELE)
+    parser.add_argument("--donnees", default=CHEMIN_DONNEES, help="Parcelles de contrôle de l'erreur")
+    parser.add_argument("--points", type=int, nargs=3, default=POINTS_GRILLE, metavar=("SURFACE", "PLUIE", "TEMP"),
+                        help="Points réguliers par variable")
+    parser.add_argument("--ancres", type=int, nargs=3, default=SEUILS_ANCRES, metavar=("SURFACE", "PLUIE", "TEMP"),
+                        help="Seuils encadrés par variable (plus hautes marches de la forêt)")
+    parser.add_argument("--erreur-max", type=float, default=ERREUR_MAX,
+                        help="Écart absolu maximal admis au modèle (t/ha) ; au-delà, échec")
+    args = parser.parse_args()
+
+    import joblib
+
+    modele = joblib.load(args.modele)
+    donnees = pd.read_csv(args.donnees, usecols=COLONNES) if os.path.exists(args.donnees) else None
+    try:
+        meta = enregistrer_surface(modele, args.modele, args.points, donnees, args.erreur_max, args.ancres)
+    except ValueError as e:
+        print(f"ÉCHEC : {e}")
+        sys.exit(1)
+
+    chemin = chemin_moteur(args.modele, "surface")
+    print(f"Surface {tuple(len(axe) for axe in meta['axes'].values())} x {np.prod([len(v) for v in meta['categories'].values()])} "
+          f"combinaisons écrite dans {chemin} ({os.path.getsize(chemin) / 1e6:.1f} Mo) "
+          f"en {meta['duree_construction_s']:.0f} s")
+    for nom, erreur in meta["erreur"].items():
+        print(f"Écart au modèle ({nom}) : moyen {erreur['moyenne']:.4f}, P99 {erreur['p99']:.4f}, "
+              f"max {erreur['max']:.4f} t/ha")
+
+    surface = SurfaceReponse(chemin)
+    lot = points_domaine(surface.categories, 100_000, graine=1)
+    for nom, fonction in (("sklearn", modele.predict), ("surface", surface.predict)):
+        debut = time.perf_counter()
+        fonction(lot)
+        duree = time.perf_counter() - debut
+        print(f"Débit {nom} : {len(lot) / duree:,.0f} parcelles/s")
+
+
+if __name__ == "__main__":
+    main()
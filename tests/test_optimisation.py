@@ -0,0 +1,43 @@
+from datetime import date
+
+import pytest
+
+from climatologie import NORMALES_REGIONS
+from optimisation import PLUIE_ANNUELLE_RELATIVE, cycles_candidats, pluie_annuelle
+from phenologie import dates_recolte, part_pluie_cycle
+from predict import BORNES_ENTREES
+
+
+def parcelle(region, culture, date_semis, pluviometrie_mm=800.0, temperature=27.0):
+    return {"region": region, "culture": culture, "date_semis": date_semis, "type_sol": "Argileux",
+            "surface_ha": 2.0, "pluviometrie_mm": pluviometrie_mm, "temperature_moyenne_c": temperature}
+
+
+@pytest.mark.parametrize("region, date_semis", [
+    ("Savanes", date(2026, 12, 1)),
+    ("Savanes", date(2026, 11, 1)),
+    ("Maritime", date(2026, 12, 1)),
+])
+def test_semis_saison_seche_normale_regionale(region, date_semis):
+    # Cycle presque sans pluie : la pluie saisie ne permet pas d'estimer l'année
+    assert pluie_annuelle(parcelle(region, "Maïs", date_semis)) == NORMALES_REGIONS[region]["pluie"]
+
+
+def test_semis_saison_seche_candidats_non_plafonnes():
+    cycles = cycles_candidats(parcelle("Savanes", "Maïs", date(2026, 12, 1)), ["Maïs"], 2026)
+    assert cycles["pluviometrie_mm"].max() < BORNES_ENTREES["pluviometrie_mm"][1]
+
+
+def test_pluie_annuelle_bornee_autour_de_la_normale():
+    normale = NORMALES_REGIONS["Kara"]["pluie"]
+    bas, haut = PLUIE_ANNUELLE_RELATIVE
+    for pluviometrie in (10.0, 800.0, 3000.0):
+        assert bas * normale <= pluie_annuelle(parcelle("Kara", "Maïs", date(2026, 9, 1), pluviometrie)) <= haut * normale
+
+
+def test_annee_coherente_retrouvee():
+    # Pluie saisie = part du cycle d'une année à 1300 mm : l'année est retrouvée, quel que soit le semis
+    for date_semis in (date(2026, 4, 15), date(2026, 6, 1), date(2026, 8, 1)):
+        jours = dates_recolte([date_semis], ["Maïs"], [27.0])["jours"].to_numpy()
+        pluie = 1300.0 * part_pluie_cycle(["Kara"], [date_semis], jours)[0]
+        assert pluie_annuelle(parcelle("Kara", "Maïs", date_semis, pluie)) == pytest.approx(1300.0)
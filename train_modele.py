@@ -1,67 +1,163 @@
-import pandas as pd
-import joblib
-
-from sklearn.model_selection import train_test_split
-from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import OneHotEncoder
-from sklearn.pipeline import Pipeline
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-
-
-# 1. Chargement des données
-df = pd.read_csv("donnees_agricoles_togo.csv")
-
-X = df.drop("rendement_t_ha", axis=1)
-y = df["rendement_t_ha"]
-
-# 2. Colonnes
-categorical_features = ["region", "culture", "type_sol"]
-numerical_features = [
-    "surface_ha",
-    "pluviometrie_mm",
-    "temperature_moyenne_c"
-]
-
-# 3. Prétraitement
-preprocessor = ColumnTransformer(
-    transformers=[
-        ("cat", OneHotEncoder(handle_unknown="ignore"), categorical_features),
-        ("num", "passthrough", numerical_features)
-    ]
-)
-
-# 4. Modèle
-model = RandomForestRegressor(
-    n_estimators=300,
-    max_depth=12,
-    random_state=42
-)
-
-# 5. Pipeline complet
-pipeline = Pipeline(
-    steps=[
-        ("preprocessing", preprocessor),
-        ("model", model)
-    ]
-)
-
-# 6. Séparation train / test
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.3, random_state=42
-)
-
-# 7. Entraînement
-pipeline.fit(X_train, y_train)
-
-# 8. Évaluation
-y_pred = pipeline.predict(X_test)
-
-print("MAE :", mean_absolute_error(y_test, y_pred))
-print("RMSE :", mean_squared_error(y_test, y_pred, squared=False))
-print("R² :", r2_score(y_test, y_pred))
-
-# 9. Sauvegarde du modèle
-joblib.dump(pipeline, "modele_rendement_agricole.pkl")
-
-print("Modèle entraîné et sauvegardé avec succès.")
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+import joblib
+
+from sklearn.model_selection import train_test_split
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder
+from sklearn.pipeline import Pipeline
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from derive import construire_reference, enregistrer_reference
+
+
+parser = argparse.ArgumentParser(description="Entraînement du modèle de rendement agricole")
+parser.add_argument("--segments", action="store_true",
+                    help="Entraîne aussi des sous-modèles par région x culture / culture, servis par un routeur")
+parser.add_argument("--min-lignes", type=int, default=300,
+                    help="Taille minimale (lignes d'entraînement) d'un segment pour lui dédier un modèle")
+parser.add_argument("--onnx", action="store_true",
+                    help="Exporte aussi le pipeline au format ONNX (modele_rendement_agricole.onnx)")
+parser.add_argument("--surface", action="store_true",
+                    help="Tabule aussi le modèle en surface de réponse (modele_rendement_agricole.surface.npy)")
+parser.add_argument("--surface-points", type=int, nargs=3, metavar=("SURFACE", "PLUIE", "TEMP"),
+                    help="Points réguliers de la surface par variable (défaut : surface_reponse.POINTS_GRILLE)")
+parser.add_argument("--surface-ancres", type=int, nargs=3, metavar=("SURFACE", "PLUIE", "TEMP"),
+                    help="Seuils encadrés de la surface par variable (défaut : surface_reponse.SEUILS_ANCRES)")
+args = parser.parse_args()
+
+
+# 1. Chargement des données
+df = pd.read_csv("donnees_agricoles_togo.csv")
+
+X = df.drop("rendement_t_ha", axis=1)
+y = df["rendement_t_ha"]
+
+# 2. Colonnes
+categorical_features = ["region", "culture", "type_sol"]
+numerical_features = [
+    "surface_ha",
+    "pluviometrie_mm",
+    "temperature_moyenne_c"
+]
+
+
+# 3. Prétraitement et 4. Modèle
+def construire_pipeline(categorielles, n_estimators=300, max_depth=12):
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ("cat", OneHotEncoder(handle_unknown="ignore"), categorielles),
+            ("num", "passthrough", numerical_features)
+        ]
+    )
+
+    model = RandomForestRegressor(
+        n_estimators=n_estimators,
+        max_depth=max_depth,
+        random_state=42
+    )
+
+    # 5. Pipeline complet
+    return Pipeline(
+        steps=[
+            ("preprocessing", preprocessor),
+            ("model", model)
+        ]
+    )
+
+
+pipeline = construire_pipeline(categorical_features)
+
+# 6. Séparation train / test
+X_train, X_test, y_train, y_test = train_test_split(
+    X, y, test_size=0.3, random_state=42
+)
+
+# 7. Entraînement
+pipeline.fit(X_train, y_train)
+
+
+# 8. Évaluation
+def evaluer(nom, modele):
+    y_pred = modele.predict(X_test)
+    rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+    print(f"[{nom}] MAE :", mean_absolute_error(y_test, y_pred))
+    print(f"[{nom}] RMSE :", rmse)
+    print(f"[{nom}] R² :", r2_score(y_test, y_pred))
+    return rmse
+
+
+rmse_global = evaluer("global", pipeline)
+modele_final = pipeline
+
+# 8 bis. Sous-modèles par segment (région x culture, sinon culture), selon le volume de données
+if args.segments:
+    from segments import RouteurSegments
+
+    # Modèle global de repli, allégé comme les sous-modèles
+    repli = construire_pipeline(categorical_features, n_estimators=100, max_depth=10)
+    repli.fit(X_train, y_train)
+    modeles = {(): {(): repli}}
+    for niveau in [("region", "culture"), ("culture",)]:
+        # Le segment fixe ces variables : le sous-modèle n'utilise que les autres
+        categorielles = [c for c in categorical_features if c not in niveau]
+        modeles[niveau] = {}
+        for cle, groupe in X_train.groupby(list(niveau)):
+            cle = cle if isinstance(cle, tuple) else (cle,)
+            # Niveau culture : seulement si un segment région x culture manque pour cette culture
+            if niveau == ("culture",) and all(
+                (region, cle[0]) in modeles[("region", "culture")] for region in X_train["region"].unique()
+            ):
+                continue
+            if len(groupe) < args.min_lignes:
+                continue
+            sous_modele = construire_pipeline(categorielles, n_estimators=100, max_depth=10)
+            sous_modele.fit(groupe, y_train.loc[groupe.index])
+            modeles[niveau][cle] = sous_modele
+
+    routeur = RouteurSegments(modeles, {c: sorted(X_train[c].astype(str).unique()) for c in categorical_features})
+    print("Sous-modèles :", routeur.resume())
+    rmse_segments = evaluer("segments", routeur)
+
+    # Le routeur n'est retenu que s'il est au moins aussi précis (tolérance de 2 %)
+    if rmse_segments <= rmse_global * 1.02:
+        modele_final = routeur
+    else:
+        print("Routeur moins précis que le modèle global : modèle global conservé "
+              "(augmenter --min-lignes ou les données).")
+
+# 9. Sauvegarde du modèle et des résumés d'entraînement (référence du moniteur de dérive)
+joblib.dump(modele_final, "modele_rendement_agricole.pkl")
+enregistrer_reference(construire_reference(X_train), "modele_rendement_agricole.pkl")
+
+print("Modèle entraîné et sauvegardé avec succès.")
+
+# 10. Export ONNX (moteur onnxruntime : MOTEUR_PREDICTION=onnx)
+if args.onnx:
+    if isinstance(modele_final, Pipeline):
+        from onnx_modele import exporter_onnx
+
+        exporter_onnx(modele_final, "modele_rendement_agricole.onnx")
+        print("Export ONNX : modele_rendement_agricole.onnx")
+    else:
+        print("Export ONNX non disponible pour le routeur de sous-modèles.")
+
+# 11. Surface de réponse tabulée (moteur sans scikit-learn : MOTEUR_PREDICTION=surface)
+if args.surface:
+    from surface_reponse import POINTS_GRILLE, SEUILS_ANCRES, enregistrer_surface
+
+    try:
+        meta = enregistrer_surface(modele_final, "modele_rendement_agricole.pkl",
+                                   args.surface_points or POINTS_GRILLE, donnees=X_test,
+                                   ancres=args.surface_ancres or SEUILS_ANCRES)
+    except ValueError as e:
+        print(f"ÉCHEC : {e}")
+        sys.exit(1)
+    erreur, domaine = meta["erreur"]["entrainement"], meta["erreur"]["domaine"]
+    print(f"Surface de réponse : modele_rendement_agricole.surface.npy ({meta['duree_construction_s']:.0f} s), "
+          f"écart au modèle sur le jeu de test : moyen {erreur['moyenne']:.4f}, max {erreur['max']:.4f} t/ha ; "
+          f"sur le domaine : max {domaine['max']:.4f} t/ha")
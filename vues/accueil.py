@@ -0,0 +1,53 @@
+import streamlit as st
+
+
+def afficher():
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        st.markdown("## Bienvenue sur le système de prévision agricole")
+        st.write("""
+        Ce système utilise l'**intelligence artificielle** pour vous aider à prendre de meilleures 
+        décisions agricoles concernant vos cultures de maïs et céréales locales.
+        """)
+        
+        st.markdown("### Que pouvez-vous faire ?")
+        
+        col_a, col_b, col_c = st.columns(3)
+        with col_a:
+            st.markdown("""
+            **Prévisions de rendement**
+            - Estimation de la production (t/ha)
+            - Basée sur vos données réelles
+            
+            **Analyse climatique**
+            - Évaluation des risques
+            - Recommandations adaptées
+            """)
+        
+        with col_b:
+            st.markdown("""
+            **Calendrier optimal**
+            - Meilleure période de récolte
+            - Adaptation aux conditions locales
+            
+            **historique**
+            - Conservation des prévisions
+            - Exportation des données
+            """)
+        with col_c:
+            st.markdown("""
+            **Generer des rapportd'activité**
+            - Rapport des prévisions du mois 
+            - Controler l'evolution des récoltes
+                        """)
+        
+            
+    with col2:
+        st.markdown("### Régions couvertes")
+        regions = ["Maritime", "Plateaux", "Centrale", "Kara", "Savanes"]
+        for region in regions:
+            st.success(f"✓ {region}")
+        
+        st.markdown("### Besoin d'aide ?")
+        st.info("Consultez la section **À propos** pour plus d'informations.")
@@ -0,0 +1,79 @@
+from datetime import datetime
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from donnees import empreinte_dataframe
+from graphiques import figure_historique
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def figure_historique_cache(empreinte: str, _df_historique: pd.DataFrame) -> go.Figure:
+    """Graphique d'évolution de l'historique (clé : empreinte du contenu)"""
+    return figure_historique(_df_historique)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def csv_historique(empreinte: str, _df_historique: pd.DataFrame) -> bytes:
+    """Export CSV de l'historique (clé : empreinte du contenu)"""
+    return _df_historique.to_csv(index=False).encode('utf-8')
+
+
+@st.fragment
+def _historique():
+    """Tableau, statistiques et graphique ; téléchargement et effacement ne relancent que ce bloc"""
+    if len(st.session_state.historique) == 0:
+        st.info("Aucune prévision enregistrée pour le moment. Commencez par créer une nouvelle prévision !")
+    else:
+        st.success(f"{len(st.session_state.historique)} prévision(s) enregistrée(s)")
+        
+        # Affichage sous forme de tableau
+        df_historique = pd.DataFrame(st.session_state.historique)
+        empreinte = empreinte_dataframe(df_historique)
+        st.dataframe(df_historique, use_container_width=True, hide_index=True)
+        
+        # Statistiques
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric("Rendement Moyen", f"{df_historique['rendement'].mean():.2f} t/ha")
+        
+        with col2:
+            st.metric("Production Totale", f"{df_historique['production'].sum():.2f} t")
+        
+        with col3:
+            culture_freq = df_historique['culture'].mode()[0] if not df_historique.empty else "N/A"
+            st.metric("Culture Principale", culture_freq)
+        
+        # Graphique d'évolution
+        if len(st.session_state.historique) > 1:
+            st.markdown("### Évolution des Rendements")
+            
+            # Figure mise en cache sur l'empreinte de l'historique (WebGL + LTTB si volumineux)
+            fig = figure_historique_cache(empreinte, df_historique)
+            st.plotly_chart(fig, use_container_width=True)
+        
+        # Actions
+        col_a1, col_a2 = st.columns(2)
+        
+        with col_a1:
+            csv_all = csv_historique(empreinte, df_historique)
+            st.download_button(
+                label="Telecharger l'Historique Complet (CSV)",
+                data=csv_all,
+                file_name=f"historique_complet_{datetime.now().strftime('%Y%m%d')}.csv",
+                mime="text/csv",
+                on_click="ignore",
+                use_container_width=True
+            )
+        
+        with col_a2:
+            if st.button("Effacer l'Historique", use_container_width=True):
+                st.session_state.historique = []
+                st.rerun()
+
+
+def afficher():
+    st.markdown("## Historique des Prévisions")
+    _historique()
@@ -0,0 +1,107 @@
+import io
+import os
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from file_travaux import (DOSSIER_TRAVAUX, ECHEC, EN_ATTENTE, EN_COURS, TERMINE, chemin_resultats,
+                          demarrer_workers, etat_travaux, purger, soumettre, valider_tableau)
+from predict import COLONNES, ErreurValidation, categories_modele, charger_modele, version_modele
+
+# Workers lancés par l'interface (0 : workers autonomes, python file_travaux.py)
+N_WORKERS = int(os.environ.get("TRAVAUX_WORKERS", "1"))
+
+
+@st.cache_resource
+def _workers():
+    """Une seule fois par processus Streamlit : travaux anciens purgés, workers lancés"""
+    purger()
+    return demarrer_workers(N_WORKERS) if N_WORKERS > 0 else []
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def lire_et_valider(contenu: bytes, nom: str, version: str):
+    """Lecture et validation vectorisée d'un fichier déposé (clé : contenu et version du modèle)"""
+    if nom.lower().endswith(".xlsx"):
+        df = pd.read_excel(io.BytesIO(contenu))
+    else:
+        # Séparateur « ; » des exports de tableurs en français, sinon « , »
+        entete = contenu.split(b"\n", 1)[0]
+        df = pd.read_csv(io.BytesIO(contenu), sep=";" if entete.count(b";") > entete.count(b",") else ",")
+    return valider_tableau(df, categories_modele(charger_modele()))
+
+
+def _panneau_travaux(actifs: bool):
+    """État des travaux de la session, rafraîchi seul (fragment) tant qu'un travail est actif"""
+    travaux = etat_travaux(st.session_state.travaux)
+    for travail in travaux.itertuples():
+        col1, col2 = st.columns([3, 1])
+        soumis = datetime.fromtimestamp(travail.soumis).strftime("%d/%m %H:%M")
+        with col1:
+            st.markdown(f"**{travail.nom}** - {travail.lignes} parcelles - soumis à {soumis}")
+            if travail.statut in (EN_ATTENTE, EN_COURS):
+                st.progress(travail.traitees / max(travail.lignes, 1),
+                            text=f"{travail.statut} : {travail.traitees} / {travail.lignes}")
+            elif travail.statut == ECHEC:
+                st.error(f"Échec : {travail.erreur}")
+            else:
+                st.caption(f"Terminé en {travail.fin - travail.debut:.1f} s")
+        with col2:
+            if travail.statut == TERMINE:
+                with open(chemin_resultats(DOSSIER_TRAVAUX, travail.id), "rb") as f:
+                    st.download_button("Télécharger (CSV)", f.read(), key=f"resultats_{travail.id}",
+                                       file_name=f"previsions_{os.path.splitext(travail.nom)[0]}.csv",
+                                       mime="text/csv", use_container_width=True)
+    if actifs and not travaux["statut"].isin([EN_ATTENTE, EN_COURS]).any():
+        # Plus rien en cours : un rerun complet arrête le rafraîchissement périodique
+        st.rerun()
+
+
+def afficher():
+    st.markdown("## Prévision d'un Fichier de Parcelles")
+    version = version_modele()
+    if version is None:
+        st.warning("Modèle introuvable : lancez d'abord `python train_modele.py`.")
+        return
+    _workers()
+    if 'travaux' not in st.session_state:
+        st.session_state.travaux = []
+
+    st.markdown(f"Colonnes attendues : `{'`, `'.join(COLONNES)}` ; les autres colonnes sont conservées.")
+    fichier = st.file_uploader("Fichier de parcelles (CSV ou XLSX)", type=["csv", "xlsx"])
+
+    if fichier is not None:
+        try:
+            valides, erreurs = lire_et_valider(fichier.getvalue(), fichier.name, version)
+        except ErreurValidation as e:
+            st.error("Fichier refusé : " + " ; ".join(e.erreurs))
+            valides = None
+        except ImportError:
+            st.error("La lecture des fichiers XLSX nécessite le paquet openpyxl : déposez un CSV.")
+            valides = None
+        except (ValueError, UnicodeDecodeError) as e:
+            st.error(f"Fichier illisible : {e}")
+            valides = None
+
+        if valides is not None:
+            col1, col2 = st.columns(2)
+            col1.metric("Parcelles valides", len(valides))
+            col2.metric("Lignes rejetées", len(erreurs))
+            if len(erreurs):
+                with st.expander("Lignes rejetées"):
+                    st.dataframe(erreurs.head(1000), use_container_width=True, hide_index=True)
+                    st.download_button("Télécharger les erreurs (CSV)", erreurs.to_csv(index=False).encode("utf-8"),
+                                       file_name="erreurs.csv", mime="text/csv")
+
+            if len(valides) and st.button("Lancer la prévision", type="primary"):
+                # La prédiction se fait dans les workers : le script rend la main immédiatement
+                st.session_state.travaux.append(soumettre(valides, fichier.name))
+                st.success("Fichier placé dans la file de traitement.")
+
+    if st.session_state.travaux:
+        st.markdown("### Mes Traitements")
+        actifs = etat_travaux(st.session_state.travaux)["statut"].isin([EN_ATTENTE, EN_COURS]).any()
+        st.fragment(_panneau_travaux, run_every=2 if actifs else None)(actifs)
+        if N_WORKERS == 0:
+            st.caption("Traitements exécutés par les workers autonomes (python file_travaux.py).")
@@ -0,0 +1,609 @@
+import time
+from datetime import datetime, date
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from analyse_modele import grille_sensibilite
+from climatologie import normales_cycle
+from derive import observer_lignes
+from explications import expliquer_lot
+from optimisation import optimiser
+from graphiques import figure_comparaison, figure_jauge
+from meteo import meteo_region
+from phenologie import dates_recolte
+from metriques import DUREE_PREDICTION, PARCELLES_PREDITES, appel_cache, marquer_calcul
+from profilage import etape
+from predict import (FACTEUR_IRRIGATION, FACTEUR_FERTI, ajuster_rendement, charger_modele,
+                     predict_quantiles, predict_rendement, version_modele)
+
+LIBELLES_VARIABLES = {
+    "region": "Région",
+    "culture": "Culture",
+    "type_sol": "Sol",
+    "surface_ha": "Superficie (ha)",
+    "pluviometrie_mm": "Pluviométrie (mm)",
+    "temperature_moyenne_c": "Température (°C)"
+}
+
+
+# Fonction pour récupérer la météo en temps réel
+@st.cache_data(ttl=600)  # Cache de 10 minutes
+def get_real_time_weather(region: str) -> Dict:
+    """Récupère les données météo en temps réel via Open-Meteo (GRATUIT)"""
+    marquer_calcul()
+    return meteo_region(region)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def sensibilite_parcelle(version: str, parcelle: tuple, axe_x: str, valeurs_x: tuple,
+                         axe_y: str, valeurs_y: tuple) -> pd.DataFrame:
+    """Grille de scénarios pour une parcelle (clé : version du modèle, parcelle et axes)"""
+    marquer_calcul()
+    return grille_sensibilite(charger_modele(), dict(parcelle), axe_x, valeurs_x, axe_y, valeurs_y)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def explications_parcelle(version: str, parcelle: tuple) -> pd.Series:
+    """Contributions de chaque variable et valeur de base (t/ha) pour une parcelle"""
+    marquer_calcul()
+    return expliquer_lot(pd.DataFrame([dict(parcelle)])).iloc[0]
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def planification_parcelle(version: str, parcelle: tuple, objectif: str, annee: int) -> Dict:
+    """Décisions classées pour une parcelle (clé : version du modèle, parcelle, objectif et année)"""
+    marquer_calcul()
+    return optimiser(dict(parcelle), objectif, annee)
+
+
+# Figures mises en cache sur leurs données d'entrée
+@st.cache_data(show_spinner=False, max_entries=32)
+def figure_comparaison_cache(rendement_prevu: float, rendement_moyen: float,
+                             p10: Optional[float], p90: Optional[float]) -> go.Figure:
+    return figure_comparaison(rendement_prevu, rendement_moyen, p10, p90)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def figure_jauge_cache(niveau_risque: int, titre: str) -> go.Figure:
+    return figure_jauge(niveau_risque, titre)
+
+
+@st.fragment
+def _resultats(resultat: Dict):
+    """Résultats de la dernière soumission ; ses boutons ne relancent que ce bloc"""
+    culture = resultat["culture"]
+    superficie = resultat["superficie"]
+    rendement_prevu = resultat["rendement_prevu"]
+    rendement_base = resultat["rendement_base"]
+    risque, niveau_risque = resultat["risque"], resultat["niveau_risque"]
+    intervalle = resultat["intervalle"]
+    recolte = resultat["recolte"]
+    
+    # Affichage des résultats
+    st.success("Prévision générée avec succès !")
+    
+    st.markdown("### Résultats de la Prévision")
+    
+    # Métriques principales
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric(
+            label="Rendement Estimé",
+            value=f"{rendement_prevu:.2f} t/ha",
+            delta=f"+{(rendement_prevu/rendement_base-1)*100:.1f}% vs base"
+        )
+    
+    with col2:
+        st.metric(
+            label="Production Totale",
+            value=f"{resultat['production_totale']:.2f} t",
+            delta=f"{superficie} ha"
+        )
+    
+    with col3:
+        st.metric(
+            label="Niveau de Risque",
+            value=f"{risque} ({niveau_risque}%)",
+            delta=resultat["couleur_risque"],
+            delta_color="inverse"
+        )
+    
+    if intervalle is not None:
+        p10, p50, p90 = intervalle
+        st.caption(f"Intervalle de prévision P10-P90 : {p10:.2f} - {p90:.2f} t/ha (médiane {p50:.2f} t/ha)")
+    
+    with col4:
+        # Maturité par cumul des degrés-jours de croissance depuis le semis
+        if pd.notna(recolte["jours"]):
+            st.metric(
+                label="Récolte Optimale",
+                value=recolte["date_recolte"].strftime("%d/%m/%Y"),
+                delta=f"Dans {int(recolte['jours'])} jours"
+            )
+        else:
+            st.metric(label="Récolte Optimale", value="Non atteinte",
+                      delta="Température trop basse", delta_color="off")
+    
+    # Graphique de rendement
+    st.markdown("### Analyse Détaillée")
+    
+    col_g1, col_g2 = st.columns(2)
+    
+    with col_g1:
+        # Graphique comparatif (mis en cache sur ses entrées)
+        with etape("figure comparaison"):
+            fig1 = figure_comparaison_cache(
+                float(rendement_prevu), float(rendement_base),
+                float(intervalle[0]) if intervalle is not None else None,
+                float(intervalle[2]) if intervalle is not None else None
+            )
+            st.plotly_chart(fig1, use_container_width=True)
+    
+    with col_g2:
+        # Jauge de risque
+        with etape("figure jauge"):
+            fig2 = figure_jauge_cache(
+                niveau_risque,
+                "Indice de Risque (%)" + (" - incertitude incluse" if intervalle is not None else "")
+            )
+            st.plotly_chart(fig2, use_container_width=True)
+    
+    # Recommandations
+    st.markdown("### Recommandations")
+    
+    if niveau_risque > 60:
+        st.markdown('<div class="warning-box">', unsafe_allow_html=True)
+        st.warning(f"""
+        **⚠️ Attention - Risque {risque}**
+        
+        - Surveillez étroitement l'évolution climatique
+        - Envisagez un système d'irrigation complémentaire
+        - Planifiez des mesures préventives
+        - Consultez un agronome si possible
+        """)
+        st.markdown('</div>', unsafe_allow_html=True)
+    else:
+        st.markdown('<div class="success-box">', unsafe_allow_html=True)
+        st.success(f"""
+        **Conditions Favorables - Risque {risque}**
+        
+        - Les conditions sont bonnes pour votre culture
+        - Maintenez vos pratiques actuelles
+        - Suivez le calendrier de récolte recommandé
+        - Préparez le stockage pour la récolte
+        """)
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    # Boutons d'action
+    col_b1, col_b2, col_b3 = st.columns(3)
+    
+    with col_b1:
+        if st.button("Télécharger le Rapport (PDF)", use_container_width=True):
+            st.info("Fonctionnalité d'export PDF à venir")
+    
+    with col_b2:
+        # Export CSV
+        df_export = pd.DataFrame([resultat["prevision"]])
+        csv = df_export.to_csv(index=False).encode('utf-8')
+        st.download_button(
+            label="Exporter en CSV",
+            data=csv,
+            file_name=f"prevision_{culture}_{datetime.now().strftime('%Y%m%d')}.csv",
+            mime="text/csv",
+            on_click="ignore",
+            use_container_width=True
+        )
+    
+    with col_b3:
+        # Rerun complet : formulaire vierge, résultats effacés
+        if st.button("Nouvelle Prévision", use_container_width=True):
+            st.rerun()
+
+
+@st.fragment
+def _sensibilite(parcelle: Dict):
+    """Analyse de sensibilité : tous les scénarios "et si ?" en un seul appel au modèle"""
+    if not st.toggle("Explorer les scénarios (et si ?)", help="Évalue une grille de scénarios pour la dernière parcelle"):
+        return
+    type_grille = st.radio(
+        "Scénarios",
+        ["Pluviométrie × Température", "Irrigation × Fertilisation"],
+        horizontal=True
+    )
+    
+    if type_grille == "Pluviométrie × Température":
+        valeurs_pluie = np.linspace(
+            max(0.0, parcelle["pluviometrie_mm"] * 0.5),
+            min(3000.0, max(parcelle["pluviometrie_mm"] * 1.5, 100.0)),
+            25
+        ).round(0)
+        valeurs_temp = np.linspace(
+            max(15.0, parcelle["temperature_moyenne_c"] - 5),
+            min(45.0, parcelle["temperature_moyenne_c"] + 5),
+            21
+        ).round(1)
+        axes = ("pluviometrie_mm", tuple(valeurs_pluie), "temperature_moyenne_c", tuple(valeurs_temp))
+        titres = ("Pluviométrie (mm)", "Température moyenne (°C)")
+    else:
+        axes = ("irrigation", tuple(FACTEUR_IRRIGATION), "fertilisation", tuple(FACTEUR_FERTI))
+        titres = ("Système d'irrigation", "Type de fertilisation")
+    
+    with etape("grille de sensibilité"):
+        grille = appel_cache("sensibilite", sensibilite_parcelle,
+                             version_modele(), tuple(parcelle.items()), *axes)
+    
+    fig_sens = go.Figure(go.Heatmap(
+        z=grille.values,
+        x=[str(v) for v in grille.columns],
+        y=[str(v) for v in grille.index],
+        colorscale="YlGn",
+        colorbar={'title': "t/ha"},
+        hovertemplate="%{x} / %{y}<br>Rendement: %{z:.2f} t/ha<extra></extra>"
+    ))
+    fig_sens.update_layout(
+        title=f"Rendement estimé - {parcelle['culture']} ({parcelle['region']}) - {grille.size} scénarios",
+        xaxis_title=titres[0],
+        yaxis_title=titres[1],
+        height=500
+    )
+    st.plotly_chart(fig_sens, use_container_width=True)
+
+
+@st.fragment
+def _explication(parcelle: Dict):
+    """Explication : part de chaque variable dans la prévision (valeurs de Shapley)"""
+    if not st.toggle("Expliquer la prévision", help="Contribution de chaque variable au rendement prédit par le modèle"):
+        return
+    with etape("explication"):
+        contributions = appel_cache("explications", explications_parcelle,
+                                    version_modele(), tuple(parcelle.items()))
+    base = contributions.pop("base")
+    contributions = contributions.sort_values(key=np.abs)
+    
+    fig_expl = go.Figure(go.Bar(
+        x=contributions.values,
+        y=[f"{LIBELLES_VARIABLES[colonne]} : {parcelle[colonne]}" for colonne in contributions.index],
+        orientation="h",
+        marker_color=["#2E7D32" if v >= 0 else "#C62828" for v in contributions.values],
+        hovertemplate="%{y}<br>%{x:+.3f} t/ha<extra></extra>"
+    ))
+    fig_expl.update_layout(
+        title=f"Facteurs de la prévision - base {base:.2f} t/ha → {base + contributions.sum():.2f} t/ha",
+        xaxis_title="Contribution (t/ha)",
+        height=350
+    )
+    st.plotly_chart(fig_expl, use_container_width=True)
+    st.caption("Écart au rendement moyen du modèle dû à chaque variable (avant irrigation et fertilisation).")
+
+
+@st.fragment
+def _planification(parcelle: Dict):
+    """Planification : recherche de la meilleure culture, date de semis et conduite"""
+    if not st.toggle("Planifier la campagne", help="Compare toutes les cultures, dates de semis, irrigations et fertilisations"):
+        return
+    col_p1, col_p2 = st.columns(2)
+    with col_p1:
+        objectif = st.radio("Objectif", ["marge", "production"], horizontal=True,
+                            format_func={"marge": "Marge (FCFA)", "production": "Production (t)"}.get)
+    with col_p2:
+        annee = st.number_input("Campagne", min_value=2020, max_value=2100, value=date.today().year)
+    
+    parcelle_plan = {k: parcelle[k] for k in ("region", "culture", "date_semis", "type_sol", "surface_ha",
+                                              "pluviometrie_mm", "temperature_moyenne_c")}
+    with etape("planification"):
+        plan = appel_cache("planification", planification_parcelle,
+                           version_modele(), tuple(parcelle_plan.items()), objectif, int(annee))
+    stats = plan["stats"]
+    st.caption(f"{stats['candidats']} combinaisons : {stats['evalues']} évaluées après élagage des semis "
+               f"sans maturité et des conduites dominées, {stats['inferences']} passages dans le modèle, "
+               f"{stats['duree_s'] * 1000:.0f} ms.")
+    
+    classement = plan["classement"].assign(
+        semis=lambda d: pd.to_datetime(d["semis"]).dt.strftime("%d/%m"),
+        recolte=lambda d: pd.to_datetime(d["recolte"]).dt.strftime("%d/%m")
+    ).rename(columns={
+        "culture": "Culture", "semis": "Semis", "recolte": "Récolte", "irrigation": "Irrigation",
+        "fertilisation": "Fertilisation", "rendement_t_ha": "Rendement (t/ha)",
+        "production_t": "Production (t)", "cout_fcfa": "Coût intrants (FCFA)", "marge_fcfa": "Marge (FCFA)"
+    })
+    st.dataframe(classement.round(2), use_container_width=True, hide_index=True)
+    
+    if objectif == "marge":
+        candidats = plan["candidats"]
+        front = candidats[plan["front"]].sort_values("cout_fcfa")
+        fig_plan = go.Figure()
+        fig_plan.add_trace(go.Scattergl(
+            x=candidats["cout_fcfa"], y=candidats["production_t"], mode="markers",
+            marker={'size': 5, 'color': "#A5D6A7"}, name="Candidats",
+            text=candidats["culture"] + " - " + candidats["irrigation"] + " / " + candidats["fertilisation"],
+            hovertemplate="%{text}<br>%{y:.1f} t pour %{x:,.0f} FCFA<extra></extra>"
+        ))
+        fig_plan.add_trace(go.Scatter(
+            x=front["cout_fcfa"], y=front["production_t"], mode="lines+markers",
+            line={'color': "#2E7D32"}, name="Front de Pareto"
+        ))
+        fig_plan.update_layout(title="Production et coût des intrants", xaxis_title="Coût des intrants (FCFA)",
+                               yaxis_title="Production (t)", height=400)
+        st.plotly_chart(fig_plan, use_container_width=True)
+
+
+def _preremplir_normales(normales: Dict, contexte: tuple) -> None:
+    """Normales du cycle dans les champs température et pluie, quand région, culture ou semis changent.
+
+    Une valeur modifiée par l'utilisateur n'est pas écrasée, même soumise avec un nouveau contexte.
+    """
+    defauts = {"temperature_saisie": float(normales["temperature_moyenne"]),
+               "pluviometrie_saisie": int(normales["pluviometrie"])}
+    precedent = st.session_state.get("normales_formulaire")
+    if precedent is not None and precedent[0] == contexte:
+        for cle, valeur in defauts.items():
+            st.session_state.setdefault(cle, valeur)
+        return
+    for cle, valeur in defauts.items():
+        if precedent is None or st.session_state.get(cle, precedent[1][cle]) == precedent[1][cle]:
+            st.session_state[cle] = valeur
+    st.session_state.normales_formulaire = (contexte, defauts)
+
+
+def afficher():
+    st.markdown("## Nouvelle Prévision Agricole")
+    
+    # Formulaire de saisie
+    with st.form("formulaire_prevision"):
+        st.markdown("### Informations sur votre exploitation")
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            region = st.selectbox(
+                "Région agricole",
+                ["Maritime", "Plateaux", "Centrale", "Kara", "Savanes"],
+                help="Sélectionnez votre région"
+            )
+            
+            culture = st.selectbox(
+                "Type de culture",
+                ["Maïs", "Sorgho", "Mil"],
+                help="Culture à analyser"
+            )
+            
+            superficie = st.number_input(
+                "Superficie cultivée (ha)",
+                min_value=0.1,
+                max_value=1000.0,
+                value=5.0,
+                step=0.5,
+                help="Surface de votre exploitation"
+            )
+        
+        with col2:
+            date_semis = st.date_input(
+                "Date de semis",
+                value=date.today(),
+                help="Date de plantation"
+            )
+            
+            type_sol = st.selectbox(
+                "Type de sol",
+                ["Argileux", "Sableux", "Limoneux", "Argilo-sableux", "Argilo-limoneux"],
+                help="Nature du sol de votre parcelle"
+            )
+            
+            # Bouton pour charger les données météo réelles
+            use_real_weather = st.checkbox(
+                "Utiliser les données météo en temps réel",
+                value=True,
+                help="Récupère automatiquement la météo actuelle de votre région"
+            )
+            
+            mode_incertitude = st.checkbox(
+                "Afficher l'intervalle de prévision (P10-P90)",
+                value=True,
+                help="Dispersion des prédictions des arbres de la forêt aléatoire"
+            )
+        
+        with col3:
+            # Normales de la région du semis à la maturité : valeurs par défaut sans attendre le réseau
+            _preremplir_normales(normales_cycle(region, culture, date_semis), (region, culture, date_semis))
+            if use_real_weather:
+                # Afficher un message de chargement
+                with st.spinner(f"...Récupération météo pour {region}..."), etape("météo"):
+                    weather_data = appel_cache("meteo", get_real_time_weather, region)
+                
+                if weather_data["success"]:
+                    st.success("Données météo récupérées")
+                    temperature_moy = st.number_input(
+                        "Température moyenne (°C) - Temps réel",
+                        min_value=15.0,
+                        max_value=45.0,
+                        value=float(weather_data["temperature_moyenne"]),
+                        step=0.5,
+                        help=f"Température actuelle: {weather_data['temperature_actuelle']}°C"
+                    )
+                    pluviometrie = st.number_input(
+                        "Pluviométrie cumulée (mm) - Temps réel",
+                        min_value=0,
+                        max_value=3000,
+                        value=int(weather_data["precipitation_cumul"]),
+                        step=50,
+                        help=f"Cumul sur 7 jours depuis l'API"
+                    )
+                    
+                    # Afficher infos supplémentaires
+                    st.info(f"Humidité: {weather_data['humidite']}% | Vent: {weather_data['vitesse_vent']} km/h")
+                else:
+                    st.warning("⚠️ Erreur de connexion, normales climatologiques de la région")
+                    temperature_moy = st.number_input(
+                        "Température moyenne (°C)",
+                        min_value=15.0,
+                        max_value=45.0,
+                        step=0.5,
+                        key="temperature_saisie",
+                        help="Normale du cycle par défaut"
+                    )
+                    pluviometrie = st.number_input(
+                        "Pluviométrie cumulée (mm)",
+                        min_value=0,
+                        max_value=3000,
+                        step=50,
+                        key="pluviometrie_saisie",
+                        help="Normale du cycle par défaut"
+                    )
+            else:
+                temperature_moy = st.number_input(
+                    "Température moyenne (°C)",
+                    min_value=15.0,
+                    max_value=45.0,
+                    step=0.5,
+                    key="temperature_saisie",
+                    help="Température moyenne de la saison (normale du cycle par défaut)"
+                )
+                pluviometrie = st.number_input(
+                    "Pluviométrie cumulée (mm)",
+                    min_value=0,
+                    max_value=3000,
+                    step=50,
+                    key="pluviometrie_saisie",
+                    help="Précipitations totales depuis le semis (normale du cycle par défaut)"
+                )
+            
+            irrigation = st.selectbox(
+                "Système d'irrigation",
+                ["Aucun", "Traditionnel", "Goutte à goutte", "Aspersion"],
+                help="Type d'irrigation utilisé"
+            )
+            
+            fertilisation = st.selectbox(
+                "Type de fertilisation",
+                ["Aucune", "Organique", "Chimique", "Mixte"],
+                help="Mode de fertilisation"
+            )
+        
+        submitted = st.form_submit_button("Générer la Prévision", use_container_width=True)
+    
+    # Génération de la prévision
+    if submitted:
+        with st.spinner("...Analyse en cours..."):
+            # Modele de Random Forrest
+            with etape("pause (sleep)"):
+                time.sleep(1.5)
+            
+            # Modèle chargé une seule fois par version (cache du module predict)
+            with etape("chargement du modèle"):
+                charger_modele()
+            with etape("prédiction"), DUREE_PREDICTION.chronometrer(chemin="interface"):
+                base_rendement = {culture: predict_rendement(region, culture, type_sol,
+                                                  superficie, pluviometrie, temperature_moy)}
+            PARCELLES_PREDITES.inc(chemin="interface")
+            observer_lignes([{
+                "region": region,
+                "culture": culture,
+                "date_semis": date_semis,
+                "type_sol": type_sol,
+                "surface_ha": superficie,
+                "pluviometrie_mm": pluviometrie,
+                "temperature_moyenne_c": temperature_moy
+            }])
+
+            
+            # Facteurs d'ajustement (multiplicatifs, appliqués aussi aux quantiles)
+            facteur_ajustement = float(ajuster_rendement(1.0, pluviometrie, temperature_moy,
+                                                         irrigation, fertilisation))
+            rendement_prevu = base_rendement[culture] * facteur_ajustement
+            
+            # Intervalle de prévision : quantiles des prédictions individuelles des arbres
+            if mode_incertitude:
+                parcelle_df = pd.DataFrame([{
+                    "region": region,
+                    "culture": culture,
+                    "type_sol": type_sol,
+                    "surface_ha": superficie,
+                    "pluviometrie_mm": pluviometrie,
+                    "temperature_moyenne_c": temperature_moy
+                }])
+                with etape("quantiles"):
+                    p10, p50, p90 = predict_quantiles(parcelle_df)[0] * facteur_ajustement
+            
+            production_totale = rendement_prevu * superficie
+            
+            # Calcul du risque
+            if pluviometrie < 500:
+                risque = "Élevé"
+                niveau_risque = 75
+                couleur_risque = "🔴"
+            elif pluviometrie < 800:
+                risque = "Moyen"
+                niveau_risque = 45
+                couleur_risque = "🟡"
+            else:
+                risque = "Faible"
+                niveau_risque = 20
+                couleur_risque = "🟢"
+            
+            # Une prévision dispersée augmente le risque : on ajoute la demi-largeur relative de l'intervalle
+            if mode_incertitude and p50 > 0:
+                niveau_risque = int(min(100, niveau_risque + round(100 * (p90 - p10) / (2 * p50))))
+                if niveau_risque > 60:
+                    risque, couleur_risque = "Élevé", "🔴"
+                elif niveau_risque > 30:
+                    risque, couleur_risque = "Moyen", "🟡"
+                else:
+                    risque, couleur_risque = "Faible", "🟢"
+            
+            # Maturité par cumul des degrés-jours de croissance depuis le semis
+            recolte = dates_recolte([date_semis], [culture], [temperature_moy]).iloc[0]
+            date_recolte = recolte["date_recolte"].strftime("%Y-%m-%d") if pd.notna(recolte["jours"]) else "-"
+            
+            # Sauvegarde dans l'historique
+            prevision = {
+                'date': datetime.now().strftime("%Y-%m-%d %H:%M"),
+                'region': region,
+                'culture': culture,
+                'superficie': superficie,
+                'rendement': round(rendement_prevu, 2),
+                'production': round(production_totale, 2),
+                'risque': risque,
+                'date_recolte': date_recolte
+            }
+            st.session_state.historique.append(prevision)
+            
+            # Parcelle conservée pour l'analyse de sensibilité (hors du bloc de soumission)
+            st.session_state.derniere_parcelle = {
+                "region": region,
+                "culture": culture,
+                "date_semis": date_semis,
+                "type_sol": type_sol,
+                "surface_ha": superficie,
+                "pluviometrie_mm": pluviometrie,
+                "temperature_moyenne_c": temperature_moy,
+                "irrigation": irrigation,
+                "fertilisation": fertilisation
+            }
+        
+        # Fragment : ses boutons relancent l'affichage des résultats, pas la prédiction
+        _resultats({
+            "culture": culture,
+            "superficie": superficie,
+            "rendement_prevu": rendement_prevu,
+            "rendement_base": base_rendement[culture],
+            "production_totale": production_totale,
+            "risque": risque,
+            "niveau_risque": niveau_risque,
+            "couleur_risque": couleur_risque,
+            "intervalle": (p10, p50, p90) if mode_incertitude else None,
+            "recolte": recolte,
+            "prevision": prevision
+        })
+    
+    # Analyses de la dernière parcelle : chacune est un fragment, ses widgets ne relancent qu'elle
+    if st.session_state.get('derniere_parcelle'):
+        parcelle = st.session_state.derniere_parcelle
+        st.markdown("### Analyse de Sensibilité")
+        _sensibilite(parcelle)
+        _explication(parcelle)
+        _planification(parcelle)
@@ -0,0 +1,66 @@
+import plotly.graph_objects as go
+import streamlit as st
+
+from derive import SEUIL_FORT, SEUIL_MODERE, moniteur
+
+
+def afficher_derive():
+    suivi = moniteur()
+    if suivi is None:
+        st.info("Aucune référence d'entraînement : relancer train_modele.py pour activer le suivi de dérive.")
+        return
+
+    scores = suivi.scores()
+    st.caption(f"{suivi.n} parcelles reçues (depuis le démarrage ou la dernière réinitialisation), comparées aux "
+               f"{suivi.reference['lignes']} lignes d'entraînement. PSI < {SEUIL_MODERE} : stable ; "
+               f"{SEUIL_MODERE} - {SEUIL_FORT} : dérive modérée ; > {SEUIL_FORT} : dérive forte.")
+    if scores.isna().all().all():
+        st.info("Pas encore assez de prévisions pour évaluer la dérive.")
+        return
+
+    fig = go.Figure(go.Heatmap(
+        z=scores.values,
+        x=list(scores.columns),
+        y=list(scores.index),
+        zmin=0, zmax=2 * SEUIL_FORT,
+        colorscale=[[0, "#E8F5E9"], [SEUIL_MODERE / (2 * SEUIL_FORT), "#FFF59D"], [0.5, "#FFB74D"], [1, "#C62828"]],
+        colorbar={'title': "PSI"},
+        text=scores.round(3).astype(str).values,
+        texttemplate="%{text}",
+        hovertemplate="%{y} / %{x}<br>PSI: %{z:.3f}<extra></extra>"
+    ))
+    fig.update_layout(title="Dérive des entrées par variable et par région", height=400)
+    st.plotly_chart(fig, use_container_width=True)
+
+    alertes = suivi.alertes()
+    if alertes.empty:
+        st.success("Entrées conformes à la distribution d'entraînement.")
+    else:
+        for alerte in alertes.head(5).itertuples():
+            niveau = "forte" if alerte.psi > SEUIL_FORT else "modérée"
+            st.warning(f"Dérive {niveau} : {alerte.variable} ({alerte.region}), PSI {alerte.psi:.2f}")
+
+    st.markdown("#### Quantiles des variables numériques")
+    st.dataframe(suivi.quantiles().round(2), use_container_width=True, hide_index=True)
+    if st.button("Réinitialiser le suivi"):
+        suivi.reinitialiser()
+        st.rerun()
+
+
+def afficher():
+    st.markdown("## Consulter Les Rapports")
+    tab1, tab2, tab3 = st.tabs(["Vue d'ensemble" , "Rapport d'activité", "Dérive des entrées"])
+    
+    with tab1:
+        st.markdown("""
+                    ### Vue d'emsemble sur Les prévisions
+                    """)
+    
+    with tab2 :
+        st.markdown("""
+                    ### Rapport d'activité du système
+                    """)
+    
+    with tab3:
+        st.markdown("### Dérive des entrées par rapport à l'entraînement")
+        afficher_derive()
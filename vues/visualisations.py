@@ -0,0 +1,256 @@
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from analyse_modele import BORNES, dependance_partielle, echantillon_fond, grille_variable
+from carte import grille_togo, matrice_carte, predire_grille, reference_regions
+from climatologie import meteo_normale
+from donnees import (CHEMIN_DONNEES, CULTURES, empreinte_fichier, empreinte_dataframe,
+                     agreger_fichier, agreger_rendements, combiner_agregats)
+from metriques import appel_cache, marquer_calcul
+from meteo import REGIONS_COORDINATES, meteo_points
+from phenologie import calendrier_cultural
+from predict import COLONNES, charger_modele, version_modele
+
+# Courbes de réponse du modèle, mises en cache par version du modèle
+VARIABLES_CLIMAT = {
+    "Pluviométrie (mm)": "pluviometrie_mm",
+    "Température moyenne (°C)": "temperature_moyenne_c"
+}
+
+
+# Agrégats des rendements, mis en cache par empreinte du contenu
+@st.cache_data(show_spinner=False)
+def agregat_entrainement(empreinte: str) -> pd.DataFrame:
+    """Rendements par région et culture du jeu d'entraînement (clé : empreinte du fichier)"""
+    return agreger_fichier(CHEMIN_DONNEES)
+
+
+@st.cache_data(show_spinner=False)
+def agregat_historique(empreinte: str, _df_historique: pd.DataFrame) -> pd.DataFrame:
+    """Rendements par région et culture des prévisions enregistrées (clé : empreinte)"""
+    return agreger_rendements(_df_historique, "rendement")
+
+
+@st.cache_data(show_spinner="Calcul des courbes de réponse du modèle...")
+def courbes_reponse(version: str, empreinte_donnees: Optional[str]) -> Dict[str, pd.DataFrame]:
+    """Dépendance partielle pluie / température par région et culture (clé : versions modèle et données)"""
+    marquer_calcul()
+    modele = charger_modele()
+    df = pd.read_csv(CHEMIN_DONNEES, usecols=COLONNES) if empreinte_donnees else None
+    fond = echantillon_fond(df)
+    return {
+        variable: dependance_partielle(modele, fond, variable, grille_variable(variable, df))
+        for variable in BORNES
+    }
+
+
+@st.cache_data(show_spinner=False)
+def reference_carte(empreinte_donnees: Optional[str]) -> Dict[str, Dict]:
+    """Sol dominant, surface et climat médians par région (clé : empreinte des données)"""
+    df = pd.read_csv(CHEMIN_DONNEES, usecols=COLONNES) if empreinte_donnees else None
+    return reference_regions(df)
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def temperatures_du_jour() -> Dict[str, float]:
+    """Température moyenne prévue sur 7 jours pour chaque région (une seule requête groupée)"""
+    regions = list(REGIONS_COORDINATES)
+    meteo = meteo_points([REGIONS_COORDINATES[r]["lat"] for r in regions],
+                         [REGIONS_COORDINATES[r]["lon"] for r in regions])
+    # Régions sans réponse de l'API : normale climatologique des 7 prochains jours
+    return {
+        region: round(float(temperature), 1) if succes else meteo_normale(region)["temperature_moyenne"]
+        for region, temperature, succes in zip(regions, meteo["temperature_moyenne"], meteo["succes"])
+    }
+
+
+@st.cache_data(show_spinner="Calcul de la carte nationale...", max_entries=8)
+def carte_nationale(version: str, empreinte_donnees: Optional[str],
+                    climat: Tuple[Tuple[str, Tuple[float, float]], ...], pas_km: float) -> pd.DataFrame:
+    """Rendement de chaque maille et culture (clé : modèle, données, climat des régions et pas)"""
+    marquer_calcul()
+    return predire_grille(grille_togo(pas_km), reference_carte(empreinte_donnees), dict(climat))
+
+
+@st.fragment
+def _analyse_climatique():
+    """Courbes de réponse au climat ; la variable et la culture ne relancent que cet onglet"""
+    version = version_modele()
+    if version is None:
+        st.warning("Modèle introuvable : lancez d'abord `python train_modele.py`.")
+    else:
+        courbes = appel_cache("courbes_reponse", courbes_reponse, version, empreinte_fichier(CHEMIN_DONNEES))
+        
+        col_v, col_c = st.columns(2)
+        with col_v:
+            libelle_variable = st.radio("Variable climatique", list(VARIABLES_CLIMAT), horizontal=True)
+        with col_c:
+            culture_viz = st.selectbox("Culture", CULTURES, key="culture_climat")
+        variable = VARIABLES_CLIMAT[libelle_variable]
+        
+        df_courbe = courbes[variable]
+        df_courbe = df_courbe[df_courbe['culture'] == culture_viz]
+        
+        fig2 = px.line(
+            df_courbe,
+            x=variable,
+            y='rendement',
+            color='region',
+            labels={variable: libelle_variable, 'rendement': 'Rendement (t/ha)', 'region': 'Région'},
+            title=f'Réponse du Modèle : {libelle_variable} - Rendement ({culture_viz})'
+        )
+        fig2.update_layout(height=500)
+        st.plotly_chart(fig2, use_container_width=True)
+        
+        # Optimum de la courbe moyenne toutes régions confondues
+        moyenne = df_courbe.groupby(variable)['rendement'].mean()
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric(f"{libelle_variable} Optimale", f"{moyenne.idxmax():.1f}")
+        with col2:
+            st.metric("Rendement Maximal Prévu", f"{df_courbe['rendement'].max():.2f} t/ha")
+        
+        st.caption("Dépendance partielle : rendement moyen prévu par le modèle lorsque seule "
+                   "la variable choisie varie, les autres caractéristiques étant celles du jeu d'entraînement.")
+
+
+@st.fragment
+def _calendrier():
+    """Calendrier cultural de la région choisie"""
+    # Durées calculées par degrés-jours à partir de la température de saison de la région
+    reference = reference_carte(empreinte_fichier(CHEMIN_DONNEES))
+    region_cal = st.selectbox("Région", list(reference), key="region_calendrier")
+    temperature_cal = reference[region_cal]["temperature_moyenne_c"]
+    df_cal = calendrier_cultural(temperature_cal, date.today().year)
+    
+    st.dataframe(df_cal, use_container_width=True, hide_index=True)
+    
+    st.info(f"""
+    **Note:** Récoltes estimées par cumul des degrés-jours de croissance pour une température 
+    moyenne de saison de {temperature_cal:.1f} °C ({region_cal}). Utilisez la fonction de prévision 
+    pour obtenir une date de récolte adaptée à votre parcelle.
+    """)
+
+
+@st.fragment
+def _carte_nationale():
+    """Carte nationale ; formulaire et choix de la culture ne relancent que cet onglet"""
+    version = version_modele()
+    if version is None:
+        st.warning("Modèle introuvable : lancez d'abord `python train_modele.py`.")
+        return
+    
+    # La carte n'est calculée qu'à la demande ; le résultat est en cache par modèle et climat
+    with st.form("formulaire_carte"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            pas_km = st.select_slider("Taille des mailles (km)", options=[1, 2, 3, 4, 5], value=2)
+            source = st.radio("Climat", ["Saison de référence", "Température du jour"],
+                              help="Température du jour : prévision sur 7 jours de l'API météo ; "
+                                   "la pluviométrie reste celle de la saison de référence")
+        with col2:
+            delta_pluie = st.slider("Pluviométrie (écart, %)", -50, 50, 0, step=5)
+        with col3:
+            delta_temp = st.slider("Température (écart, °C)", -3.0, 3.0, 0.0, step=0.5)
+        calculer = st.form_submit_button("Calculer la carte", use_container_width=True)
+    
+    if calculer:
+        st.session_state.parametres_carte = (pas_km, source, delta_pluie, delta_temp)
+    if 'parametres_carte' not in st.session_state:
+        st.info("Choisissez les paramètres puis lancez le calcul de la carte.")
+        return
+    pas_km, source, delta_pluie, delta_temp = st.session_state.parametres_carte
+    
+    empreinte_donnees = empreinte_fichier(CHEMIN_DONNEES)
+    reference = reference_carte(empreinte_donnees)
+    temperatures = temperatures_du_jour() if source == "Température du jour" else {}
+    # Instantané du climat de chaque région : clé du cache de la carte
+    climat = tuple(
+        (region, (round(ref["pluviometrie_mm"] * (1 + delta_pluie / 100), 1),
+                  round(temperatures.get(region, ref["temperature_moyenne_c"]) + delta_temp, 1)))
+        for region, ref in reference.items()
+    )
+    carte = appel_cache("carte_nationale", carte_nationale, version, empreinte_donnees, climat, pas_km)
+    
+    culture_carte = st.radio("Culture", CULTURES, horizontal=True, key="culture_carte")
+    lons, lats, z = matrice_carte(carte, culture_carte)
+    fig_carte = go.Figure(go.Heatmap(
+        x=lons,
+        y=lats,
+        z=z,
+        colorscale="YlGn",
+        colorbar={'title': "t/ha"},
+        hovertemplate="Lat %{y:.2f} / Lon %{x:.2f}<br>Rendement: %{z:.2f} t/ha<extra></extra>"
+    ))
+    fig_carte.update_layout(
+        title=f"Rendement prévu - {culture_carte} ({len(carte)} mailles de {pas_km} km)",
+        xaxis_title="Longitude",
+        yaxis_title="Latitude",
+        yaxis={'scaleanchor': "x"},
+        height=800
+    )
+    st.plotly_chart(fig_carte, use_container_width=True)
+    
+    resume = carte.groupby("region")[list(CULTURES)].mean().reindex(list(reference)).round(2)
+    st.dataframe(resume, use_container_width=True)
+    st.caption("Chaque maille reçoit le sol dominant et la surface médiane de sa région ; pluie et "
+               "température sont interpolées entre les régions (pondération inverse de la distance).")
+
+
+def afficher():
+    st.markdown("## Visualisations et Analyses")
+    
+    tab1, tab2, tab3, tab4 = st.tabs(["Tendances Régionales", "Analyse Climatique", "Calendrier Cultural",
+                                      "Carte Nationale"])
+    
+    with tab1:
+        st.markdown("### Rendements Moyens par Région")
+        
+        # Agrégats du jeu d'entraînement et de l'historique (recalculés seulement si les données changent)
+        empreinte_donnees = empreinte_fichier(CHEMIN_DONNEES)
+        agregat_donnees = agregat_entrainement(empreinte_donnees) if empreinte_donnees else None
+        
+        agregat_prevus = None
+        if st.session_state.historique:
+            df_prevus = pd.DataFrame(st.session_state.historique)
+            agregat_prevus = agregat_historique(empreinte_dataframe(df_prevus), df_prevus)
+        
+        df_viz = combiner_agregats(agregat_donnees, agregat_prevus)
+        
+        if df_viz.empty:
+            st.warning("Aucune donnée disponible : jeu d'entraînement introuvable et historique vide.")
+        else:
+            fig = px.bar(
+                df_viz,
+                x='Région',
+                y='Rendement',
+                color='Culture',
+                barmode='group',
+                hover_data=['Effectif'],
+                title='Rendements Moyens par Région et Culture (t/ha)',
+                color_discrete_sequence=['#4CAF50', '#FF9800', '#2196F3']
+            )
+            fig.update_layout(height=500)
+            st.plotly_chart(fig, use_container_width=True)
+            
+            nb_donnees = int(agregat_donnees["effectif"].sum()) if agregat_donnees is not None else 0
+            nb_prevus = int(agregat_prevus["effectif"].sum()) if agregat_prevus is not None else 0
+            st.info(f"Moyennes calculées sur {nb_donnees} observations du jeu d'entraînement "
+                    f"et {nb_prevus} prévision(s) enregistrée(s).")
+    
+    with tab2:
+        st.markdown("### Impact du Climat sur le Rendement")
+        _analyse_climatique()
+    
+    with tab3:
+        st.markdown("### Calendrier Cultural Recommandé")
+        _calendrier()
+    
+    with tab4:
+        st.markdown("### Carte Nationale des Rendements")
+        _carte_nationale()